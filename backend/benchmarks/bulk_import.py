@@ -0,0 +1,101 @@
+"""Measure streaming import throughput of POST /api/import/{entity}.
+
+Run the API first (e.g. `uvicorn server:app --port 8001`), then:
+
+    python benchmarks/bulk_import.py --base-url http://localhost:8001 --rows 100000 --format csv
+
+Rows are generated on the fly and sent as a chunked request body, so neither
+side needs the whole file in memory.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+
+from common import authed_session
+
+ENTITY_COLUMNS = {
+    "customers": ["name", "email", "phone", "gstin", "address", "opening_balance"],
+    "vendors": ["name", "email", "phone", "gstin", "address", "opening_balance"],
+    "products": ["name", "sku", "hsn_code", "unit", "price", "tax_rate", "stock_quantity"],
+}
+
+
+def make_row(rng, entity, index):
+    if entity == "products":
+        return {
+            "name": f"Product {index}",
+            "sku": f"SKU-{index:07d}",
+            "hsn_code": str(rng.choice([8541, 8504, 7308, 8544])),
+            "unit": "pcs",
+            "price": round(rng.uniform(10, 50000), 2),
+            "tax_rate": rng.choice([5, 12, 18, 28]),
+            "stock_quantity": rng.randint(0, 500)
+        }
+    return {
+        "name": f"{entity[:-1].title()} {index}",
+        "email": f"{entity}{index}@example.com",
+        "phone": f"9{rng.randint(100000000, 999999999)}",
+        "gstin": "",
+        "address": f"{index} Main Road, Pune",
+        "opening_balance": round(rng.uniform(0, 10000), 2)
+    }
+
+
+def body(rng, entity, rows, import_format, chunk_rows=1000):
+    columns = ENTITY_COLUMNS[entity]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    if import_format == "csv":
+        writer.writeheader()
+    for index in range(rows):
+        row = make_row(rng, entity, index)
+        if import_format == "csv":
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row) + "\n")
+        if (index + 1) % chunk_rows == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--entity", choices=sorted(ENTITY_COLUMNS), default="products")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", dest="import_format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    session = authed_session(args.base_url)
+    started = time.perf_counter()
+    response = session.post(
+        f"{args.base_url}/api/import/{args.entity}",
+        params={"format": args.import_format},
+        data=body(random.Random(args.seed), args.entity, args.rows, args.import_format),
+        timeout=3600
+    )
+    response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    report = response.json()
+
+    print(json.dumps({
+        "benchmark": "bulk_import",
+        "entity": args.entity,
+        "format": args.import_format,
+        "rows": args.rows,
+        "inserted": report["inserted"],
+        "failed": report["failed"],
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(args.rows / elapsed, 1)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
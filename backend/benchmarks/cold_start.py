@@ -0,0 +1,97 @@
+"""Measure how long a fresh API process takes to import, become ready and answer its first request.
+
+Needs a reachable mongod (MONGO_URL / DB_NAME from backend/.env); starts and stops its own
+uvicorn on --port each round:
+
+    python benchmarks/cold_start.py --rounds 5
+    python benchmarks/cold_start.py --rounds 5 --factory   # uvicorn server:create_app --factory
+
+Reported per phase: wall-clock seconds from spawning the process to the first 200 from
+/api/health/live and /api/health/ready as seen by this client, plus the server's own
+import/live/ready/first_response timings from /api/health/ready. Liveness answers as soon
+as the app is serving; readiness waits for the background warm-up (connection pool, index
+builds) to finish, so the gap between the two is the warm-up time.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            response = requests.get(url, timeout=1)
+            if response.status_code == 200:
+                return response
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def one_round(port, factory, timeout):
+    target = ["server:create_app", "--factory"] if factory else ["server:app"]
+    command = [sys.executable, "-m", "uvicorn", *target, "--port", str(port), "--log-level", "warning"]
+    base_url = f"http://127.0.0.1:{port}"
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=BACKEND_DIR)
+    try:
+        deadline = started + timeout
+        if wait_for(f"{base_url}/api/health/live", deadline) is None:
+            raise RuntimeError(f"no liveness answer within {timeout}s")
+        live = time.perf_counter() - started
+        ready_response = wait_for(f"{base_url}/api/health/ready", deadline)
+        if ready_response is None:
+            raise RuntimeError(f"not ready within {timeout}s")
+        ready = time.perf_counter() - started
+        return {"client_live_seconds": live, "client_ready_seconds": ready, **ready_response.json()["startup"]}
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def describe(values):
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {
+        "min": round(min(values), 4),
+        "median": round(statistics.median(values), 4),
+        "max": round(max(values), 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for each process")
+    parser.add_argument("--factory", action="store_true", help="start via create_app --factory instead of server:app")
+    args = parser.parse_args()
+
+    rounds = []
+    for number in range(args.rounds):
+        result = one_round(args.port, args.factory, args.timeout)
+        rounds.append(result)
+        print(f"round {number + 1}: ready after {result['client_ready_seconds']:.3f}s", file=sys.stderr)
+
+    phases = rounds[0].keys() if rounds else []
+    print(json.dumps({
+        "benchmark": "cold_start",
+        "rounds": args.rounds,
+        "factory": args.factory,
+        "phases": {phase: describe([result[phase] for result in rounds]) for phase in phases}
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
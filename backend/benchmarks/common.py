@@ -0,0 +1,95 @@
+"""Helpers shared by the benchmark scripts in this directory."""
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "mean_ms": round(statistics.mean(samples) * 1000, 2) if samples else 0.0
+    }
+
+
+def signup(base_url, password="bench-password"):
+    """Create a throwaway user; returns (email, password, token)"""
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    response = requests.post(
+        f"{base_url}/api/auth/signup",
+        json={"email": email, "password": password, "name": "Benchmark"},
+        timeout=60
+    )
+    response.raise_for_status()
+    return email, password, response.json()["token"]
+
+
+def authed_session(base_url, with_business=True):
+    """A requests.Session logged in as a fresh user that owns a fresh business"""
+    _, _, token = signup(base_url)
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    if with_business:
+        session.post(f"{base_url}/api/businesses", json={"name": "Benchmark Traders"}, timeout=60).raise_for_status()
+    return session
+
+
+# Seeded datasets (see seed.py): owners log in with a fixed password and a seed-derived email
+SEED_PASSWORD = "seed-password"
+
+
+def seeded_email(seed, business_index):
+    return f"seed-{seed}-{business_index}@example.com"
+
+
+def login_session(base_url, email, password):
+    """A requests.Session logged in as an existing user"""
+    response = requests.post(
+        f"{base_url}/api/auth/login", json={"email": email, "password": password}, timeout=60
+    )
+    response.raise_for_status()
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {response.json()['token']}"
+    return session
+
+
+def run_for(fn, duration, concurrency):
+    """Call `fn(worker_index)` from `concurrency` threads for `duration` seconds.
+
+    fn returns an HTTP status code; returns (latencies, status_counts, elapsed_s).
+    """
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_index):
+        local_latencies = []
+        local_statuses = {}
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            code = fn(worker_index)
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses[code] = local_statuses.get(code, 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for code, count in local_statuses.items():
+                statuses[code] = statuses.get(code, 0) + count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
@@ -0,0 +1,58 @@
+"""Compare two scenarios.py results and flag regressions.
+
+    python benchmarks/compare.py results/v1.json results/v2.json --threshold 10
+
+Prints throughput and p50/p99 for every scenario in both files with the relative change,
+and exits 1 if any scenario lost more than --threshold percent of throughput or its p99
+grew by more than that.
+"""
+import argparse
+import json
+import sys
+
+
+def change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline {baseline.get('revision')}  candidate {candidate.get('revision')}")
+    print(f"{'scenario':18} {'req/s':>17} {'p50 ms':>19} {'p99 ms':>19}")
+
+    regressions = []
+    for name, before in baseline["scenarios"].items():
+        after = candidate["scenarios"].get(name)
+        if after is None:
+            print(f"{name:18} missing from candidate")
+            continue
+        throughput = change(before["throughput_rps"], after["throughput_rps"])
+        p50 = change(before["p50_ms"], after["p50_ms"])
+        p99 = change(before["p99_ms"], after["p99_ms"])
+        print(
+            f"{name:18} {after['throughput_rps']:>9} ({throughput:+5.1f}%) "
+            f"{after['p50_ms']:>9} ({p50:+5.1f}%) {after['p99_ms']:>9} ({p99:+5.1f}%)"
+        )
+        if throughput < -args.threshold or p99 > args.threshold:
+            regressions.append(name)
+
+    if regressions:
+        print(f"\nRegressed beyond {args.threshold}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Compare invoice creation throughput of POST /api/invoices against POST /api/invoices/batch.
+
+Run the API first (e.g. `uvicorn server:app --port 8001`), then:
+
+    python benchmarks/invoice_batch.py --base-url http://localhost:8001 --invoices 1000 --batch-size 250
+"""
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import authed_session
+
+
+def make_fixtures(session, base_url, customers, products):
+    customer_ids = [
+        session.post(f"{base_url}/api/customers", json={"name": f"Customer {i}"}, timeout=60).json()["id"]
+        for i in range(customers)
+    ]
+    product_list = [
+        session.post(
+            f"{base_url}/api/products",
+            json={"name": f"Product {i}", "price": 100 + i, "stock_quantity": 1_000_000},
+            timeout=60
+        ).json()
+        for i in range(products)
+    ]
+    return customer_ids, product_list
+
+
+def make_payload(rng, customer_ids, products, lines):
+    items = []
+    for product in rng.sample(products, min(lines, len(products))):
+        quantity = rng.randint(1, 5)
+        items.append({
+            "product_id": product["id"],
+            "product_name": product["name"],
+            "quantity": quantity,
+            "price": product["price"],
+            "tax_rate": product["tax_rate"],
+            "amount": quantity * product["price"]
+        })
+    return {"customer_id": rng.choice(customer_ids), "items": items}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--invoices", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=250)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    session = authed_session(args.base_url)
+    customer_ids, products = make_fixtures(session, args.base_url, 50, 200)
+    payloads = [make_payload(rng, customer_ids, products, args.lines) for _ in range(args.invoices)]
+
+    def post_single(payload):
+        session.post(f"{args.base_url}/api/invoices", json=payload, timeout=60).raise_for_status()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(post_single, payloads))
+    single_elapsed = time.perf_counter() - started
+
+    batches = [payloads[i:i + args.batch_size] for i in range(0, len(payloads), args.batch_size)]
+    started = time.perf_counter()
+    created = 0
+    for batch in batches:
+        response = session.post(f"{args.base_url}/api/invoices/batch", json={"invoices": batch}, timeout=600)
+        response.raise_for_status()
+        created += sum(1 for result in response.json() if result["status"] == "created")
+    batch_elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "benchmark": "invoice_batch",
+        "invoices": args.invoices,
+        "lines_per_invoice": args.lines,
+        "single": {
+            "elapsed_s": round(single_elapsed, 3),
+            "invoices_per_s": round(args.invoices / single_elapsed, 1),
+            "concurrency": args.concurrency
+        },
+        "batch": {
+            "elapsed_s": round(batch_elapsed, 3),
+            "invoices_per_s": round(created / batch_elapsed, 1),
+            "batch_size": args.batch_size
+        },
+        "speedup": round(single_elapsed / batch_elapsed, 2)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
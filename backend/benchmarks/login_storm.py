@@ -0,0 +1,82 @@
+"""Measure latency of an unrelated endpoint while the API absorbs a login storm.
+
+Run the API first (e.g. `uvicorn server:app --port 8001`), then:
+
+    python benchmarks/login_storm.py --base-url http://localhost:8001 --logins 200
+
+The probe endpoint's p50/p99 is reported for a quiet baseline and during the
+storm; with hashing off the event loop the two should stay close.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from common import signup, summarize
+
+
+def probe(session, url, stop_event, samples):
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        session.get(url, timeout=30)
+        samples.append(time.perf_counter() - started)
+
+
+def measure_probe(base_url, duration, storm=None):
+    samples = []
+    stop_event = threading.Event()
+    session = requests.Session()
+    thread = threading.Thread(target=probe, args=(session, f"{base_url}/api/", stop_event, samples))
+    thread.start()
+    storm_result = storm() if storm else time.sleep(duration)
+    stop_event.set()
+    thread.join()
+    return samples, storm_result
+
+
+def run_storm(base_url, email, password, logins, concurrency):
+    statuses = {}
+
+    def login(_):
+        response = requests.post(f"{base_url}/api/auth/login", json={"email": email, "password": password}, timeout=60)
+        return response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for code in pool.map(login, range(logins)):
+            statuses[code] = statuses.get(code, 0) + 1
+    return {"elapsed_s": round(time.perf_counter() - started, 3), "status_counts": statuses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    email, password, _ = signup(args.base_url)
+
+    baseline, _ = measure_probe(args.base_url, args.baseline_seconds)
+    during, storm = measure_probe(
+        args.base_url,
+        None,
+        storm=lambda: run_storm(args.base_url, email, password, args.logins, args.concurrency)
+    )
+
+    print(json.dumps({
+        "benchmark": "login_storm",
+        "logins": args.logins,
+        "concurrency": args.concurrency,
+        "storm": storm,
+        "probe_baseline": summarize(baseline),
+        "probe_during_storm": summarize(during)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
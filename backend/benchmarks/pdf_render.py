@@ -0,0 +1,136 @@
+"""Invoice PDF rendering throughput: PDFs per second on one core and through the renderer pool.
+
+Needs no database or running server:
+
+    python benchmarks/pdf_render.py --invoices 500 --lines 8 --workers 1,2,4
+
+"single_core" renders in this process with the template already compiled, so
+it is the per-core ceiling. Each pool run goes through PdfRenderer.render_many
+exactly like the PDF routes on a cache miss, including pickling to the workers;
+pdfs_per_second_per_core divides its throughput by the worker count.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+BUSINESS = {
+    "name": "Benchmark Solar Traders",
+    "address": "12 MG Road\nPune, Maharashtra 411001",
+    "gstin": "27ABCDE1234F1Z5",
+    "phone": "9800000000",
+    "email": "accounts@example.com",
+}
+
+
+def make_documents(count, lines, seed):
+    rng = random.Random(seed)
+    start = datetime(2024, 4, 1, tzinfo=timezone.utc)
+    products = {
+        f"product-{index}": {"hsn_code": rng.choice(["8541", "8504", "8544", "8507"])}
+        for index in range(50)
+    }
+    documents = []
+    for index in range(count):
+        items = []
+        for _ in range(lines):
+            quantity = rng.randint(1, 10)
+            price = round(rng.uniform(10, 25000), 2)
+            items.append({
+                "product_id": rng.choice(list(products)),
+                "product_name": f"Solar component {rng.randrange(1000)}",
+                "quantity": quantity,
+                "price": price,
+                "tax_rate": rng.choice([5.0, 12.0, 18.0, 28.0]),
+                "amount": round(quantity * price, 2)
+            })
+        subtotal = round(sum(item["amount"] for item in items), 2)
+        tax_amount = round(sum(item["amount"] * item["tax_rate"] / 100 for item in items), 2)
+        invoice = {
+            "invoice_number": f"INV-{index + 1:05d}",
+            "customer_id": "customer",
+            "customer_name": f"Customer {index}",
+            "invoice_date": start + timedelta(hours=index),
+            "items": items,
+            "subtotal": subtotal,
+            "tax_amount": tax_amount,
+            "total": subtotal + tax_amount,
+            "balance": subtotal + tax_amount,
+        }
+        customer = {"name": f"Customer {index}", "gstin": rng.choice(["", "27AAAAA0000A1Z5", "29AAAAA0000A1Z5"])}
+        documents.append(server.invoice_pdf_document(invoice, BUSINESS, customer, products))
+    return documents
+
+
+def single_core(documents):
+    server.invoice_pdf_template()
+    started = time.perf_counter()
+    pdfs = [server.render_invoice_pdf(document) for document in documents]
+    elapsed = time.perf_counter() - started
+    return {
+        "pdfs_per_second": round(len(documents) / elapsed, 1),
+        "ms_per_pdf": round(elapsed / len(documents) * 1000, 3),
+        "mean_pdf_bytes": round(sum(len(pdf) for pdf in pdfs) / len(pdfs))
+    }
+
+
+async def pool(documents, workers, executor_kind):
+    renderer = server.PdfRenderer(executor_kind, workers, server.PDF_RENDER_CHUNK_SIZE)
+    try:
+        # Start the workers and compile their templates outside the timed run
+        await renderer.render_many(documents[:workers])
+        started = time.perf_counter()
+        await renderer.render_many(documents)
+        elapsed = time.perf_counter() - started
+    finally:
+        renderer.shutdown()
+    rate = len(documents) / elapsed
+    return {
+        "workers": workers,
+        "pdfs_per_second": round(rate, 1),
+        "pdfs_per_second_per_core": round(rate / workers, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invoices", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=8)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated pool sizes to run")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    server.invoice_pdf_template.cache_clear()
+    server.invoice_pdf_template()
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    documents = make_documents(args.invoices, args.lines, args.seed)
+    print(json.dumps({
+        "benchmark": "pdf_render",
+        "invoices": args.invoices,
+        "lines_per_invoice": args.lines,
+        "cpu_count": os.cpu_count(),
+        "template_compile_ms": round(compile_ms, 3),
+        "single_core": single_core(documents),
+        "pool": [
+            asyncio.run(pool(documents, int(workers), args.executor))
+            for workers in args.workers.split(",") if workers.strip()
+        ]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
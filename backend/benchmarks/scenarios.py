@@ -0,0 +1,154 @@
+"""Drive the API with the common page loads and writes, against a dataset from seed.py.
+
+Seed first, run the API (e.g. `uvicorn server:app --port 8001 --workers 4`), then:
+
+    python benchmarks/scenarios.py --seed 42 --businesses 2 --duration 20 --output results/v1.json
+    python benchmarks/compare.py results/v1.json results/v2.json
+
+Each scenario runs for --duration seconds from --concurrency threads, spreading requests
+over the seeded businesses. The JSON result holds throughput, p50/p99 and status counts
+per scenario, plus the git revision and parameters, so runs of two releases can be diffed.
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from common import SEED_PASSWORD, login_session, run_for, seeded_email, summarize
+
+REPORT_RANGE = {"from": "2024-04-01", "to": "2025-03-31", "granularity": "month"}
+GST_PERIOD = {"from": "2024-04-01", "to": "2025-03-31"}
+
+
+class Tenant:
+    """A logged-in seeded business plus the ids the write scenarios need"""
+
+    def __init__(self, base_url, email, seed, worker_index):
+        self.base_url = base_url
+        self.session = login_session(base_url, email, SEED_PASSWORD)
+        self.rng = random.Random(f"{seed}:{worker_index}")
+        self.customer_ids = [
+            customer["id"] for customer in self.get("/api/customers", limit=200, fields="name").json()["items"]
+        ]
+        self.products = self.get(
+            "/api/products", limit=200, fields="name,price,tax_rate"
+        ).json()["items"]
+        self.invoice_ids = [
+            invoice["id"] for invoice in self.get("/api/invoices", limit=200, fields="status").json()["items"]
+        ]
+
+    def get(self, path, **params):
+        return self.session.get(f"{self.base_url}{path}", params=params, timeout=60)
+
+    def post(self, path, payload):
+        return self.session.post(f"{self.base_url}{path}", json=payload, timeout=60)
+
+    def invoice_payload(self):
+        items = []
+        for product in self.rng.sample(self.products, min(3, len(self.products))):
+            quantity = self.rng.randint(1, 5)
+            items.append({
+                "product_id": product["id"],
+                "product_name": product["name"],
+                "quantity": quantity,
+                "price": product["price"],
+                "tax_rate": product["tax_rate"],
+                "amount": round(quantity * product["price"], 2)
+            })
+        return {"customer_id": self.rng.choice(self.customer_ids), "items": items}
+
+    def payment_payload(self):
+        return {"invoice_id": self.rng.choice(self.invoice_ids), "amount": 1.0, "payment_method": "bank"}
+
+
+SCENARIOS = {
+    "dashboard": lambda tenant: tenant.get("/api/dashboard/stats"),
+    "list_invoices": lambda tenant: tenant.get("/api/invoices", limit=50),
+    "list_customers": lambda tenant: tenant.get("/api/customers", limit=50),
+    "list_products": lambda tenant: tenant.get("/api/products", limit=50),
+    "search_products": lambda tenant: tenant.get("/api/products/search", q=tenant.rng.choice(["sol", "pan", "inv", "cab"])),
+    "report_sales": lambda tenant: tenant.get("/api/reports/sales", **REPORT_RANGE),
+    "report_expenses": lambda tenant: tenant.get("/api/reports/expenses", **REPORT_RANGE),
+    "report_gst": lambda tenant: tenant.get("/api/reports/gst-summary", **GST_PERIOD),
+    "create_invoice": lambda tenant: tenant.post("/api/invoices", tenant.invoice_payload()),
+    "create_payment": lambda tenant: tenant.post("/api/payments", tenant.payment_payload()),
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--businesses", type=int, default=2)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset to run")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unrecorded seconds before each scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+
+    # requests.Session is not thread-safe, so each worker thread gets its own login, round-robin over businesses
+    tenants = [
+        Tenant(args.base_url, seeded_email(args.seed, worker_index % args.businesses), args.seed, worker_index)
+        for worker_index in range(args.concurrency)
+    ]
+
+    results = {}
+    for name in names:
+        scenario = SCENARIOS[name]
+
+        def call(worker_index):
+            return scenario(tenants[worker_index]).status_code
+
+        if args.warmup:
+            run_for(call, args.warmup, args.concurrency)
+        latencies, statuses, elapsed = run_for(call, args.duration, args.concurrency)
+        results[name] = {
+            **summarize(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "errors": sum(count for code, count in statuses.items() if code >= 400),
+            "status_counts": {str(code): count for code, count in sorted(statuses.items())}
+        }
+        print(f"{name:18} {results[name]['throughput_rps']:>9} req/s  "
+              f"p50 {results[name]['p50_ms']:>8} ms  p99 {results[name]['p99_ms']:>8} ms  "
+              f"errors {results[name]['errors']}", file=sys.stderr)
+
+    output = json.dumps({
+        "benchmark": "scenarios",
+        "revision": git_revision(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "parameters": {
+            "base_url": args.base_url,
+            "seed": args.seed,
+            "businesses": args.businesses,
+            "duration_s": args.duration,
+            "concurrency": args.concurrency
+        },
+        "scenarios": results
+    }, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""Seed a local mongod with a deterministic benchmark dataset.
+
+Writes straight to the database named by MONGO_URL / DB_NAME (backend/.env), using the
+server's models and codec so documents look exactly like API-created ones:
+
+    python benchmarks/seed.py --seed 42 --businesses 3 --invoices 5000
+    python benchmarks/seed.py --seed 42 --businesses 3 --reset   # drop and regenerate
+
+The same seed and counts always produce the same ids, numbers, dates and amounts.
+Business i is owned by seeded_email(seed, i) with SEED_PASSWORD, which is how
+scenarios.py logs in. Summaries, monthly rollups and document counters are rebuilt
+afterwards so the dashboard and reports match the raw data.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+from common import SEED_PASSWORD, seeded_email  # noqa: E402
+
+START = datetime(2024, 4, 1, tzinfo=timezone.utc)
+INSERT_CHUNK = 1000
+
+EXPENSE_CATEGORIES = ["Rent", "Salaries", "Transport", "Utilities", "Office Supplies", "Marketing"]
+PRODUCT_WORDS = ["Solar", "Panel", "Inverter", "Cable", "Battery", "Meter", "Bracket", "Junction", "Box", "Clamp"]
+CITY_NAMES = ["Pune", "Nagpur", "Nashik", "Surat", "Indore", "Jaipur", "Mysore", "Kochi"]
+DISCOMS = ["MSEDCL", "BESCOM", "TANGEDCO", "PSPCL", "UHBVN"]
+SEEDED_COLLECTIONS = [
+    "customers", "vendors", "products", "invoices", "expense_categories", "expenses", "payments", "solar_projects"
+]
+
+
+class BusinessGenerator:
+    """All documents of one business, derived only from (seed, business index) and the counts"""
+
+    def __init__(self, seed, index, args):
+        self.rng = random.Random(f"{seed}:{index}")
+        self.seed = seed
+        self.index = index
+        self.args = args
+        self.business_id = self.uuid()
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def when(self):
+        return START + timedelta(seconds=self.rng.randrange(self.args.days * 86400))
+
+    def money(self, low, high):
+        return round(self.rng.uniform(low, high), 2)
+
+    def phone(self):
+        return f"9{self.rng.randrange(10 ** 9):09d}"
+
+    def gstin(self):
+        return f"27{''.join(self.rng.choices('ABCDEFGHJKLMNPQRSTUVWXYZ', k=5))}{self.rng.randrange(10 ** 4):04d}A1Z{self.rng.randrange(10)}"
+
+    def generate(self):
+        owner = server.User(
+            id=self.uuid(),
+            email=seeded_email(self.seed, self.index),
+            name=f"Seed Owner {self.index}",
+            business_id=self.business_id,
+            created_at=START
+        )
+        business = server.Business(
+            id=self.business_id,
+            name=f"Seed Traders {self.index}",
+            gstin=self.gstin(),
+            owner_id=owner.id,
+            created_at=START
+        )
+        customers = [
+            server.Customer(
+                id=self.uuid(),
+                name=f"{self.rng.choice(CITY_NAMES)} Customer {n}",
+                phone=self.phone(),
+                gstin=self.gstin() if self.rng.random() < 0.4 else None,
+                business_id=self.business_id,
+                created_at=self.when()
+            )
+            for n in range(self.args.customers)
+        ]
+        vendors = [
+            server.Vendor(
+                id=self.uuid(),
+                name=f"{self.rng.choice(CITY_NAMES)} Supplier {n}",
+                phone=self.phone(),
+                business_id=self.business_id,
+                created_at=self.when()
+            )
+            for n in range(self.args.vendors)
+        ]
+        products = [
+            server.Product(
+                id=self.uuid(),
+                name=f"{' '.join(self.rng.sample(PRODUCT_WORDS, 2))} {n}",
+                sku=f"SKU-{n:05d}",
+                hsn_code=self.rng.choice(["8541", "8504", "8544", "8507", "9028"]),
+                price=self.money(50, 25000),
+                tax_rate=self.rng.choice([5.0, 12.0, 18.0, 28.0]),
+                business_id=self.business_id,
+                stock_quantity=float(self.rng.randrange(0, 5000)),
+                created_at=self.when()
+            )
+            for n in range(self.args.products)
+        ]
+        categories = [
+            server.ExpenseCategory(id=self.uuid(), name=name, business_id=self.business_id, created_at=START)
+            for name in EXPENSE_CATEGORIES
+        ]
+
+        invoices = []
+        for date in sorted(self.when() for _ in range(self.args.invoices)):
+            customer = self.rng.choice(customers)
+            items = []
+            for product in self.rng.sample(products, min(self.rng.randint(1, self.args.lines), len(products))):
+                quantity = float(self.rng.randint(1, 10))
+                items.append(server.InvoiceItem(
+                    product_id=product.id,
+                    product_name=product.name,
+                    quantity=quantity,
+                    price=product.price,
+                    tax_rate=product.tax_rate,
+                    amount=round(quantity * product.price, 2)
+                ))
+            subtotal = round(sum(item.amount for item in items), 2)
+            tax_amount = round(sum(item.amount * item.tax_rate / 100 for item in items), 2)
+            total = round(subtotal + tax_amount, 2)
+            invoices.append(server.Invoice(
+                id=self.uuid(),
+                invoice_number=f"INV-{len(invoices) + 1:05d}",
+                customer_id=customer.id,
+                customer_name=customer.name,
+                business_id=self.business_id,
+                invoice_date=date,
+                due_date=date + timedelta(days=30),
+                items=items,
+                subtotal=subtotal,
+                tax_amount=tax_amount,
+                total=total,
+                balance=total,
+                created_at=date
+            ))
+
+        # Payments are applied to invoices in memory so paid_amount, balance and status agree
+        payments = []
+        for invoice in self.rng.sample(invoices, min(self.args.payments, len(invoices))):
+            amount = invoice.balance if self.rng.random() < 0.6 else round(invoice.balance * self.rng.uniform(0.1, 0.9), 2)
+            date = invoice.invoice_date + timedelta(days=self.rng.randint(0, 45))
+            invoice.paid_amount = round(invoice.paid_amount + amount, 2)
+            invoice.balance = round(invoice.total - invoice.paid_amount, 2)
+            invoice.status = "paid" if invoice.balance <= 0 else "partial"
+            payments.append(server.Payment(
+                id=self.uuid(),
+                payment_number="",
+                invoice_id=invoice.id,
+                customer_id=invoice.customer_id,
+                business_id=self.business_id,
+                amount=amount,
+                payment_date=date,
+                payment_method=self.rng.choice(["cash", "bank", "upi"]),
+                created_at=date
+            ))
+        payments.sort(key=lambda payment: payment.created_at)
+        for number, payment in enumerate(payments, start=1):
+            payment.payment_number = f"PAY-{number:05d}"
+
+        expenses = []
+        for date in sorted(self.when() for _ in range(self.args.expenses)):
+            category = self.rng.choice(categories)
+            vendor = self.rng.choice(vendors) if vendors and self.rng.random() < 0.7 else None
+            amount = self.money(200, 50000)
+            tax_amount = round(amount * 0.18, 2) if self.rng.random() < 0.5 else 0.0
+            expenses.append(server.Expense(
+                id=self.uuid(),
+                expense_number=f"EXP-{len(expenses) + 1:05d}",
+                category_id=category.id,
+                category_name=category.name,
+                vendor_id=vendor.id if vendor else None,
+                vendor_name=vendor.name if vendor else None,
+                business_id=self.business_id,
+                amount=amount,
+                tax_amount=tax_amount,
+                total=round(amount + tax_amount, 2),
+                expense_date=date,
+                payment_method=self.rng.choice(["cash", "bank", "card"]),
+                created_at=date
+            ))
+
+        projects = []
+        for date in sorted(self.when() for _ in range(self.args.solar_projects)):
+            customer = self.rng.choice(customers)
+            capacity = self.rng.choice([3.0, 5.0, 7.5, 10.0, 25.0, 50.0])
+            projects.append(server.SolarProject(
+                id=self.uuid(),
+                project_number=f"SOLAR-{len(projects) + 1:05d}",
+                customer_id=customer.id,
+                customer_name=customer.name,
+                business_id=self.business_id,
+                project_name=f"{capacity:g} kW rooftop for {customer.name}",
+                site_address=f"{self.rng.randint(1, 999)} Main Road, {self.rng.choice(CITY_NAMES)}",
+                system_capacity_kw=capacity,
+                panel_type="Mono PERC 540W",
+                panel_quantity=int(capacity * 1000 / 540) + 1,
+                inverter_type="String inverter",
+                inverter_quantity=1,
+                estimated_cost=round(capacity * 55000, 2),
+                subsidy_amount=round(min(capacity, 3) * 18000, 2),
+                subsidy_status=self.rng.choice(["pending", "applied", "approved", "received"]),
+                discom_name=self.rng.choice(DISCOMS),
+                consumer_number=f"{self.rng.randrange(10 ** 12):012d}",
+                installation_status=self.rng.choice(["planning", "in_progress", "completed", "on_hold"]),
+                start_date=date,
+                created_at=date
+            ))
+
+        return {
+            "owner": owner,
+            "business": business,
+            "customers": customers,
+            "vendors": vendors,
+            "products": products,
+            "expense_categories": categories,
+            "invoices": invoices,
+            "payments": payments,
+            "expenses": expenses,
+            "solar_projects": projects,
+        }
+
+
+async def insert_all(collection_name, models):
+    docs = []
+    for model in models:
+        doc = server.to_document(model)
+        if collection_name in server.SEARCHABLE_FIELDS:
+            doc.update(server.search_fields(collection_name, doc))
+        docs.append(doc)
+    for start in range(0, len(docs), INSERT_CHUNK):
+        await server.db[collection_name].insert_many(docs[start:start + INSERT_CHUNK], ordered=False)
+
+
+async def reset_business(business_id, owner_email):
+    for name in SEEDED_COLLECTIONS:
+        await server.db[name].delete_many({"business_id": business_id})
+    await server.db.businesses.delete_one({"id": business_id})
+    await server.db.users.delete_one({"email": owner_email})
+    await server.db.business_summaries.delete_one({"_id": business_id})
+    await server.db.monthly_rollups.delete_many({"business_id": business_id})
+    await server.db.counters.delete_many({"business_id": business_id})
+
+
+async def main(args) -> int:
+    server.connect_mongo()
+    await server.ensure_indexes()
+    password_hash = server.hash_password(SEED_PASSWORD)
+
+    report = []
+    for index in range(args.businesses):
+        started = time.perf_counter()
+        data = BusinessGenerator(args.seed, index, args).generate()
+        business_id = data["business"].id
+        owner_email = data["owner"].email
+
+        if await server.db.businesses.find_one({"id": business_id}, {"_id": 1}):
+            if not args.reset:
+                print(f"Business {index} ({business_id}) is already seeded; pass --reset to regenerate")
+                return 1
+            await reset_business(business_id, owner_email)
+
+        owner_doc = server.to_document(data["owner"])
+        owner_doc["password"] = password_hash
+        await server.db.users.insert_one(owner_doc)
+        await server.db.businesses.insert_one(server.to_document(data["business"]))
+        for name in SEEDED_COLLECTIONS:
+            await insert_all(name, data[name])
+
+        # Continue numbering after the seeded documents, then derive summaries and rollups
+        for series, collection_name in [
+            ("invoice", "invoices"), ("expense", "expenses"), ("payment", "payments"), ("solar_project", "solar_projects")
+        ]:
+            await server.db.counters.update_one(
+                {"_id": server.DocumentNumberAllocator.counter_id(business_id, series)},
+                {"$max": {"value": len(data[collection_name])}, "$setOnInsert": {"business_id": business_id, "series": series}},
+                upsert=True
+            )
+        await server.verify_business_summary(business_id, fix=True)
+        await server.rebuild_monthly_rollups(business_id)
+        await server.bump_change_versions(business_id, *SEEDED_COLLECTIONS)
+
+        report.append({
+            "business_index": index,
+            "business_id": business_id,
+            "owner_email": owner_email,
+            "documents": {name: len(data[name]) for name in SEEDED_COLLECTIONS},
+            "elapsed_s": round(time.perf_counter() - started, 2)
+        })
+
+    print(json.dumps({"seed": args.seed, "password": SEED_PASSWORD, "businesses": report}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--businesses", type=int, default=2)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--vendors", type=int, default=50)
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--invoices", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=5, help="maximum line items per invoice")
+    parser.add_argument("--payments", type=int, default=3000)
+    parser.add_argument("--expenses", type=int, default=2000)
+    parser.add_argument("--solar-projects", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365, help="spread document dates over this many days from 2024-04-01")
+    parser.add_argument("--reset", action="store_true", help="delete and regenerate businesses that already exist")
+    sys.exit(asyncio.run(main(parser.parse_args())))
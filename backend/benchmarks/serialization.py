@@ -0,0 +1,113 @@
+"""CPU cost of rendering invoice list pages: response_model validation vs the trusted orjson path.
+
+Needs no database or running server:
+
+    python benchmarks/serialization.py --invoices 1000 --lines 5
+
+The "validated" path mirrors what FastAPI does for `response_model=Page[Invoice]`:
+validate every document into the models, jsonable_encoder, then json.dumps.
+The "trusted" path is what list routes now do via trusted_json().
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import server  # noqa: E402
+
+
+def make_invoices(count, lines, seed):
+    rng = random.Random(seed)
+    start = datetime(2024, 4, 1, tzinfo=timezone.utc)
+    invoices = []
+    for index in range(count):
+        items = []
+        for line in range(lines):
+            quantity = rng.randint(1, 10)
+            price = round(rng.uniform(10, 5000), 2)
+            items.append({
+                "product_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "product_name": f"Product {line}",
+                "quantity": quantity,
+                "price": price,
+                "tax_rate": 18.0,
+                "discount": 0.0,
+                "amount": quantity * price
+            })
+        subtotal = sum(item["amount"] for item in items)
+        total = subtotal * 1.18
+        when = (start + timedelta(hours=index)).isoformat()
+        invoices.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "invoice_number": f"INV-{index + 1:05d}",
+            "customer_id": "customer",
+            "customer_name": "Customer",
+            "business_id": "business",
+            "invoice_date": when,
+            "due_date": None,
+            "items": items,
+            "subtotal": subtotal,
+            "tax_amount": total - subtotal,
+            "discount": 0.0,
+            "total": total,
+            "paid_amount": 0.0,
+            "balance": total,
+            "status": "unpaid",
+            "notes": None,
+            "created_at": when
+        })
+    return invoices
+
+
+def validated(page):
+    model = server.Page[server.Invoice].model_validate(page)
+    return json.dumps(jsonable_encoder(model)).encode("utf-8")
+
+
+def trusted(page):
+    return server.trusted_json(page).body
+
+
+def cpu_time(fn, page, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        fn(page)
+    return (time.process_time() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invoices", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    page = {"items": make_invoices(args.invoices, args.lines, args.seed), "next_cursor": None}
+    validated_s = cpu_time(validated, page, args.repeat)
+    trusted_s = cpu_time(trusted, page, args.repeat)
+
+    print(json.dumps({
+        "benchmark": "serialization",
+        "invoices": args.invoices,
+        "lines_per_invoice": args.lines,
+        "validated_cpu_ms": round(validated_s * 1000, 2),
+        "trusted_cpu_ms": round(trusted_s * 1000, 2),
+        "cpu_ms_saved_per_1000_invoices": round((validated_s - trusted_s) * 1000 * 1000 / args.invoices, 2),
+        "speedup": round(validated_s / trusted_s, 1)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
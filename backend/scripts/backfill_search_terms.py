@@ -0,0 +1,68 @@
+"""Populate the search_terms / search_grams arrays behind /customers/search and /products/search.
+
+Documents written before typeahead search existed have no search arrays and are
+invisible to it. This walks each searchable collection by _id in batches and
+recomputes the arrays with the server's own tokenizer; --all also refreshes
+documents that already have them (e.g. after changing SEARCHABLE_FIELDS):
+
+    python scripts/backfill_search_terms.py
+    python scripts/backfill_search_terms.py --collection products --all
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+async def backfill_collection(name, batch_size, refresh_all):
+    collection = server.db[name]
+    query = {} if refresh_all else {"search_terms": {"$exists": False}}
+    projection = {field: 1 for field in server.SEARCHABLE_FIELDS[name]}
+
+    updated = 0
+    last_id = None
+    while True:
+        batch_query = {**query, "_id": {"$gt": last_id}} if last_id is not None else query
+        docs = await collection.find(batch_query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        operations = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": server.search_fields(name, doc)})
+            for doc in docs
+        ]
+        result = await collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+    return updated
+
+
+async def main(args) -> int:
+    server.connect_mongo()
+    collections = list(server.SEARCHABLE_FIELDS)
+    if args.collection:
+        if args.collection not in collections:
+            print(f"Unknown collection {args.collection}; choose from {', '.join(collections)}")
+            return 2
+        collections = [args.collection]
+
+    await server.ensure_indexes()
+    for name in collections:
+        updated = await backfill_collection(name, args.batch_size, args.all)
+        print(f"{name}: updated {updated} documents")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", help="only backfill this collection")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--all", action="store_true", help="recompute documents that already have search arrays")
+    sys.exit(asyncio.run(main(parser.parse_args())))
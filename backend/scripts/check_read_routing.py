@@ -0,0 +1,83 @@
+"""Show which replica set member serves the analytic reads and which serves everything else.
+
+Uses MONGO_URL / DB_NAME and the ANALYTICS_* settings from backend/.env like the server does.
+Against a three-node replica set with ANALYTICS_READ_PREFERENCE=secondaryPreferred the
+analytic queries should land on a secondary and the primary queries on the primary:
+
+    ANALYTICS_READ_PREFERENCE=secondaryPreferred python scripts/check_read_routing.py
+
+On a standalone or single-node replica set every query is served by the one member.
+Exits 1 if an analytic query reached the primary while a secondary was eligible.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+BUSINESS = "read-routing-check"
+
+
+class LastServer(monitoring.CommandListener):
+    """Remembers the member address the driver sent the latest command to"""
+
+    address = None
+
+    def started(self, event):
+        self.address = "%s:%s" % event.connection_id
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def main() -> int:
+    # A client configured exactly like the server's, plus a listener to see where each read goes
+    listener = LastServer()
+    options = {**server.mongo_client_options(), "event_listeners": [listener]}
+    client = AsyncIOMotorClient(server.mongo_url, **options)
+    db = client[server.DB_NAME]
+    analytics_db = client.get_database(server.DB_NAME, read_preference=server.analytics_read_preference())
+
+    # (label, database, collection, filter)
+    queries = [
+        ("primary   GET /invoices", db, "invoices", {"business_id": BUSINESS}),
+        ("primary   GET /products", db, "products", {"business_id": BUSINESS}),
+        ("analytics GET /dashboard/stats", analytics_db, "business_summaries", {"_id": BUSINESS}),
+        ("analytics GET /reports/sales", analytics_db, "invoices", {"business_id": BUSINESS}),
+        ("analytics GET /reports/* rollups", analytics_db, "monthly_rollups", {"business_id": BUSINESS}),
+        ("analytics GET /solar/dashboard", analytics_db, "solar_projects", {"business_id": BUSINESS}),
+    ]
+
+    hello = await client.admin.command("hello")
+    primary = hello.get("primary")
+    secondaries = [host for host in hello.get("hosts", []) if host != primary]
+    print(f"replica set: {hello.get('setName') or '(standalone)'}  primary: {primary}  secondaries: {secondaries}")
+    print(f"analytics read preference: {analytics_db.read_preference}\n")
+
+    misrouted = []
+    for label, database, collection, query in queries:
+        await database[collection].find_one(query)
+        served_by = listener.address
+        role = "primary" if primary is None or served_by == primary else "secondary"
+        print(f"{label:36} -> {served_by} ({role})")
+        if label.startswith("analytics") and role == "primary" and secondaries \
+                and server.ANALYTICS_READ_PREFERENCE in ("secondary", "secondaryPreferred"):
+            misrouted.append(label)
+
+    client.close()
+    if misrouted:
+        print(f"\n{len(misrouted)} analytic queries reached the primary although secondaries exist")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,121 @@
+"""Convert ISO-string date fields to native BSON dates, online and in batches.
+
+Older documents stored every date with .isoformat(). This walks each collection in
+DOCUMENT_DATE_FIELDS by _id, converts string dates with the server's codec and writes
+them back with unordered bulk writes, then bumps the change versions of the businesses
+(or users) it touched so ETags and cached report jobs stop serving the old representation.
+Only string values are touched, so the script is idempotent and can be stopped and re-run
+while the API is serving traffic:
+
+    python scripts/migrate_dates_to_bson.py --dry-run
+    python scripts/migrate_dates_to_bson.py --batch-size 1000 --pause 0.05
+    python scripts/migrate_dates_to_bson.py --collection invoices
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+async def bump_versions(name, docs):
+    """Invalidate cached copies of a batch of rewritten documents"""
+    if name == "users":
+        for doc in docs:
+            await server.bump_user_version(doc["id"])
+        return
+
+    if name == "businesses":
+        business_ids = {doc["id"] for doc in docs}
+    else:
+        business_ids = {doc["business_id"] for doc in docs if doc.get("business_id")}
+        # Solar project children carry only their project's id
+        project_ids = [doc["project_id"] for doc in docs if doc.get("project_id") and not doc.get("business_id")]
+        if project_ids:
+            business_ids.update(await server.db.solar_projects.distinct("business_id", {"id": {"$in": project_ids}}))
+
+    versions = [name, "product_catalog"] if name == "products" else [name]
+    for business_id in business_ids:
+        await server.bump_change_versions(business_id, *versions)
+
+
+async def migrate_collection(name, fields, batch_size, pause, dry_run):
+    collection = server.db[name]
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {"id": 1, "business_id": 1, "project_id": 1, **{field: 1 for field in fields}}
+
+    converted = 0
+    failed = 0
+    last_id = None
+    while True:
+        batch_query = {**query, "_id": {"$gt": last_id}} if last_id is not None else query
+        docs = await collection.find(batch_query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        operations = []
+        changed = []
+        for doc in docs:
+            updates = {}
+            for field in fields:
+                value = doc.get(field)
+                if isinstance(value, str):
+                    try:
+                        updates[field] = server.to_utc_datetime(value)
+                    except ValueError:
+                        failed += 1
+                        print(f"  {name} {doc['_id']}: cannot parse {field}={value!r}")
+            if updates:
+                # Match the string value too, so a concurrent rewrite of the field is never clobbered
+                match = {"_id": doc["_id"], **{field: doc[field] for field in updates}}
+                operations.append(UpdateOne(match, {"$set": updates}))
+                changed.append(doc)
+
+        if operations and not dry_run:
+            result = await collection.bulk_write(operations, ordered=False)
+            converted += result.modified_count
+            await bump_versions(name, changed)
+        else:
+            converted += len(operations)
+
+        if pause:
+            await asyncio.sleep(pause)
+
+    return converted, failed
+
+
+async def main(args) -> int:
+    server.connect_mongo()
+    collections = server.DOCUMENT_DATE_FIELDS
+    if args.collection:
+        if args.collection not in collections:
+            print(f"Unknown collection {args.collection}; choose from {', '.join(collections)}")
+            return 2
+        collections = {args.collection: collections[args.collection]}
+
+    total_failed = 0
+    for name, fields in collections.items():
+        converted, failed = await migrate_collection(name, fields, args.batch_size, args.pause, args.dry_run)
+        total_failed += failed
+        verb = "would convert" if args.dry_run else "converted"
+        print(f"{name}: {verb} {converted} documents, {failed} unparseable values")
+
+    if not args.dry_run:
+        # Monthly rollups were bucketed with $toDate and are unaffected; summaries hold no dates
+        print("Done. Re-run until every collection reports 0 to catch writes made by older workers.")
+    return 1 if total_failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", help="only migrate this collection")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,48 @@
+"""Verify (and optionally rebuild) the business_summaries documents behind /dashboard/stats.
+
+Recomputes every summary from the source collections and reports drift:
+
+    python scripts/rebuild_business_summary.py                 # all businesses, report only
+    python scripts/rebuild_business_summary.py --business-id X --fix
+    python scripts/rebuild_business_summary.py --rollups       # also rebuild report monthly rollups
+
+Exits 1 when drift is found and --fix was not given.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+async def main(args) -> int:
+    server.connect_mongo()
+    if args.business_id:
+        business_ids = [args.business_id]
+    else:
+        business_ids = [doc["id"] async for doc in server.db.businesses.find({}, {"_id": 0, "id": 1})]
+
+    drifted = 0
+    for business_id in business_ids:
+        drift = await server.verify_business_summary(business_id, fix=args.fix)
+        if drift:
+            drifted += 1
+            action = "rebuilt" if args.fix else "drift"
+            print(json.dumps({"business_id": business_id, action: drift}, default=str))
+        if args.rollups:
+            await server.rebuild_monthly_rollups(business_id)
+
+    print(f"{len(business_ids)} businesses checked, {drifted} with drift{' (fixed)' if args.fix else ''}")
+    return 1 if drifted and not args.fix else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--business-id", help="only check this business")
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted summaries with recomputed values")
+    parser.add_argument("--rollups", action="store_true", help="recompute the monthly report rollups as well")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,34 +1,364 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+import time
+
+# Taken before the framework imports so startup metrics cover the whole module import
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from bson import json_util
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
 import os
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError, create_model
+from typing import List, Optional, Dict, Any, Generic, Type, TypeVar, Tuple
+import re
 import uuid
-from datetime import datetime, timezone, timedelta
+import base64
+import csv
+import hashlib
+import io
+import json
+import zipfile
+import zlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timezone, timedelta
 import bcrypt
+import orjson
 import jwt
 from decimal import Decimal
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Metrics Configuration
+# Mongo commands slower than this are logged with their route and query shape; 0 disables the log
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))
+# When set, GET /metrics requires `Authorization: Bearer <token>`
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# ============= METRICS =============
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the last body byte", ["method", "route"]
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "HTTP response body size", ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", multiprocess_mode="livesum"
+)
+APP_STARTUP_SECONDS = Gauge(
+    "app_startup_seconds", "Seconds from module import start to each startup milestone", ["phase"]
+)
+BACKGROUND_JOBS_SUBMITTED = Counter(
+    "background_jobs_submitted_total", "Job submissions, by whether an existing job was reused", ["kind", "outcome"]
+)
+BACKGROUND_JOB_DURATION = Histogram(
+    "background_job_duration_seconds", "Background job run time by final status", ["kind", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency", ["command", "collection"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total", "MongoDB commands that returned an error", ["command", "collection"]
+)
+MONGO_DOCUMENTS_RETURNED = Counter(
+    "mongodb_documents_returned_total", "Documents returned by find/aggregate/getMore batches", ["collection", "route"]
+)
+
+# ASGI scope of the request being served; routing fills in scope["route"] before any query runs
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+slow_query_logger = logging.getLogger("slow_queries")
+
+def route_label(scope: Optional[dict]) -> str:
+    route = scope.get("route") if scope else None
+    return getattr(route, "path", None) or "unmatched"
+
+def command_shape(command_name: str, command) -> str:
+    """Field names and operators of a query without its values, safe to log"""
+    def shape(value):
+        if isinstance(value, dict):
+            return {key: shape(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [shape(item) for item in value]
+        return "?"
+
+    if command_name == "find":
+        return json.dumps({"filter": shape(command.get("filter", {})), "sort": list(command.get("sort", {}))})
+    if command_name == "aggregate":
+        return json.dumps([next(iter(stage)) for stage in command.get("pipeline", [])])
+    if command_name in ("count", "distinct", "findAndModify"):
+        return json.dumps({"query": shape(command.get("query", {}))})
+    return ""
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command by collection, counts returned documents per route and logs slow queries"""
+
+    def __init__(self):
+        self._started: Dict[tuple, tuple] = {}
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = command.get("collection")
+        if not isinstance(collection, str):
+            collection = ""
+        shape = command_shape(event.command_name, command) if SLOW_QUERY_MS > 0 else ""
+        self._started[self._key(event)] = (collection, route_label(current_scope.get()), shape)
+
+    def succeeded(self, event):
+        collection, route, shape = self._started.pop(self._key(event), ("", "unmatched", ""))
+        seconds = event.duration_micros / 1_000_000
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(seconds)
+        
+        cursor = event.reply.get("cursor") if isinstance(event.reply, dict) else None
+        if isinstance(cursor, dict):
+            batch = cursor.get("firstBatch", cursor.get("nextBatch", []))
+            MONGO_DOCUMENTS_RETURNED.labels(collection, route).inc(len(batch))
+        
+        if SLOW_QUERY_MS > 0 and seconds * 1000 >= SLOW_QUERY_MS:
+            slow_query_logger.warning(
+                "slow %s on %s took %.1f ms (route %s) %s",
+                event.command_name, collection, seconds * 1000, route, shape
+            )
+
+    def failed(self, event):
+        collection, _, _ = self._started.pop(self._key(event), ("", "unmatched", ""))
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1_000_000)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route count, latency, in-flight and body size, streaming included"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status_code = 500
+        body_bytes = 0
+        
+        async def send_wrapper(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+        
+        token = current_scope.set(scope)
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            current_scope.reset(token)
+            route = route_label(scope)
+            if startup_timings["first_response_seconds"] is None:
+                record_startup_phase("first_response_seconds")
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, route).observe(elapsed)
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(body_bytes)
+
+# Seconds since IMPORT_STARTED at which this process finished importing, started serving, became ready and first answered
+startup_timings: Dict[str, Optional[float]] = {
+    "import_seconds": None,
+    "live_seconds": None,
+    "ready_seconds": None,
+    "first_response_seconds": None,
+}
+
+def record_startup_phase(phase: str) -> None:
+    startup_timings[phase] = round(time.perf_counter() - IMPORT_STARTED, 4)
+    APP_STARTUP_SECONDS.labels(phase.removesuffix("_seconds")).set(startup_timings[phase])
+
+def render_metrics() -> bytes:
+    # Under several uvicorn workers each process writes to PROMETHEUS_MULTIPROC_DIR and any one can serve the sum
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+# MongoDB connection Configuration
+# Per process: with N uvicorn workers the deployment opens up to N * MONGO_MAX_POOL_SIZE connections
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '0'))  # 0 keeps idle connections
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0'))  # 0 waits for a free connection
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '0'))  # 0 never times out a socket read
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')  # e.g. zstd,snappy,zlib; empty disables compression
+MONGO_ZLIB_COMPRESSION_LEVEL = int(os.environ.get('MONGO_ZLIB_COMPRESSION_LEVEL', '-1'))
+
+# Analytics read routing Configuration
+# Where /reports/*, /dashboard/stats and /solar/dashboard read from: primary, primaryPreferred,
+# secondaryPreferred, secondary or nearest. Everything else always reads from the primary.
+ANALYTICS_READ_PREFERENCE = os.environ.get('ANALYTICS_READ_PREFERENCE', 'primary')
+# Skip secondaries lagging more than this; -1 for no bound, otherwise at least 90
+ANALYTICS_MAX_STALENESS_SECONDS = int(os.environ.get('ANALYTICS_MAX_STALENESS_SECONDS', '90'))
+
+READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondaryPreferred": SecondaryPreferred,
+    "secondary": Secondary,
+    "nearest": Nearest,
+}
+
+def mongo_client_options() -> dict:
+    options = {
+        "tz_aware": True,
+        "event_listeners": [MongoCommandMetrics()],
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS or None,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS or None,
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+        options["zlibCompressionLevel"] = MONGO_ZLIB_COMPRESSION_LEVEL
+    return options
+
+def analytics_read_preference():
+    if ANALYTICS_READ_PREFERENCE == "primary":
+        return Primary()
+    if ANALYTICS_READ_PREFERENCE not in READ_PREFERENCES:
+        raise ValueError(
+            f"ANALYTICS_READ_PREFERENCE must be primary or one of: {', '.join(READ_PREFERENCES)}"
+        )
+    return READ_PREFERENCES[ANALYTICS_READ_PREFERENCE](max_staleness=ANALYTICS_MAX_STALENESS_SECONDS)
+
 # MongoDB connection
+# Opened by connect_mongo() from the app lifespan, i.e. in each worker after any fork, or by scripts
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+DB_NAME = os.environ['DB_NAME']
+client: Optional[AsyncIOMotorClient] = None
+db = None
+# Same database for analytic reads that tolerate bounded staleness; writes through it still go to the primary
+analytics_db = None
+
+def connect_mongo() -> None:
+    global client, db, analytics_db
+    if client is not None:
+        return
+    client = AsyncIOMotorClient(mongo_url, **mongo_client_options())
+    db = client[DB_NAME]
+    analytics_db = client.get_database(DB_NAME, read_preference=analytics_read_preference())
+
+def close_mongo() -> None:
+    global client, db, analytics_db
+    if client is not None:
+        client.close()
+    client = db = analytics_db = None
 
 # JWT Configuration
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
-# Create the main app
-app = FastAPI()
+# Password hashing Configuration
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_EXECUTOR = os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread')  # thread, process
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '32'))
+
+# Document numbering Configuration
+# Numbers each worker reserves per counter round trip; 1 keeps numbering gapless
+DOCUMENT_NUMBER_BLOCK_SIZE = int(os.environ.get('DOCUMENT_NUMBER_BLOCK_SIZE', '1'))
+
+# Transactions Configuration
+MONGO_TRANSACTIONS = os.environ.get('MONGO_TRANSACTIONS', 'auto')  # auto, on, off
+
+# Index bootstrap Configuration
+ENSURE_INDEXES_ON_STARTUP = os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+
+# Bulk invoicing Configuration
+INVOICE_BATCH_MAX_SIZE = int(os.environ.get('INVOICE_BATCH_MAX_SIZE', '1000'))
+
+# Bulk import Configuration
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get('IMPORT_MAX_REPORTED_ERRORS', '1000'))
+# Longest CSV record, quoted line breaks included, before it is reported as a row error
+IMPORT_MAX_RECORD_BYTES = int(os.environ.get('IMPORT_MAX_RECORD_BYTES', '131072'))
+
+# Export Configuration
+EXPORT_CURSOR_BATCH_SIZE = int(os.environ.get('EXPORT_CURSOR_BATCH_SIZE', '1000'))
+EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS', '500'))
+
+# Typeahead search Configuration
+SEARCH_DEFAULT_LIMIT = int(os.environ.get('SEARCH_DEFAULT_LIMIT', '10'))
+SEARCH_MAX_LIMIT = int(os.environ.get('SEARCH_MAX_LIMIT', '50'))
+
+# Pagination Configuration
+DEFAULT_PAGE_LIMIT = int(os.environ.get('DEFAULT_PAGE_LIMIT', '50'))
+MAX_PAGE_LIMIT = int(os.environ.get('MAX_PAGE_LIMIT', '500'))
+
+# Authenticated user cache Configuration
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', '30'))
+USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', '10000'))
+
+# Product catalog cache Configuration
+PRODUCT_CATALOG_CACHE_MAX_BUSINESSES = int(os.environ.get('PRODUCT_CATALOG_CACHE_MAX_BUSINESSES', '1000'))
+PRODUCT_CATALOG_CACHE_MAX_PRODUCTS = int(os.environ.get('PRODUCT_CATALOG_CACHE_MAX_PRODUCTS', '5000'))
+
+# Background jobs Configuration
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))  # per process; 0 leaves jobs to other processes
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', '5'))  # idle workers look for jobs queued elsewhere
+JOB_STALE_SECONDS = float(os.environ.get('JOB_STALE_SECONDS', '120'))  # running jobs without a heartbeat are requeued
+JOB_RESULT_CACHE_SECONDS = float(os.environ.get('JOB_RESULT_CACHE_SECONDS', '600'))
+JOB_RETENTION_HOURS = float(os.environ.get('JOB_RETENTION_HOURS', '24'))
+JOB_RESULT_MAX_BYTES = int(os.environ.get('JOB_RESULT_MAX_BYTES', str(8 * 1024 * 1024)))
+
+# Invoice PDF Configuration
+PDF_RENDER_EXECUTOR = os.environ.get('PDF_RENDER_EXECUTOR', 'process')  # thread, process
+PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', str(os.cpu_count() or 2)))
+PDF_RENDER_CHUNK_SIZE = int(os.environ.get('PDF_RENDER_CHUNK_SIZE', '20'))  # PDFs per pool task in batches
+PDF_BATCH_MAX_INVOICES = int(os.environ.get('PDF_BATCH_MAX_INVOICES', '500'))
+PDF_CACHE_TTL_HOURS = float(os.environ.get('PDF_CACHE_TTL_HOURS', '720'))
+
+# Startup Configuration
+# Connections opened concurrently at startup so the first requests do not pay for TCP/TLS handshakes
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', '4'))
+READINESS_TIMEOUT_SECONDS = float(os.environ.get('READINESS_TIMEOUT_SECONDS', '2'))
+# Pause before retrying a failed warm-up; readiness stays 503 until one succeeds
+WARMUP_RETRY_SECONDS = float(os.environ.get('WARMUP_RETRY_SECONDS', '5'))
+
+# The app itself is built by create_app() at the bottom of this module
 api_router = APIRouter(prefix="/api")
 security = HTTPBearer()
 
@@ -183,6 +513,16 @@ class InvoiceCreate(BaseModel):
     discount: float = 0.0
     notes: Optional[str] = None
 
+class InvoiceBatchCreate(BaseModel):
+    invoices: List[InvoiceCreate]
+
+class InvoiceBatchResult(BaseModel):
+    index: int
+    status: str  # created, error
+    invoice_id: Optional[str] = None
+    invoice_number: Optional[str] = None
+    detail: Optional[str] = None
+
 class ExpenseCategory(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -243,6 +583,55 @@ class PaymentCreate(BaseModel):
     reference: Optional[str] = None
     notes: Optional[str] = None
 
+class Job(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    business_id: str
+    user_id: str
+    kind: str
+    params: Dict[str, Any] = {}
+    status: str = "queued"  # queued, running, completed, failed
+    progress: int = 0
+    error: Optional[str] = None
+    media_type: Optional[str] = None
+    filename: Optional[str] = None
+    result_bytes: Optional[int] = None
+    result_url: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class InvoicePdfBatch(BaseModel):
+    invoice_ids: List[str]
+
+class JobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+class ReportJobParams(BaseModel):
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+    date_from: Optional[date] = Field(None, alias="from")
+    date_to: Optional[date] = Field(None, alias="to")
+    granularity: Optional[str] = None
+
+class ExportJobParams(BaseModel):
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+    entity: str
+    export_format: str = Field("csv", alias="format")
+    date_from: Optional[date] = Field(None, alias="from")
+    date_to: Optional[date] = Field(None, alias="to")
+    flatten_items: bool = False
+
+class GstSummaryJobParams(BaseModel):
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+    month: Optional[str] = None
+    date_from: Optional[date] = Field(None, alias="from")
+    date_to: Optional[date] = Field(None, alias="to")
+    export_format: str = Field("json", alias="format")
+
+class NoJobParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
 # ============= SOLAR BUSINESS MODELS =============
 
 class SolarProject(BaseModel):
@@ -371,14 +760,129 @@ class SubsidyTrackingCreate(BaseModel):
     application_number: Optional[str] = None
     remarks: Optional[str] = None
 
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+def sparse_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """`model` with every field but id optional, describing list items trimmed by `fields=`"""
+    return create_model(
+        f"Sparse{model.__name__}",
+        __config__=ConfigDict(extra="ignore"),
+        **{
+            name: (field.annotation, ...) if name == "id" else (Optional[field.annotation], None)
+            for name, field in model.model_fields.items()
+        }
+    )
+
+# ============= DOCUMENT CODEC =============
+
+# Date fields of each collection; all are stored as native BSON dates in UTC
+DOCUMENT_DATE_FIELDS: Dict[str, List[str]] = {
+    "users": ["created_at"],
+    "businesses": ["created_at"],
+    "customers": ["created_at"],
+    "vendors": ["created_at"],
+    "products": ["created_at"],
+    "invoices": ["invoice_date", "due_date", "created_at"],
+    "expense_categories": ["created_at"],
+    "expenses": ["expense_date", "created_at"],
+    "payments": ["payment_date", "created_at"],
+    "solar_projects": ["start_date", "completion_date", "created_at"],
+    "project_milestones": ["due_date", "completion_date", "created_at"],
+    "material_consumption": ["consumption_date", "created_at"],
+    "government_documents": ["issue_date", "expiry_date", "created_at"],
+    "subsidy_tracking": ["application_date", "approval_date", "received_date", "created_at"],
+}
+
+def to_utc_datetime(value) -> datetime:
+    """Aware UTC datetime from a datetime or an ISO string; naive values are taken as UTC"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def encode_value(value):
+    """Convert a value for storage: datetimes to UTC, dates to UTC midnight, recursively"""
+    if isinstance(value, datetime):
+        return to_utc_datetime(value)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [encode_value(item) for item in value]
+    return value
+
+def to_document(model: BaseModel) -> dict:
+    """Mongo document for a model, with dates kept as native BSON dates"""
+    return encode_value(model.model_dump())
+
 # ============= AUTH HELPERS =============
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+class PasswordHasher:
+    """Runs bcrypt in a bounded worker pool so hashing never blocks the event loop.
+
+    Calls beyond max_pending are shed with a 503 instead of queueing behind the pool.
+    """
+
+    def __init__(self, executor_kind: str, workers: int, max_pending: int):
+        if executor_kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor_kind}")
+        self.executor_kind = executor_kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so process pools are started after the server has forked its workers
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication attempts, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, BCRYPT_ROUNDS)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -394,208 +898,2412 @@ def decode_token(token: str) -> dict:
     except jwt.JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+class UserCache:
+    """In-process TTL cache of authenticated users keyed by token sub, evicting least recently used.
+
+    Entries are tagged with the user's change version (see bump_user_version) and only
+    served while it matches, so a change made through any worker is seen by all of them.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, user_id: str, version: int) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, cached_version, user = entry
+        if expires_at <= time.monotonic() or cached_version != version:
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def set(self, user_id: str, version: int, user: User) -> None:
+        if not self.enabled:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, version, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+user_cache = UserCache(USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_SIZE)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     token = credentials.credentials
     payload = decode_token(token)
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    
+
+    # Read the version before the user, so a racing change can only make the entry stale
+    version = 0
+    if user_cache.enabled:
+        version = (await get_change_versions(user_version_key(user_id), ["user"]))["user"]
+        cached_user = user_cache.get(user_id, version)
+        if cached_user is not None:
+            return cached_user
+
     user_doc = await db.users.find_one({"id": user_id}, {"_id": 0})
     if not user_doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    return User(**user_doc)
+
+    user = User(**user_doc)
+    user_cache.set(user_id, version, user)
+    return user
+
+def user_version_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+async def bump_user_version(user_id: str) -> None:
+    """Drop a user's cached copy in every worker; call after every write to the user"""
+    await bump_change_versions(user_version_key(user_id), "user")
 
 # ============= UTILITY FUNCTIONS =============
 
+_transactions_supported: Optional[bool] = None
+
+async def transactions_supported() -> bool:
+    """Multi-document transactions need a replica set or sharded cluster"""
+    global _transactions_supported
+    if MONGO_TRANSACTIONS != 'auto':
+        return MONGO_TRANSACTIONS == 'on'
+    if _transactions_supported is None:
+        hello = await client.admin.command("hello")
+        _transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _transactions_supported
+
+async def run_in_transaction(callback):
+    """Run `await callback(session)` in one transaction; on a standalone mongod session is None"""
+    if not await transactions_supported():
+        return await callback(None)
+    async with await client.start_session() as session:
+        return await session.with_transaction(callback)
+
+def stock_movements(quantities: Dict[str, float]) -> List[UpdateOne]:
+    """One $inc per product, for a bulk_write of every stock change in a document"""
+    return [
+        UpdateOne({"id": product_id}, {"$inc": {"stock_quantity": quantity}})
+        for product_id, quantity in quantities.items()
+        if quantity
+    ]
+
+def merge_stock_decrements(items) -> Dict[str, float]:
+    decrements: Dict[str, float] = {}
+    for item in items:
+        decrements[item.product_id] = decrements.get(item.product_id, 0) - item.quantity
+    return decrements
+
+async def bump_change_versions(business_id: str, *collections: str, session=None) -> None:
+    """Mark collections of a business as changed; call after every write to them, never before"""
+    await db.change_versions.update_one(
+        {"_id": business_id},
+        {"$inc": {collection: 1 for collection in collections}},
+        upsert=True,
+        session=session
+    )
+
+async def get_change_versions(business_id: str, collections) -> Dict[str, int]:
+    doc = await db.change_versions.find_one(
+        {"_id": business_id}, {collection: 1 for collection in collections}
+    ) or {}
+    return {collection: doc.get(collection, 0) for collection in collections}
+
+class ProductCatalogCache:
+    """In-process cache of each business's product definitions, keyed by id and evicting least recently used.
+
+    Entries are tagged with the business's product_catalog change version and revalidated
+    against it on every read, so a write through any worker is seen by all of them.
+    stock_quantity is left out: stock moves with every invoice, so it is always read from
+    Mongo and only product create, update, delete and import bump product_catalog.
+    Catalogs larger than max_products are never cached and are queried directly.
+    """
+
+    projection = {"_id": 0, "search_terms": 0, "search_grams": 0, "stock_quantity": 0}
+
+    def __init__(self, max_businesses: int, max_products: int):
+        self.max_businesses = max_businesses
+        self.max_products = max_products
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # business id -> (version, products)
+        self._oversized: Dict[str, int] = {}  # business id -> version seen too large to cache
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_businesses > 0 and self.max_products > 0
+
+    async def _catalog(self, business_id: str) -> Optional[Dict[str, dict]]:
+        if not self.enabled:
+            return None
+        
+        # Read the version before the products, so a racing write can only make the entry stale
+        version = (await get_change_versions(business_id, ["product_catalog"]))["product_catalog"]
+        
+        entry = self._entries.get(business_id)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(business_id)
+            self.hits += 1
+            return entry[1]
+        
+        self.misses += 1
+        if self._oversized.get(business_id) == version:
+            return None
+        
+        docs = await db.products.find(
+            {"business_id": business_id}, self.projection
+        ).to_list(self.max_products + 1)
+        if len(docs) > self.max_products:
+            self._entries.pop(business_id, None)
+            self._oversized[business_id] = version
+            return None
+        
+        self._oversized.pop(business_id, None)
+        products = {doc["id"]: doc for doc in docs}
+        self._entries[business_id] = (version, products)
+        self._entries.move_to_end(business_id)
+        while len(self._entries) > self.max_businesses:
+            self._entries.popitem(last=False)
+        return products
+
+    async def get_products(self, business_id: str, product_ids) -> Dict[str, dict]:
+        """The business's products among product_ids, keyed by id, without stock; unknown ids are left out"""
+        product_ids = list(set(product_ids))
+        catalog = await self._catalog(business_id)
+        if catalog is not None:
+            return {product_id: catalog[product_id] for product_id in product_ids if product_id in catalog}
+        
+        return {
+            doc["id"]: doc
+            async for doc in db.products.find(
+                {"business_id": business_id, "id": {"$in": product_ids}}, self.projection
+            )
+        }
+
+    @staticmethod
+    async def get_low_stock(business_id: str, limit: int) -> List[dict]:
+        """Products at or below their alert level; stock is never cached, so this reads Mongo"""
+        return await db.products.find(
+            {"business_id": business_id, "$expr": {"$lte": ["$stock_quantity", "$low_stock_alert"]}},
+            HIDE_SEARCH_FIELDS
+        ).limit(limit).to_list(limit)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._oversized.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "businesses": len(self._entries),
+            "products": sum(len(products) for _, products in self._entries.values()),
+            "max_businesses": self.max_businesses,
+            "max_products": self.max_products,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+product_catalog = ProductCatalogCache(PRODUCT_CATALOG_CACHE_MAX_BUSINESSES, PRODUCT_CATALOG_CACHE_MAX_PRODUCTS)
+
+class DocumentNumberAllocator:
+    """Per-business, per-series document numbers backed by an atomic $inc counter.
+
+    Each counter lives in the `counters` collection. With block_size > 1 a worker
+    reserves that many numbers per round trip and hands them out from memory;
+    numbers left in a block when the worker exits are skipped, never reused.
+    """
+
+    def __init__(self, block_size: int = 1):
+        self.block_size = max(1, block_size)
+        self._blocks: Dict[str, List[int]] = {}  # counter id -> [next, last]
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._seeded: set = set()
+
+    @staticmethod
+    def counter_id(business_id: str, series: str) -> str:
+        return f"{business_id}:{series}"
+
+    def format(self, series: str, number: int) -> str:
+        return f"{DOCUMENT_SERIES[series]['prefix']}-{number:05d}"
+
+    async def _seed(self, business_id: str, series: str) -> None:
+        """Start a new counter after the highest number issued before counters existed"""
+        key = self.counter_id(business_id, series)
+        if key in self._seeded:
+            return
+        
+        config = DOCUMENT_SERIES[series]
+        last_num = 0
+        last_doc = await db[config['collection']].find_one(
+            {"business_id": business_id},
+            {"_id": 0, config['field']: 1},
+            sort=[("created_at", -1)]
+        )
+        if last_doc and last_doc.get(config['field']):
+            try:
+                last_num = int(last_doc[config['field']].split("-")[-1])
+            except ValueError:
+                pass
+        
+        # $max keeps concurrent seeds from different workers idempotent
+        await db.counters.update_one(
+            {"_id": key},
+            {"$max": {"value": last_num}, "$setOnInsert": {"business_id": business_id, "series": series}},
+            upsert=True
+        )
+        self._seeded.add(key)
+
+    async def reserve_range(self, business_id: str, series: str, count: int, session=None) -> range:
+        """Atomically reserve `count` contiguous numbers straight from the counter.
+
+        Inside a transaction (session given) an aborted write gives the numbers back.
+        """
+        await self._seed(business_id, series)
+        counter = await db.counters.find_one_and_update(
+            {"_id": self.counter_id(business_id, series)},
+            {"$inc": {"value": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            session=session
+        )
+        last = counter['value']
+        return range(last - count + 1, last + 1)
+
+    async def next_number(self, business_id: str, series: str) -> int:
+        key = self.counter_id(business_id, series)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            block = self._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                reserved = await self.reserve_range(business_id, series, self.block_size)
+                block = [reserved.start, reserved.stop - 1]
+                self._blocks[key] = block
+            number = block[0]
+            block[0] += 1
+            return number
+
+    async def next(self, business_id: str, series: str) -> str:
+        return self.format(series, await self.next_number(business_id, series))
+
+DOCUMENT_SERIES = {
+    "invoice": {"prefix": "INV", "collection": "invoices", "field": "invoice_number"},
+    "expense": {"prefix": "EXP", "collection": "expenses", "field": "expense_number"},
+    "payment": {"prefix": "PAY", "collection": "payments", "field": "payment_number"},
+    "solar_project": {"prefix": "SOLAR", "collection": "solar_projects", "field": "project_number"},
+}
+
+document_numbers = DocumentNumberAllocator(DOCUMENT_NUMBER_BLOCK_SIZE)
+
 async def generate_invoice_number(business_id: str) -> str:
     """Generate auto-incremented invoice number"""
-    last_invoice = await db.invoices.find_one(
-        {"business_id": business_id},
-        {"_id": 0, "invoice_number": 1},
-        sort=[("created_at", -1)]
-    )
-    
-    if last_invoice and last_invoice.get("invoice_number"):
-        try:
-            last_num = int(last_invoice["invoice_number"].split("-")[-1])
-            return f"INV-{last_num + 1:05d}"
-        except:
-            pass
-    
-    return "INV-00001"
+    return await document_numbers.next(business_id, "invoice")
 
 async def generate_expense_number(business_id: str) -> str:
     """Generate auto-incremented expense number"""
-    last_expense = await db.expenses.find_one(
-        {"business_id": business_id},
-        {"_id": 0, "expense_number": 1},
-        sort=[("created_at", -1)]
-    )
-    
-    if last_expense and last_expense.get("expense_number"):
-        try:
-            last_num = int(last_expense["expense_number"].split("-")[-1])
-            return f"EXP-{last_num + 1:05d}"
-        except:
-            pass
-    
-    return "EXP-00001"
+    return await document_numbers.next(business_id, "expense")
 
 async def generate_payment_number(business_id: str) -> str:
     """Generate auto-incremented payment number"""
-    last_payment = await db.payments.find_one(
-        {"business_id": business_id},
-        {"_id": 0, "payment_number": 1},
-        sort=[("created_at", -1)]
-    )
-    
-    if last_payment and last_payment.get("payment_number"):
-        try:
-            last_num = int(last_payment["payment_number"].split("-")[-1])
-            return f"PAY-{last_num + 1:05d}"
-        except:
-            pass
-    
-    return "PAY-00001"
+    return await document_numbers.next(business_id, "payment")
 
-# ============= ROUTES =============
+def trusted_json(content: Any, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Render documents read straight from Mongo without revalidating them against the response model"""
+    return ORJSONResponse(content, headers=headers)
 
-@api_router.get("/")
-async def root():
-    return {"message": "Bill Book & Expense Management API"}
+def change_etag(request: Request, business_id: str, versions: Dict[str, int]) -> str:
+    """Validator for a GET response: the collections' change versions plus everything that shapes it"""
+    key = json.dumps([
+        request.app.version,
+        business_id,
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        sorted(versions.items())
+    ])
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '"'
 
-# AUTH ROUTES
-@api_router.post("/auth/signup")
-async def signup(user_data: UserCreate):
-    # Check if user exists
-    existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    # Hash password
-    hashed_password = hash_password(user_data.password)
-    
-    # Create user
-    user = User(
-        email=user_data.email,
-        name=user_data.name,
-        mobile=user_data.mobile
-    )
-    
-    user_doc = user.model_dump()
-    user_doc['password'] = hashed_password
-    user_doc['created_at'] = user_doc['created_at'].isoformat()
-    
-    await db.users.insert_one(user_doc)
-    
-    # Create token
-    token = create_access_token({"sub": user.id, "email": user.email})
-    
-    return {"user": user, "token": token}
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
 
-@api_router.post("/auth/login")
-async def login(credentials: UserLogin):
-    # Find user
-    user_doc = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user_doc:
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    # Verify password
-    if not verify_password(credentials.password, user_doc['password']):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    user = User(**{k: v for k, v in user_doc.items() if k != 'password'})
-    
-    # Create token
-    token = create_access_token({"sub": user.id, "email": user.email})
-    
-    return {"user": user, "token": token}
+async def conditional_json(request: Request, business_id: str, collections: List[str], load) -> Response:
+    """Answer 304 from the change versions alone when the client's copy is current, else `await load()`"""
+    versions = await get_change_versions(business_id, collections)
+    etag = change_etag(request, business_id, versions)
+    # no-cache lets browsers keep the body but revalidate it on every request
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return trusted_json(await load(), headers=headers)
 
-@api_router.get("/auth/me", response_model=User)
-async def get_me(current_user: User = Depends(get_current_user)):
-    return current_user
+def encode_cursor(sort_value: Any, doc_id: str) -> str:
+    raw = json_util.dumps([sort_value, doc_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip("=")
 
-# BUSINESS ROUTES
-@api_router.post("/businesses", response_model=Business)
-async def create_business(business_data: BusinessCreate, current_user: User = Depends(get_current_user)):
-    business = Business(**business_data.model_dump(), owner_id=current_user.id)
-    
-    doc = business.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
-    await db.businesses.insert_one(doc)
-    
-    # Update user's business_id
-    await db.users.update_one({"id": current_user.id}, {"$set": {"business_id": business.id}})
-    
-    return business
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, doc_id = json_util.loads(base64.urlsafe_b64decode(padded).decode('utf-8'))
+        return sort_value, doc_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-@api_router.get("/businesses", response_model=List[Business])
-async def get_businesses(current_user: User = Depends(get_current_user)):
-    businesses = await db.businesses.find({"owner_id": current_user.id}, {"_id": 0}).to_list(100)
-    return businesses
+def sparse_projection(model: Type[BaseModel], fields: Optional[str], default: Optional[dict] = None) -> Optional[dict]:
+    """Mongo projection for a comma-separated `fields=` parameter, checked against the model"""
+    if not fields:
+        return default
 
-@api_router.get("/businesses/{business_id}", response_model=Business)
-async def get_business(business_id: str, current_user: User = Depends(get_current_user)):
-    business = await db.businesses.find_one({"id": business_id}, {"_id": 0})
-    if not business:
-        raise HTTPException(status_code=404, detail="Business not found")
-    return business
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in model.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields for {model.__name__}: {', '.join(unknown)}"
+        )
+    return {"_id": 0, "id": 1, **{field: 1 for field in requested}}
 
-@api_router.put("/businesses/{business_id}", response_model=Business)
-async def update_business(business_id: str, business_data: BusinessCreate, current_user: User = Depends(get_current_user)):
-    result = await db.businesses.update_one(
-        {"id": business_id, "owner_id": current_user.id},
-        {"$set": business_data.model_dump()}
-    )
-    
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Business not found")
-    
-    business = await db.businesses.find_one({"id": business_id}, {"_id": 0})
-    return business
+async def paginate(
+    collection,
+    query: dict,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort_field: str = "created_at",
+    projection: Optional[dict] = None
+) -> dict:
+    """Return one newest-first page of `query` keyed on (sort_field, id)"""
+    projection = projection or {"_id": 0}
+    # An inclusion projection still needs the keyset fields to build next_cursor
+    strip_sort_field = projection.get("id") == 1 and sort_field not in projection
+    if strip_sort_field:
+        projection = {**projection, sort_field: 1}
 
-# CUSTOMER ROUTES
-@api_router.post("/customers", response_model=Customer)
-async def create_customer(customer_data: CustomerCreate, current_user: User = Depends(get_current_user)):
-    if not current_user.business_id:
-        raise HTTPException(status_code=400, detail="Please create a business first")
-    
-    customer = Customer(**customer_data.model_dump(), business_id=current_user.business_id)
-    
-    doc = customer.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
-    await db.customers.insert_one(doc)
-    return customer
+    if cursor:
+        sort_value, doc_id = decode_cursor(cursor)
+        query = {
+            **query,
+            "$or": [
+                {sort_field: {"$lt": sort_value}},
+                {sort_field: sort_value, "id": {"$lt": doc_id}}
+            ]
+        }
 
-@api_router.get("/customers", response_model=List[Customer])
-async def get_customers(current_user: User = Depends(get_current_user)):
+    docs = await collection.find(query, projection).sort(
+        [(sort_field, DESCENDING), ("id", DESCENDING)]
+    ).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1].get(sort_field), docs[-1]["id"])
+
+    if strip_sort_field:
+        for doc in docs:
+            doc.pop(sort_field, None)
+
+    return {"items": docs, "next_cursor": next_cursor}
+
+# ============= INDEXES =============
+
+def _id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], name="id_unique", unique=True)
+
+def _business_index(field: str, direction: int = DESCENDING) -> IndexModel:
+    return IndexModel([("business_id", ASCENDING), (field, direction)], name=f"business_id_{field}")
+
+def _business_unique_index(field: str) -> IndexModel:
+    return IndexModel([("business_id", ASCENDING), (field, ASCENDING)], name=f"business_id_{field}_unique", unique=True)
+
+def _business_page_index(field: str) -> IndexModel:
+    # id breaks ties between equal sort values so keyset pages never skip or repeat
+    return IndexModel(
+        [("business_id", ASCENDING), (field, DESCENDING), ("id", DESCENDING)],
+        name=f"business_id_{field}_id"
+    )
+
+def _project_index(field: str, direction: int = DESCENDING) -> IndexModel:
+    return IndexModel([("project_id", ASCENDING), (field, direction)], name=f"project_id_{field}")
+
+# Every filter and sort the routes issue, keyed by collection
+DECLARED_INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        _id_index(),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "businesses": [
+        _id_index(),
+        IndexModel([("owner_id", ASCENDING)], name="owner_id"),
+    ],
+    "customers": [
+        _id_index(),
+        _business_page_index("created_at"),
+        _business_index("search_terms", ASCENDING),
+        _business_index("search_grams", ASCENDING),
+    ],
+    "vendors": [_id_index(), _business_page_index("created_at")],
+    "products": [
+        _id_index(),
+        _business_page_index("created_at"),
+        _business_index("search_terms", ASCENDING),
+        _business_index("search_grams", ASCENDING),
+    ],
+    "invoices": [
+        _id_index(),
+        _business_page_index("created_at"),
+        _business_index("invoice_date"),
+        _business_index("status", ASCENDING),
+        _business_unique_index("invoice_number"),
+    ],
+    "expense_categories": [_id_index(), _business_index("created_at")],
+    "expenses": [
+        _id_index(),
+        _business_page_index("created_at"),
+        _business_index("expense_date"),
+        _business_unique_index("expense_number"),
+    ],
+    "payments": [
+        _id_index(),
+        _business_page_index("created_at"),
+        _business_index("payment_date"),
+        _business_unique_index("payment_number"),
+    ],
+    "solar_projects": [
+        _id_index(),
+        _business_page_index("created_at"),
+        _business_unique_index("project_number"),
+    ],
+    "project_milestones": [_id_index(), _project_index("created_at", ASCENDING)],
+    "material_consumption": [_id_index(), _project_index("consumption_date")],
+    "government_documents": [_id_index(), _project_index("created_at")],
+    "monthly_rollups": [
+        IndexModel([("business_id", ASCENDING), ("kind", ASCENDING), ("month", ASCENDING)], name="business_id_kind_month"),
+    ],
+    "subsidy_tracking": [
+        _id_index(),
+        _project_index("created_at"),
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    "rendered_pdfs": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "jobs": [
+        _id_index(),
+        _business_index("cache_key", ASCENDING),
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+def _index_signature(spec) -> dict:
+    return {"key": list(spec["key"].items()), "unique": bool(spec.get("unique", False))}
+
+async def get_index_drift() -> Dict[str, Dict[str, List[str]]]:
+    """Compare live indexes with DECLARED_INDEXES; only collections with drift are returned"""
+    drift = {}
+    for collection_name, models in DECLARED_INDEXES.items():
+        declared = {model.document["name"]: _index_signature(model.document) for model in models}
+        live = {}
+        async for spec in db[collection_name].list_indexes():
+            if spec["name"] != "_id_":
+                live[spec["name"]] = _index_signature(spec)
+        
+        report = {
+            "missing": sorted(name for name in declared if name not in live),
+            "mismatched": sorted(name for name in declared if name in live and live[name] != declared[name]),
+            "undeclared": sorted(name for name in live if name not in declared),
+        }
+        if any(report.values()):
+            drift[collection_name] = report
+    return drift
+
+async def ensure_indexes() -> Dict[str, Dict[str, List[str]]]:
+    """Create any declared index that is missing and return the remaining drift"""
+    for collection_name, models in DECLARED_INDEXES.items():
+        for model in models:
+            try:
+                await db[collection_name].create_indexes([model])
+            except OperationFailure as e:
+                # Typically duplicate keys in existing data or a same-named index with other options
+                logger.error(f"Could not create index {collection_name}.{model.document['name']}: {e}")
+
+    drift = await get_index_drift()
+    for collection_name, report in drift.items():
+        logger.warning(f"Index drift on {collection_name}: {report}")
+    return drift
+
+# ============= BUSINESS SUMMARY =============
+
+SUMMARY_FIELDS = (
+    "total_sales",
+    "total_expenses",
+    "total_outstanding",
+    "invoices_count",
+    "expenses_count",
+    "customers_count",
+    "products_count",
+)
+
+def outstanding_contribution(balance: float, status: str) -> float:
+    """How much an invoice adds to the outstanding total"""
+    return balance if status != "paid" else 0
+
+async def compute_business_summary(business_id: str) -> dict:
+    """Recompute the summary from source collections with server-side aggregations"""
+    invoice_totals, expense_totals, customers_count, products_count = await asyncio.gather(
+        db.invoices.aggregate([
+            {"$match": {"business_id": business_id}},
+            {"$group": {
+                "_id": None,
+                "total_sales": {"$sum": "$total"},
+                "total_outstanding": {"$sum": {"$cond": [{"$ne": ["$status", "paid"]}, "$balance", 0]}},
+                "count": {"$sum": 1}
+            }}
+        ]).to_list(1),
+        db.expenses.aggregate([
+            {"$match": {"business_id": business_id}},
+            {"$group": {"_id": None, "total_expenses": {"$sum": "$total"}, "count": {"$sum": 1}}}
+        ]).to_list(1),
+        db.customers.count_documents({"business_id": business_id}),
+        db.products.count_documents({"business_id": business_id})
+    )
+
+    invoices = invoice_totals[0] if invoice_totals else {}
+    expenses = expense_totals[0] if expense_totals else {}
+    return {
+        "total_sales": invoices.get("total_sales", 0),
+        "total_expenses": expenses.get("total_expenses", 0),
+        "total_outstanding": invoices.get("total_outstanding", 0),
+        "invoices_count": invoices.get("count", 0),
+        "expenses_count": expenses.get("count", 0),
+        "customers_count": customers_count,
+        "products_count": products_count
+    }
+
+async def create_business_summary(business_id: str, values: Optional[dict] = None) -> dict:
+    summary = values if values is not None else {field: 0 for field in SUMMARY_FIELDS}
+    try:
+        await db.business_summaries.insert_one({"_id": business_id, **summary})
+    except DuplicateKeyError:
+        # Another request initialised it first; theirs is authoritative
+        return await db.business_summaries.find_one({"_id": business_id}, {"_id": 0})
+    return summary
+
+async def get_business_summary(business_id: str, database=None) -> dict:
+    summary = await (database or db).business_summaries.find_one({"_id": business_id}, {"_id": 0})
+    if summary is None and database is not None:
+        # A lagging secondary may not have the summary yet; the primary decides whether to backfill
+        summary = await db.business_summaries.find_one({"_id": business_id}, {"_id": 0})
+    if summary is None:
+        # Businesses created before summaries existed are backfilled on first read
+        summary = await create_business_summary(business_id, await compute_business_summary(business_id))
+    return summary
+
+async def bump_business_summary(business_id: str, session=None, **deltas: float) -> None:
+    """Apply atomic $inc deltas; a missing summary is left for the lazy backfill to compute"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if deltas:
+        await db.business_summaries.update_one({"_id": business_id}, {"$inc": deltas}, session=session)
+
+async def verify_business_summary(business_id: str, fix: bool = False, tolerance: float = 0.01) -> dict:
+    """Compare the stored summary with a full recompute and optionally overwrite it"""
+    stored = await db.business_summaries.find_one({"_id": business_id}, {"_id": 0}) or {}
+    actual = await compute_business_summary(business_id)
+
+    drift = {
+        field: {"stored": stored.get(field), "actual": actual[field]}
+        for field in SUMMARY_FIELDS
+        if stored.get(field) is None or abs(stored[field] - actual[field]) > tolerance
+    }
+    if drift and fix:
+        await db.business_summaries.update_one({"_id": business_id}, {"$set": actual}, upsert=True)
+    return drift
+
+# ============= REPORT ROLLUPS =============
+
+REPORT_GRANULARITIES = ("day", "week", "month", "financial_year")
+
+# Per-kind source collection, date field and the rollup fields summed from it
+ROLLUP_SOURCES = {
+    "sales": {
+        "collection": "invoices",
+        "date_field": "invoice_date",
+        "fields": {"total": "$total", "tax": "$tax_amount", "paid": "$paid_amount", "outstanding": "$balance"},
+    },
+    "expenses": {
+        "collection": "expenses",
+        "date_field": "expense_date",
+        "fields": {"total": "$total", "tax": "$tax_amount"},
+    },
+}
+
+def month_key(value) -> str:
+    """Calendar month of a stored date, in UTC like Mongo's date operators"""
+    return to_utc_datetime(value).strftime("%Y-%m")
+
+def financial_year_label(month: str) -> str:
+    """Indian financial year (April to March) containing a YYYY-MM month, e.g. 2024-25"""
+    year, month_num = int(month[:4]), int(month[5:7])
+    start = year if month_num >= 4 else year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+def date_range_filter(field: str, start: Optional[date], end: Optional[date]) -> dict:
+    """Match stored dates within [start, end], both inclusive calendar days in UTC"""
+    bounds = {}
+    if start:
+        bounds["$gte"] = encode_value(start)
+    if end:
+        bounds["$lt"] = encode_value(end + timedelta(days=1))
+    return {field: bounds} if bounds else {}
+
+def expense_category_key(category_id: Optional[str]) -> str:
+    return category_id or "uncategorized"
+
+async def bump_monthly_rollup(
+    business_id: str,
+    kind: str,
+    when,
+    category_key: Optional[str] = None,
+    session=None,
+    **deltas: float
+) -> None:
+    month = month_key(when)
+    inc = {field: value for field, value in deltas.items() if value}
+    if category_key is not None and deltas.get("total"):
+        inc[f"categories.{category_key}"] = deltas["total"]
+    if not inc:
+        return
+    await db.monthly_rollups.update_one(
+        {"_id": f"{business_id}:{kind}:{month}"},
+        {"$inc": inc, "$setOnInsert": {"business_id": business_id, "kind": kind, "month": month}},
+        upsert=True,
+        session=session
+    )
+
+def _rollup_pipeline(business_id: str, kind: str) -> List[dict]:
+    """Aggregation producing the monthly rollup documents of one kind from raw documents"""
+    source = ROLLUP_SOURCES[kind]
+    month_expr = {"$dateToString": {"format": "%Y-%m", "date": {"$toDate": f"${source['date_field']}"}}}
+    sums = {field: {"$sum": expr} for field, expr in source["fields"].items()}
+    
+    if kind == "expenses":
+        pipeline = [
+            {"$match": {"business_id": business_id}},
+            {"$group": {
+                "_id": {"month": month_expr, "category": {"$ifNull": ["$category_id", "uncategorized"]}},
+                **sums,
+                "count": {"$sum": 1}
+            }},
+            {"$group": {
+                "_id": "$_id.month",
+                **{field: {"$sum": f"${field}"} for field in [*source["fields"], "count"]},
+                "categories": {"$push": {"k": "$_id.category", "v": "$total"}}
+            }},
+            {"$set": {"categories": {"$arrayToObject": "$categories"}}}
+        ]
+    else:
+        pipeline = [
+            {"$match": {"business_id": business_id}},
+            {"$group": {"_id": month_expr, **sums, "count": {"$sum": 1}}}
+        ]
+    
+    return pipeline + [
+        {"$set": {
+            "month": "$_id",
+            "business_id": business_id,
+            "kind": kind,
+            "_id": {"$concat": [f"{business_id}:{kind}:", "$_id"]}
+        }}
+    ]
+
+async def rebuild_monthly_rollups(business_id: str) -> None:
+    """Recompute every monthly rollup of a business from raw documents.
+
+    Runs as one transaction where supported: the aggregations read one snapshot and the
+    rollups are replaced in the same transaction, so an invoice or payment delta that
+    lands meanwhile write-conflicts and is retried instead of being lost or counted
+    twice. On a standalone mongod there is no such guarantee; rebuild while idle.
+    """
+    async def rebuild(session):
+        for kind, source in ROLLUP_SOURCES.items():
+            rollups = await db[source["collection"]].aggregate(
+                _rollup_pipeline(business_id, kind), session=session
+            ).to_list(None)
+            await db.monthly_rollups.delete_many({"business_id": business_id, "kind": kind}, session=session)
+            if rollups:
+                await db.monthly_rollups.insert_many(rollups, session=session)
+        await db.monthly_rollups.update_one(
+            {"_id": f"{business_id}:ready"},
+            {"$set": {"business_id": business_id, "kind": "marker"}},
+            upsert=True,
+            session=session
+        )
+
+    await run_in_transaction(rebuild)
+
+_rollups_ready: set = set()
+_rollup_backfills: Dict[str, asyncio.Task] = {}
+
+async def _backfill_monthly_rollups(business_id: str) -> None:
+    try:
+        await rebuild_monthly_rollups(business_id)
+    except Exception:
+        logger.exception("Backfilling monthly rollups of business %s failed", business_id)
+
+async def monthly_rollups_database(business_id: str):
+    """Where to read a business's rollups from, or None while they are still being backfilled.
+
+    Businesses that predate rollups are backfilled by a background task, never on the
+    request that noticed; `scripts/rebuild_business_summary.py --rollups` does it up front.
+    """
+    if business_id in _rollups_ready:
+        return analytics_db
+    if await db.monthly_rollups.find_one({"_id": f"{business_id}:ready"}, {"_id": 1}):
+        _rollups_ready.add(business_id)
+        # They may have just been rebuilt and not replicated yet, so read this once from the primary
+        return db
+    if business_id not in _rollup_backfills:
+        task = asyncio.create_task(_backfill_monthly_rollups(business_id))
+        _rollup_backfills[business_id] = task
+        task.add_done_callback(lambda _: _rollup_backfills.pop(business_id, None))
+    return None
+
+def _period_for_month(month: str, granularity: str) -> str:
+    return financial_year_label(month) if granularity == "financial_year" else month
+
+def _merge_bucket(buckets: Dict[str, dict], period: str, kind: str, totals: dict) -> None:
+    bucket = buckets.setdefault(period, {"period": period, "count": 0, "categories": {}})
+    bucket["count"] += totals.get("count", 0)
+    for field in ROLLUP_SOURCES[kind]["fields"]:
+        bucket[field] = bucket.get(field, 0) + totals.get(field, 0)
+    for category, amount in totals.get("categories", {}).items():
+        bucket["categories"][category] = bucket["categories"].get(category, 0) + amount
+
+def whole_months(start: Optional[date], end: Optional[date]) -> Tuple[Optional[date], Optional[date]]:
+    """First and last day of the whole calendar months inside [start, end]; an open end stays None"""
+    first = start
+    if start and start.day != 1:
+        first = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    last = end
+    if end and (end + timedelta(days=1)).day != 1:
+        last = end.replace(day=1) - timedelta(days=1)
+    return first, last
+
+async def _rollup_buckets(database, business_id: str, kind: str, start: Optional[date], end: Optional[date]) -> List[dict]:
+    """Month buckets summed from monthly rollup documents; start and end must be month aligned"""
+    query = {"business_id": business_id, "kind": kind}
+    month_bounds = {}
+    if start:
+        month_bounds["$gte"] = start.strftime("%Y-%m")
+    if end:
+        month_bounds["$lte"] = end.strftime("%Y-%m")
+    if month_bounds:
+        query["month"] = month_bounds
+
+    buckets: Dict[str, dict] = {}
+    async for rollup in database.monthly_rollups.find(query, {"_id": 0}).sort("month", 1):
+        _merge_bucket(buckets, rollup["month"], kind, rollup)
+    return list(buckets.values())
+
+async def _month_buckets(business_id: str, kind: str, start: Optional[date], end: Optional[date], granularity: str) -> List[dict]:
+    """Month and financial-year buckets: rollups for whole months, raw documents for partial ones at either end"""
+    database = await monthly_rollups_database(business_id)
+    first, last = whole_months(start, end)
+    if database is None or (first and last and first > last):
+        parts = [_raw_buckets(business_id, kind, start, end, "month")]
+    else:
+        parts = [_rollup_buckets(database, business_id, kind, first, last)]
+        if first != start:
+            parts.append(_raw_buckets(business_id, kind, start, first - timedelta(days=1), "month"))
+        if last != end:
+            parts.append(_raw_buckets(business_id, kind, last + timedelta(days=1), end, "month"))
+
+    buckets: Dict[str, dict] = {}
+    for part in await asyncio.gather(*parts):
+        for month in part:
+            _merge_bucket(buckets, _period_for_month(month["period"], granularity), kind, month)
+    return sorted(buckets.values(), key=lambda bucket: bucket["period"])
+
+async def _raw_buckets(business_id: str, kind: str, start: Optional[date], end: Optional[date], granularity: str) -> List[dict]:
+    """Day, week and month buckets, aggregated from the raw documents in range"""
+    source = ROLLUP_SOURCES[kind]
+    stored_date = {"$toDate": f"${source['date_field']}"}
+    if granularity == "week":
+        stored_date = {"$dateTrunc": {"date": stored_date, "unit": "week", "startOfWeek": "monday"}}
+    period_format = "%Y-%m" if granularity == "month" else "%Y-%m-%d"
+    period_expr = {"$dateToString": {"format": period_format, "date": stored_date}}
+
+    query = {"business_id": business_id, **date_range_filter(source["date_field"], start, end)}
+    group_id = {"period": period_expr}
+    if kind == "expenses":
+        group_id["category"] = {"$ifNull": ["$category_id", "uncategorized"]}
+
+    rows = await analytics_db[source["collection"]].aggregate([
+        {"$match": query},
+        {"$group": {
+            "_id": group_id,
+            **{field: {"$sum": expr} for field, expr in source["fields"].items()},
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"_id.period": 1}}
+    ]).to_list(None)
+
+    buckets: Dict[str, dict] = {}
+    for row in rows:
+        period = row["_id"]["period"]
+        bucket = buckets.setdefault(period, {"period": period, "count": 0, "categories": {}})
+        bucket["count"] += row["count"]
+        for field in source["fields"]:
+            bucket[field] = bucket.get(field, 0) + row[field]
+        if "category" in row["_id"]:
+            bucket["categories"][row["_id"]["category"]] = row["total"]
+    return list(buckets.values())
+
+async def bucketed_report(business_id: str, kind: str, start: Optional[date], end: Optional[date], granularity: str) -> List[dict]:
+    if granularity in ("month", "financial_year"):
+        return await _month_buckets(business_id, kind, start, end, granularity)
+    return await _raw_buckets(business_id, kind, start, end, granularity)
+
+async def expense_category_names(business_id: str, keys) -> Dict[str, str]:
+    ids = [key for key in keys if key != "uncategorized"]
+    names = {"uncategorized": "Uncategorized"}
+    async for category in analytics_db.expense_categories.find({"business_id": business_id, "id": {"$in": ids}}, {"_id": 0, "id": 1, "name": 1}):
+        names[category["id"]] = category["name"]
+    return names
+
+def _validate_granularity(granularity: Optional[str]) -> None:
+    if granularity is not None and granularity not in REPORT_GRANULARITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"granularity must be one of: {', '.join(REPORT_GRANULARITIES)}"
+        )
+
+async def build_sales_report(business_id: str, date_from: Optional[date], date_to: Optional[date], granularity: Optional[str]) -> dict:
+    if granularity:
+        buckets = [
+            {
+                "period": bucket["period"],
+                "total_sales": bucket.get("total", 0),
+                "total_tax": bucket.get("tax", 0),
+                "total_paid": bucket.get("paid", 0),
+                "total_outstanding": bucket.get("outstanding", 0),
+                "invoice_count": bucket["count"]
+            }
+            for bucket in await bucketed_report(business_id, "sales", date_from, date_to, granularity)
+        ]
+        summary = {
+            field: sum(bucket[field] for bucket in buckets)
+            for field in ("total_sales", "total_tax", "total_paid", "total_outstanding", "invoice_count")
+        }
+        return {"granularity": granularity, "from": date_from, "to": date_to, "buckets": buckets, "summary": summary}
+
+    query = {"business_id": business_id, **date_range_filter("invoice_date", date_from, date_to)}
+    invoices, totals = await asyncio.gather(
+        analytics_db.invoices.find(query, {"_id": 0}).sort("invoice_date", -1).to_list(1000),
+        analytics_db.invoices.aggregate([
+            {"$match": query},
+            {"$group": {
+                "_id": None,
+                "total_sales": {"$sum": "$total"},
+                "total_tax": {"$sum": "$tax_amount"},
+                "total_paid": {"$sum": "$paid_amount"},
+                "total_outstanding": {"$sum": "$balance"},
+                "invoice_count": {"$sum": 1}
+            }},
+            {"$project": {"_id": 0}}
+        ]).to_list(1)
+    )
+
+    return {
+        "invoices": invoices,
+        "summary": totals[0] if totals else {
+            "total_sales": 0,
+            "total_tax": 0,
+            "total_paid": 0,
+            "total_outstanding": 0,
+            "invoice_count": 0
+        }
+    }
+
+async def build_expense_report(business_id: str, date_from: Optional[date], date_to: Optional[date], granularity: Optional[str]) -> dict:
+    if granularity:
+        raw_buckets = await bucketed_report(business_id, "expenses", date_from, date_to, granularity)
+        names = await expense_category_names(
+            business_id, {key for bucket in raw_buckets for key in bucket["categories"]}
+        )
+        
+        buckets = []
+        category_totals = {}
+        for bucket in raw_buckets:
+            breakdown = {}
+            for key, amount in bucket["categories"].items():
+                name = names.get(key, key)
+                breakdown[name] = breakdown.get(name, 0) + amount
+                category_totals[name] = category_totals.get(name, 0) + amount
+            buckets.append({
+                "period": bucket["period"],
+                "total_amount": bucket.get("total", 0),
+                "total_tax": bucket.get("tax", 0),
+                "expense_count": bucket["count"],
+                "category_breakdown": breakdown
+            })
+        
+        summary = {
+            "total_amount": sum(bucket["total_amount"] for bucket in buckets),
+            "total_tax": sum(bucket["total_tax"] for bucket in buckets),
+            "expense_count": sum(bucket["expense_count"] for bucket in buckets),
+            "category_breakdown": category_totals
+        }
+        return {"granularity": granularity, "from": date_from, "to": date_to, "buckets": buckets, "summary": summary}
+
+    query = {"business_id": business_id, **date_range_filter("expense_date", date_from, date_to)}
+    expenses, categories = await asyncio.gather(
+        analytics_db.expenses.find(query, {"_id": 0}).sort("expense_date", -1).to_list(1000),
+        analytics_db.expenses.aggregate([
+            {"$match": query},
+            {"$group": {
+                "_id": {"$ifNull": ["$category_name", "Uncategorized"]},
+                "total": {"$sum": "$total"},
+                "count": {"$sum": 1}
+            }}
+        ]).to_list(None)
+    )
+
+    return {
+        "expenses": expenses,
+        "summary": {
+            "total_amount": sum(category["total"] for category in categories),
+            "expense_count": sum(category["count"] for category in categories),
+            "category_breakdown": {category["_id"]: category["total"] for category in categories}
+        }
+    }
+
+# ============= TYPEAHEAD SEARCH =============
+
+# Fields matched by /search and the small projection it returns, per collection
+SEARCHABLE_FIELDS = {
+    "customers": ("name", "phone", "gstin"),
+    "products": ("name", "sku", "hsn_code"),
+}
+SEARCH_RESULT_FIELDS = {
+    "customers": ("id", "name", "phone", "gstin", "email"),
+    "products": ("id", "name", "sku", "hsn_code", "unit", "price", "tax_rate", "stock_quantity"),
+}
+SEARCH_GRAM_SIZE = 3
+
+# Keeps the derived search arrays out of list and dashboard payloads
+HIDE_SEARCH_FIELDS = {"_id": 0, "search_terms": 0, "search_grams": 0}
+
+def normalize_search_text(value: str) -> str:
+    return " ".join(value.lower().split())
+
+def _search_words(text: str) -> List[str]:
+    return [word for word in re.split(r"[^\w]+", text) if word]
+
+def _grams(word: str) -> set:
+    return {word[i:i + SEARCH_GRAM_SIZE] for i in range(len(word) - SEARCH_GRAM_SIZE + 1)}
+
+def search_fields(collection_name: str, doc: dict) -> dict:
+    """Derived arrays for indexed search: whole values and words for prefixes, trigrams for substrings"""
+    terms = set()
+    grams = set()
+    for field in SEARCHABLE_FIELDS[collection_name]:
+        value = doc.get(field)
+        if not value:
+            continue
+        text = normalize_search_text(str(value))
+        terms.add(text)
+        for word in _search_words(text):
+            terms.add(word)
+            grams |= _grams(word)
+    return {"search_terms": sorted(terms), "search_grams": sorted(grams)}
+
+async def search_records(collection_name: str, business_id: str, q: str, limit: int) -> List[dict]:
+    term = normalize_search_text(q)
+    if not term:
+        return []
+
+    collection = db[collection_name]
+    projection = {"_id": 0, **{field: 1 for field in SEARCH_RESULT_FIELDS[collection_name]}}
+
+    # Prefix of any word or whole value: an anchored regex is a bounded multikey index scan
+    results = await collection.find(
+        {"business_id": business_id, "search_terms": {"$regex": f"^{re.escape(term)}"}},
+        projection
+    ).limit(limit).to_list(limit)
+
+    grams = set()
+    for word in _search_words(term):
+        grams |= _grams(word)
+    if len(results) < limit and grams:
+        # Trigrams narrow candidates through the index; the regex confirms the real substring
+        remaining = limit - len(results)
+        results += await collection.find(
+            {
+                "business_id": business_id,
+                "search_grams": {"$all": sorted(grams)},
+                "search_terms": {"$regex": re.escape(term)},
+                "id": {"$nin": [result["id"] for result in results]}
+            },
+            projection
+        ).limit(remaining).to_list(remaining)
+
+    return results
+
+# ============= BULK IMPORT =============
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+async def iter_lines(chunks):
+    """Split an async byte stream into decoded lines without holding more than one partial line"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+class CsvLineFeed:
+    """Lines of the CSV record being parsed, fed to one csv.reader as they arrive
+
+    csv.reader restarts a record on every next(), so when it runs out of lines mid-record
+    the feed raises Incomplete and replays the record's lines once another one is added.
+    """
+
+    class Incomplete(Exception):
+        pass
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.size = 0
+        self.position = 0
+
+    def add(self, line: str) -> None:
+        self.lines.append(line)
+        self.size += len(line) + 1
+        self.position = 0
+
+    def clear(self) -> None:
+        self.lines.clear()
+        self.size = 0
+        self.position = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if self.position == len(self.lines):
+            raise self.Incomplete()
+        self.position += 1
+        return self.lines[self.position - 1] + "\n"
+
+async def iter_import_rows(chunks, import_format: str):
+    """Yield (row_number, dict or parse error message) from a CSV or NDJSON stream"""
+    if import_format == "ndjson":
+        row_number = 0
+        async for line in iter_lines(chunks):
+            row_number += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield row_number, f"Invalid JSON: {e}"
+                continue
+            yield row_number, row if isinstance(row, dict) else "Each line must be a JSON object"
+        return
+
+    header = None
+    row_number = 0
+    feed = CsvLineFeed()
+    reader = csv.reader(feed)
+    async for line in iter_lines(chunks):
+        feed.add(line)
+        try:
+            values = next(reader)
+        except CsvLineFeed.Incomplete:
+            # Inside a quoted field that continues on the next line
+            if feed.size > IMPORT_MAX_RECORD_BYTES:
+                row_number += 1
+                feed.clear()
+                yield row_number, f"Record is longer than {IMPORT_MAX_RECORD_BYTES} bytes; check for an unclosed quote"
+            continue
+        except csv.Error as e:
+            feed.clear()
+            if header is not None:
+                row_number += 1
+            yield row_number, f"Invalid CSV: {e}"
+            continue
+        blank = not "".join(feed.lines).strip()
+        feed.clear()
+        if blank:
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row_number, dict(zip(header, values))
+    if feed.lines:
+        yield row_number + 1, "Quoted field is never closed"
+
+async def import_records(
+    chunks,
+    import_format: str,
+    create_model,
+    record_model,
+    collection,
+    business_id: str
+) -> dict:
+    """Validate streamed rows against `create_model` and insert them in bounded unordered batches"""
+    inserted = 0
+    failed = 0
+    errors: List[dict] = []
+    batch: List[dict] = []
+    batch_rows: List[int] = []
+
+    def record_error(row_number: int, message: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+            errors.append({"row": row_number, "error": message})
+
+    async def flush() -> None:
+        nonlocal inserted
+        if not batch:
+            return
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                record_error(batch_rows[write_error["index"]], write_error.get("errmsg", "Write failed"))
+        batch.clear()
+        batch_rows.clear()
+
+    async for row_number, row in iter_import_rows(chunks, import_format):
+        if isinstance(row, str):
+            record_error(row_number, row)
+            continue
+        
+        # Blank cells fall back to the model defaults
+        values = {key: value for key, value in row.items() if value not in ("", None)}
+        try:
+            record = record_model(**create_model(**values).model_dump(), business_id=business_id)
+        except ValidationError as e:
+            record_error(row_number, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ))
+            continue
+        
+        doc = to_document(record)
+        if collection.name in SEARCHABLE_FIELDS:
+            doc.update(search_fields(collection.name, doc))
+        batch.append(doc)
+        batch_rows.append(row_number)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush()
+
+    await flush()
+    return {
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors)
+    }
+
+IMPORTABLE_ENTITIES = {
+    "customers": (CustomerCreate, Customer, "customers_count"),
+    "vendors": (VendorCreate, Vendor, None),
+    "products": (ProductCreate, Product, "products_count"),
+}
+
+# ============= STREAMING EXPORT =============
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Per-entity model, date field used for from/to filters, and export order
+EXPORTABLE_ENTITIES = {
+    "invoices": (Invoice, "invoice_date"),
+    "expenses": (Expense, "expense_date"),
+    "payments": (Payment, "payment_date"),
+}
+
+INVOICE_ITEM_COLUMNS = [f"item_{name}" for name in InvoiceItem.model_fields]
+
+def export_columns(entity: str, flatten_items: bool) -> List[str]:
+    model, _ = EXPORTABLE_ENTITIES[entity]
+    columns = [name for name in model.model_fields if name != "items"]
+    if entity == "invoices" and flatten_items:
+        columns += INVOICE_ITEM_COLUMNS
+    return columns
+
+def export_rows(entity: str, doc: dict, flatten_items: bool):
+    """One row per document, or per invoice line item when flattening"""
+    if entity == "invoices" and flatten_items:
+        base = {key: value for key, value in doc.items() if key != "items"}
+        for item in doc.get("items") or [{}]:
+            yield {**base, **{f"item_{key}": value for key, value in item.items()}}
+    else:
+        yield doc
+
+def _export_json_default(value):
+    """ISO-8601 dates in both export formats, so exports read back through the importer"""
+    if isinstance(value, datetime):
+        return to_utc_datetime(value).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return _export_json_default(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_export_json_default)
+    return value
+
+def _validate_export(entity: str, export_format: str) -> None:
+    if entity not in EXPORTABLE_ENTITIES:
+        raise HTTPException(status_code=404, detail=f"Cannot export {entity}")
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+def export_query(business_id: str, entity: str, date_from: Optional[date], date_to: Optional[date]) -> dict:
+    _, date_field = EXPORTABLE_ENTITIES[entity]
+    return {"business_id": business_id, **date_range_filter(date_field, date_from, date_to)}
+
+def export_cursor(business_id: str, entity: str, date_from: Optional[date], date_to: Optional[date]):
+    _, date_field = EXPORTABLE_ENTITIES[entity]
+    return db[entity].find(
+        export_query(business_id, entity, date_from, date_to),
+        {"_id": 0},
+        batch_size=EXPORT_CURSOR_BATCH_SIZE
+    ).sort(date_field, 1)
+
+async def stream_export(cursor, entity: str, export_format: str, flatten_items: bool):
+    """Encode cursor documents into CSV or NDJSON chunks of EXPORT_CHUNK_ROWS rows"""
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=export_columns(entity, flatten_items), extrasaction="ignore")
+        writer.writeheader()
+
+    rows = 0
+    async for doc in cursor:
+        for row in export_rows(entity, doc, flatten_items):
+            if writer:
+                writer.writerow({key: _csv_value(value) for key, value in row.items()})
+            else:
+                buffer.write(json.dumps(row, default=_export_json_default))
+                buffer.write("\n")
+            rows += 1
+            if rows % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+# ============= BACKGROUND JOBS =============
+
+# Status responses never carry the result itself; only the download route reads it
+JOB_STATUS_PROJECTION = {"_id": 0, "result": 0, "cache_key": 0, "heartbeat_at": 0, "expires_at": 0}
+
+class JobFailed(Exception):
+    """A job that cannot produce a result; the message is shown to the client"""
+
+def json_result(content: Any, filename: str) -> tuple:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS), "application/json", filename
+
+async def run_sales_report_job(business_id: str, params: ReportJobParams, progress) -> tuple:
+    report = await build_sales_report(business_id, params.date_from, params.date_to, params.granularity)
+    return json_result(report, "sales-report.json")
+
+async def run_expense_report_job(business_id: str, params: ReportJobParams, progress) -> tuple:
+    report = await build_expense_report(business_id, params.date_from, params.date_to, params.granularity)
+    return json_result(report, "expense-report.json")
+
+async def run_solar_dashboard_job(business_id: str, params: NoJobParams, progress) -> tuple:
+    return json_result(await build_solar_dashboard(business_id), "solar-dashboard.json")
+
+def check_gst_summary_params(params: GstSummaryJobParams) -> None:
+    _validate_gst_format(params.export_format)
+    gst_period(params.month, params.date_from, params.date_to)
+
+async def run_gst_summary_job(business_id: str, params: GstSummaryJobParams, progress) -> tuple:
+    date_from, date_to = gst_period(params.month, params.date_from, params.date_to)
+    summary = await build_gst_summary(business_id, date_from, date_to)
+    filename = gst_summary_filename(date_from, date_to, params.export_format)
+    if params.export_format == "csv":
+        return gst_summary_csv(summary).encode("utf-8"), GST_SUMMARY_FORMATS["csv"], filename
+    return json_result(summary, filename)
+
+async def run_export_job(business_id: str, params: ExportJobParams, progress) -> tuple:
+    """Collect an export in memory, reporting progress by rows written against the documents in range"""
+    total = await db[params.entity].count_documents(
+        export_query(business_id, params.entity, params.date_from, params.date_to)
+    )
+    cursor = export_cursor(business_id, params.entity, params.date_from, params.date_to)
+
+    chunks = []
+    size = 0
+    async for chunk in stream_export(cursor, params.entity, params.export_format, params.flatten_items):
+        data = chunk.encode("utf-8")
+        size += len(data)
+        if size > JOB_RESULT_MAX_BYTES:
+            raise JobFailed(
+                f"Export is larger than {JOB_RESULT_MAX_BYTES} bytes; download it from /api/export/{params.entity} instead"
+            )
+        chunks.append(data)
+        if total:
+            await progress(len(chunks) * EXPORT_CHUNK_ROWS / total)
+
+    return b"".join(chunks), EXPORT_FORMATS[params.export_format], f"{params.entity}.{params.export_format}"
+
+# Per-kind parameter model, parameter checks, the collections whose change versions key the
+# result cache, and the runner returning (content bytes, media type, filename)
+JOB_KINDS = {
+    "sales_report": {
+        "params": ReportJobParams,
+        "check": lambda params: _validate_granularity(params.granularity),
+        "collections": lambda params: ["invoices"],
+        "run": run_sales_report_job,
+    },
+    "expense_report": {
+        "params": ReportJobParams,
+        "check": lambda params: _validate_granularity(params.granularity),
+        "collections": lambda params: ["expenses", "expense_categories"],
+        "run": run_expense_report_job,
+    },
+    "solar_dashboard": {
+        "params": NoJobParams,
+        "check": lambda params: None,
+        "collections": lambda params: ["solar_projects", "subsidy_tracking"],
+        "run": run_solar_dashboard_job,
+    },
+    "gst_summary": {
+        "params": GstSummaryJobParams,
+        "check": check_gst_summary_params,
+        "collections": lambda params: ["invoices", "customers", "products"],
+        "run": run_gst_summary_job,
+    },
+    "export": {
+        "params": ExportJobParams,
+        "check": lambda params: _validate_export(params.entity, params.export_format),
+        "collections": lambda params: [params.entity],
+        "run": run_export_job,
+    },
+}
+
+def job_cache_key(business_id: str, kind: str, params: dict, versions: Dict[str, int]) -> str:
+    """Same report over unchanged data gives the same key; any write to its collections changes it"""
+    raw = json.dumps([business_id, kind, params, versions], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+async def find_reusable_job(business_id: str, cache_key: str) -> Optional[dict]:
+    """A queued or running job for the same key, or one that completed within JOB_RESULT_CACHE_SECONDS"""
+    fresh_since = datetime.now(timezone.utc) - timedelta(seconds=JOB_RESULT_CACHE_SECONDS)
+    return await db.jobs.find_one(
+        {
+            "business_id": business_id,
+            "cache_key": cache_key,
+            "$or": [
+                {"status": {"$in": ["queued", "running"]}},
+                {"status": "completed", "finished_at": {"$gte": fresh_since}},
+            ],
+        },
+        JOB_STATUS_PROJECTION,
+        sort=[("created_at", -1)]
+    )
+
+def job_response(doc: dict) -> Job:
+    job = Job(**doc)
+    if job.status == "completed":
+        job.result_url = f"/api/jobs/{job.id}/result"
+    return job
+
+async def requeue_stale_jobs() -> int:
+    """Hand back running jobs whose process stopped sending heartbeats, e.g. after a crash"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_SECONDS)
+    result = await db.jobs.update_many(
+        {"status": "running", "heartbeat_at": {"$lt": cutoff}},
+        {"$set": {"status": "queued", "progress": 0}}
+    )
+    if result.modified_count:
+        logger.warning(f"Requeued {result.modified_count} stale background jobs")
+    return result.modified_count
+
+class JobQueue:
+    """Runs jobs persisted in db.jobs on a few asyncio worker tasks per process.
+
+    A submission wakes a local worker at once; idle workers also poll Mongo every
+    JOB_POLL_SECONDS, so jobs queued by processes without workers, or requeued after a
+    crash, still run. Jobs are claimed atomically, so each runs once across processes.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.completed = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self.workers <= 0:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, job_id: str) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job_id = await asyncio.wait_for(self._queue.get(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                job_id = None
+            try:
+                if job_id is None:
+                    await requeue_stale_jobs()
+                job = await self._claim(job_id)
+                if job is not None:
+                    await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # e.g. Mongo briefly unreachable; the worker keeps going and the job stays queued
+                logger.exception("Background job worker error")
+
+    async def _claim(self, job_id: Optional[str]) -> Optional[dict]:
+        """The given job if still queued, else the oldest queued one, marked running"""
+        now = datetime.now(timezone.utc)
+        query = {"status": "queued"}
+        if job_id is not None:
+            query["id"] = job_id
+        job = await db.jobs.find_one_and_update(
+            query,
+            {"$set": {"status": "running", "started_at": now, "heartbeat_at": now}},
+            projection=JOB_STATUS_PROJECTION,
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        if job is None and job_id is not None:
+            # Already taken by another worker; pick up whatever else is waiting
+            return await self._claim(None)
+        return job
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(JOB_STALE_SECONDS / 3)
+            try:
+                await db.jobs.update_one(
+                    {"id": job_id, "status": "running"},
+                    {"$set": {"heartbeat_at": datetime.now(timezone.utc)}}
+                )
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+
+    async def _run(self, job: dict) -> None:
+        kind = JOB_KINDS[job["kind"]]
+        reported = {"progress": 0}
+
+        async def progress(fraction: float) -> None:
+            # Writes only when the whole percentage moves; 100 is left for completion
+            percent = min(99, int(fraction * 100))
+            if percent > reported["progress"]:
+                reported["progress"] = percent
+                await db.jobs.update_one(
+                    {"id": job["id"], "status": "running"},
+                    {"$set": {"progress": percent, "heartbeat_at": datetime.now(timezone.utc)}}
+                )
+
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        started = time.perf_counter()
+        try:
+            params = kind["params"].model_validate(job["params"])
+            content, media_type, filename = await kind["run"](job["business_id"], params, progress)
+            update = {
+                "status": "completed",
+                "progress": 100,
+                "result": content,
+                "result_bytes": len(content),
+                "media_type": media_type,
+                "filename": filename,
+            }
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back so this or another process runs it from the start
+            await db.jobs.update_one(
+                {"id": job["id"], "status": "running"},
+                {"$set": {"status": "queued", "progress": 0}}
+            )
+            raise
+        except JobFailed as e:
+            update = {"status": "failed", "error": str(e)}
+        except Exception:
+            logger.exception(f"Background job {job['id']} ({job['kind']}) failed")
+            update = {"status": "failed", "error": "Job failed unexpectedly"}
+        finally:
+            heartbeat.cancel()
+
+        finished = datetime.now(timezone.utc)
+        update.update(finished_at=finished, expires_at=finished + timedelta(hours=JOB_RETENTION_HOURS))
+        await db.jobs.update_one({"id": job["id"], "status": "running"}, {"$set": update})
+
+        BACKGROUND_JOB_DURATION.labels(job["kind"], update["status"]).observe(time.perf_counter() - started)
+        if update["status"] == "completed":
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "pending_wakeups": self._queue.qsize() if self._queue is not None else 0,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+job_queue = JobQueue(JOB_WORKERS)
+
+# ============= INVOICE PDF =============
+
+# Bump when the layout changes so PDFs cached under the old layout are rendered again
+PDF_TEMPLATE_VERSION = 1
+
+PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT = 595, 842  # A4 in points
+PDF_LEFT, PDF_RIGHT = 40, 555
+PDF_ROW_HEIGHT = 16
+PDF_BOTTOM = 56  # rows stop above the footer
+PDF_TOTALS_HEIGHT = 176  # totals, notes and signature block on the last page
+
+# GST state codes, the first two digits of a GSTIN
+GST_STATE_CODES = {
+    "01": "Jammu and Kashmir", "02": "Himachal Pradesh", "03": "Punjab", "04": "Chandigarh",
+    "05": "Uttarakhand", "06": "Haryana", "07": "Delhi", "08": "Rajasthan", "09": "Uttar Pradesh",
+    "10": "Bihar", "11": "Sikkim", "12": "Arunachal Pradesh", "13": "Nagaland", "14": "Manipur",
+    "15": "Mizoram", "16": "Tripura", "17": "Meghalaya", "18": "Assam", "19": "West Bengal",
+    "20": "Jharkhand", "21": "Odisha", "22": "Chhattisgarh", "23": "Madhya Pradesh", "24": "Gujarat",
+    "26": "Dadra and Nagar Haveli and Daman and Diu", "27": "Maharashtra", "29": "Karnataka",
+    "30": "Goa", "31": "Lakshadweep", "32": "Kerala", "33": "Tamil Nadu", "34": "Puducherry",
+    "35": "Andaman and Nicobar Islands", "36": "Telangana", "37": "Andhra Pradesh", "38": "Ladakh",
+    "97": "Other Territory",
+}
+
+# Line-item table: (document key, header, left x, width, alignment)
+INVOICE_PDF_COLUMNS = [
+    ("index", "#", 40, 18, "left"),
+    ("name", "Description", 58, 140, "left"),
+    ("hsn", "HSN/SAC", 198, 42, "left"),
+    ("quantity", "Qty", 240, 32, "right"),
+    ("price", "Rate", 272, 58, "right"),
+    ("taxable", "Taxable", 330, 70, "right"),
+    ("tax_rate", "GST%", 400, 30, "right"),
+    ("tax", "Tax", 430, 60, "right"),
+    ("amount", "Amount", 490, 65, "right"),
+]
+
+# Helvetica advance widths in 1/1000 em for printable ASCII; anything else is taken as a digit's width
+_HELVETICA_WIDTHS = dict(zip(
+    "".join(chr(code) for code in range(32, 127)),
+    [
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ]
+))
+
+def gst_state_code(gstin: Optional[str]) -> Optional[str]:
+    code = (gstin or "").strip()[:2]
+    return code if code in GST_STATE_CODES else None
+
+def format_inr(amount: float) -> str:
+    """Two decimals with Indian digit grouping, e.g. 12,34,567.89"""
+    whole, fraction = f"{abs(amount):.2f}".split(".")
+    if len(whole) > 3:
+        head, groups = whole[:-3], [whole[-3:]]
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        whole = ",".join([head, *groups])
+    return f"{'-' if round(amount, 2) < 0 else ''}{whole}.{fraction}"
+
+def pdf_text_width(text: str, size: float) -> float:
+    return sum(_HELVETICA_WIDTHS.get(char, 556) for char in text) * size / 1000
+
+def _fit_text(text: str, width: float, size: float) -> str:
+    text = " ".join(str(text).split())
+    if pdf_text_width(text, size) <= width:
+        return text
+    while text and pdf_text_width(text + "...", size) > width:
+        text = text[:-1]
+    return text + "..."
+
+def _wrap_text(text: str, width: float, size: float, max_lines: int) -> List[str]:
+    lines = []
+    for paragraph in str(text or "").splitlines():
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}".strip()
+            if line and pdf_text_width(candidate, size) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        if line:
+            lines.append(line)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines - 1] + [_fit_text(" ".join(lines[max_lines - 1:]), width, size)]
+    return [_fit_text(line, width, size) for line in lines]
+
+def _pdf_string(text: str) -> bytes:
+    """PDF literal string in WinAnsiEncoding; characters it lacks print as ?"""
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+def _pdf_text(x: float, y: float, text: str, size: float = 9, bold: bool = False, right: Optional[float] = None) -> bytes:
+    """Show text at (x, y), or ending at `right` when given"""
+    if right is not None:
+        x = right - pdf_text_width(text, size)
+    return b"BT /F%d %g Tf %.2f %.2f Td %s Tj ET\n" % (2 if bold else 1, size, x, y, _pdf_string(text))
+
+def _pdf_line(x1: float, y1: float, x2: float, y2: float, width: float = 0.5) -> bytes:
+    return b"%g w %.2f %.2f m %.2f %.2f l S\n" % (width, x1, y1, x2, y2)
+
+def _pdf_band(y: float, height: float) -> bytes:
+    return b"0.92 g %d %.2f %d %.2f re f 0 g\n" % (PDF_LEFT, y, PDF_RIGHT - PDF_LEFT, height)
+
+def _table_header(top: float) -> bytes:
+    ops = [_pdf_band(top - PDF_ROW_HEIGHT, PDF_ROW_HEIGHT)]
+    for _, header, x, width, align in INVOICE_PDF_COLUMNS:
+        ops.append(_pdf_text(x + 2, top - 11, header, 8, bold=True, right=x + width - 3 if align == "right" else None))
+    return b"".join(ops)
+
+@lru_cache(maxsize=None)
+def invoice_pdf_template(version: int = PDF_TEMPLATE_VERSION) -> dict:
+    """Everything about the invoice layout that does not depend on the invoice, encoded once per process"""
+    first_table_top = 616
+    next_table_top = PDF_PAGE_HEIGHT - 40
+    first_frame = b"".join([
+        _pdf_text(PDF_LEFT, 790, "TAX INVOICE", 16, bold=True, right=PDF_RIGHT),
+        *(_pdf_text(380, y, label, 8, bold=True) for y, label in [
+            (766, "Invoice No"), (752, "Invoice Date"), (738, "Due Date"), (724, "Place of Supply")
+        ]),
+        _pdf_line(PDF_LEFT, 712, PDF_RIGHT, 712),
+        _pdf_text(PDF_LEFT, 698, "Bill To", 8, bold=True),
+        _pdf_line(PDF_LEFT, 624, PDF_RIGHT, 624),
+        _table_header(first_table_top),
+    ])
+    footer = b"".join([
+        _pdf_line(PDF_LEFT, 40, PDF_RIGHT, 40),
+        _pdf_text(PDF_LEFT, 28, "This is a computer generated invoice.", 7),
+    ])
+    first_row_y = first_table_top - PDF_ROW_HEIGHT - 13
+    next_row_y = next_table_top - PDF_ROW_HEIGHT - 13
+    return {
+        "version": version,
+        "header": b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n",
+        "fonts": [
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ],
+        "page": b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %%d 0 R >>" % (PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT),
+        "first_frame": first_frame + footer,
+        "next_frame": _table_header(next_table_top) + footer,
+        "first_row_y": first_row_y,
+        "next_row_y": next_row_y,
+        "first_capacity": int((first_row_y - PDF_BOTTOM) // PDF_ROW_HEIGHT) + 1,
+        "next_capacity": int((next_row_y - PDF_BOTTOM) // PDF_ROW_HEIGHT) + 1,
+        "totals_rows": -(-PDF_TOTALS_HEIGHT // PDF_ROW_HEIGHT),
+    }
+
+def invoice_pdf_document(invoice: dict, business: dict, customer: dict, products: Dict[str, dict]) -> dict:
+    """Everything printed on an invoice, as plain values; its hash keys the rendered PDF cache"""
+    seller_state = gst_state_code(business.get("gstin"))
+    buyer_state = gst_state_code(customer.get("gstin"))
+    # Unregistered buyers are taken to be in the seller's state
+    supply_state = buyer_state or seller_state
+
+    items = []
+    for index, item in enumerate(invoice.get("items", []), start=1):
+        taxable = item.get("amount", 0)
+        tax = taxable * item.get("tax_rate", 0) / 100
+        items.append({
+            "index": str(index),
+            "name": item.get("product_name", ""),
+            "hsn": (products.get(item.get("product_id")) or {}).get("hsn_code") or "",
+            "quantity": f"{item.get('quantity', 0):g}",
+            "price": format_inr(item.get("price", 0)),
+            "taxable": format_inr(taxable),
+            "tax_rate": f"{item.get('tax_rate', 0):g}",
+            "tax": format_inr(tax),
+            "amount": format_inr(taxable + tax),
+        })
+
+    def day(value) -> str:
+        return to_utc_datetime(value).strftime("%d-%m-%Y") if value else "-"
+
+    return {
+        "template": PDF_TEMPLATE_VERSION,
+        "seller": {field: business.get(field) or "" for field in ("name", "address", "gstin", "phone", "email")},
+        "buyer": {
+            "name": customer.get("name") or invoice.get("customer_name", ""),
+            **{field: customer.get(field) or "" for field in ("address", "gstin", "phone")},
+        },
+        "invoice_number": invoice.get("invoice_number", ""),
+        "invoice_date": day(invoice.get("invoice_date")),
+        "due_date": day(invoice.get("due_date")),
+        "place_of_supply": f"{supply_state} - {GST_STATE_CODES[supply_state]}" if supply_state else "-",
+        "inter_state": bool(buyer_state and seller_state and buyer_state != seller_state),
+        "items": items,
+        "subtotal": invoice.get("subtotal", 0),
+        "tax_amount": invoice.get("tax_amount", 0),
+        "discount": invoice.get("discount", 0),
+        "total": invoice.get("total", 0),
+        "paid_amount": invoice.get("paid_amount", 0),
+        "balance": invoice.get("balance", 0),
+        "notes": invoice.get("notes") or "",
+    }
+
+def invoice_pdf_hash(document: dict) -> str:
+    return hashlib.sha256(orjson.dumps(document, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def _invoice_header_ops(document: dict) -> bytes:
+    seller, buyer = document["seller"], document["buyer"]
+    ops = [_pdf_text(PDF_LEFT, 790, _fit_text(seller["name"], 320, 15), 15, bold=True)]
+    y = 774
+    for line in _wrap_text(seller["address"], 320, 9, 3):
+        ops.append(_pdf_text(PDF_LEFT, y, line, 9))
+        y -= 12
+    for label, value in (("GSTIN", seller["gstin"]), ("Phone", seller["phone"]), ("Email", seller["email"])):
+        if value:
+            ops.append(_pdf_text(PDF_LEFT, y, _fit_text(f"{label}: {value}", 320, 9), 9))
+            y -= 12
+
+    for y, value in [
+        (766, document["invoice_number"]), (752, document["invoice_date"]),
+        (738, document["due_date"]), (724, document["place_of_supply"]),
+    ]:
+        ops.append(_pdf_text(460, y, _fit_text(value, PDF_RIGHT - 460, 8), 8, right=PDF_RIGHT))
+
+    ops.append(_pdf_text(PDF_LEFT, 684, _fit_text(buyer["name"], 320, 10), 10, bold=True))
+    y = 671
+    for line in _wrap_text(buyer["address"], 320, 9, 2):
+        ops.append(_pdf_text(PDF_LEFT, y, line, 9))
+        y -= 11
+    details = [f"{label}: {value}" for label, value in (("GSTIN", buyer["gstin"]), ("Phone", buyer["phone"])) if value]
+    if details:
+        ops.append(_pdf_text(PDF_LEFT, y, _fit_text("   ".join(details), 500, 9), 9))
+    return b"".join(ops)
+
+def _invoice_row_ops(item: dict, y: float) -> bytes:
+    ops = []
+    for key, _, x, width, align in INVOICE_PDF_COLUMNS:
+        text = _fit_text(item[key], width - 5, 8)
+        ops.append(_pdf_text(x + 2, y, text, 8, right=x + width - 3 if align == "right" else None))
+    return b"".join(ops)
+
+def _invoice_totals_ops(document: dict, top: float) -> bytes:
+    ops = [_pdf_line(PDF_LEFT, top, PDF_RIGHT, top)]
+    tax = document["tax_amount"]
+    rows = [("Taxable Value", document["subtotal"], False)]
+    if document["inter_state"]:
+        rows.append(("IGST", tax, False))
+    else:
+        rows += [("CGST", tax / 2, False), ("SGST", tax / 2, False)]
+    if document["discount"]:
+        rows.append(("Discount", -document["discount"], False))
+    rows += [("Total", document["total"], True), ("Paid", document["paid_amount"], False), ("Balance Due", document["balance"], True)]
+
+    y = top - 16
+    for label, amount, bold in rows:
+        if label == "Total":
+            ops.append(_pdf_line(360, y + 11, PDF_RIGHT, y + 11))
+        ops.append(_pdf_text(360, y, label, 9, bold=bold))
+        ops.append(_pdf_text(0, y, format_inr(amount), 9, bold=bold, right=PDF_RIGHT - 3))
+        y -= 14
+
+    if document["notes"]:
+        ops.append(_pdf_text(PDF_LEFT, top - 16, "Notes", 8, bold=True))
+        for index, line in enumerate(_wrap_text(document["notes"], 290, 8, 6)):
+            ops.append(_pdf_text(PDF_LEFT, top - 28 - index * 11, line, 8))
+
+    ops.append(_pdf_text(0, y - 16, _fit_text(f"For {document['seller']['name']}", 195, 9), 9, bold=True, right=PDF_RIGHT))
+    ops.append(_pdf_text(0, y - 46, "Authorised Signatory", 8, right=PDF_RIGHT))
+    return b"".join(ops)
+
+def _paginate_rows(items: list, template: dict) -> List[list]:
+    """Split line items over pages so the last page also has room for the totals"""
+    pages = []
+    remaining = items
+    while True:
+        capacity = template["next_capacity"] if pages else template["first_capacity"]
+        if len(remaining) <= capacity - template["totals_rows"]:
+            pages.append(remaining)
+            return pages
+        # Carry at least one row over so the totals never sit under an empty table
+        take = min(capacity, len(remaining) - 1)
+        pages.append(remaining[:take])
+        remaining = remaining[take:]
+
+def render_invoice_pdf(document: dict) -> bytes:
+    """A complete PDF for one invoice_pdf_document(); CPU-bound, so run it in the renderer pool"""
+    template = invoice_pdf_template()
+    pages = _paginate_rows(document["items"], template)
+
+    streams = []
+    for page_number, rows in enumerate(pages, start=1):
+        first = page_number == 1
+        ops = [template["first_frame"] if first else template["next_frame"]]
+        if first:
+            ops.append(_invoice_header_ops(document))
+        y = template["first_row_y"] if first else template["next_row_y"]
+        for item in rows:
+            ops.append(_invoice_row_ops(item, y))
+            y -= PDF_ROW_HEIGHT
+        if page_number == len(pages):
+            ops.append(_invoice_totals_ops(document, y + 4))
+        ops.append(_pdf_text(0, 28, f"{document['invoice_number']}  Page {page_number} of {len(pages)}", 7, right=PDF_RIGHT))
+        streams.append(zlib.compress(b"".join(ops)))
+
+    # Objects: 1 catalog, 2 page tree, 3-4 fonts, then a page and its content stream per page
+    page_ids = [5 + 2 * index for index in range(len(pages))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(pages)),
+        *template["fonts"],
+    ]
+    for page_id, stream in zip(page_ids, streams):
+        objects.append(template["page"] % (page_id + 1))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    out = bytearray(template["header"])
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def render_invoice_pdf_chunk(documents: List[dict]) -> List[bytes]:
+    return [render_invoice_pdf(document) for document in documents]
+
+class PdfRenderer:
+    """Renders invoice PDFs in a worker pool so layout and compression never run on the event loop.
+
+    Each worker compiles the template when it starts and reuses it for every PDF it renders.
+    """
+
+    def __init__(self, executor_kind: str, workers: int, chunk_size: int):
+        if executor_kind not in ("thread", "process"):
+            raise ValueError(f"Unknown PDF render executor: {executor_kind}")
+        self.executor_kind = executor_kind
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.rendered = 0
+        self.cache_hits = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so process pools are started after the server has forked its workers
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=invoice_pdf_template)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="pdf", initializer=invoice_pdf_template
+                )
+        return self._executor
+
+    async def render_many(self, documents: List[dict]) -> List[bytes]:
+        if not documents:
+            return []
+        # Chunks amortise pickling round trips without letting one batch occupy every worker
+        size = max(1, min(self.chunk_size, -(-len(documents) // self.workers)))
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self._get_executor(), render_invoice_pdf_chunk, documents[start:start + size])
+            for start in range(0, len(documents), size)
+        ))
+        self.rendered += len(documents)
+        return [pdf for chunk in chunks for pdf in chunk]
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "rendered": self.rendered,
+            "cache_hits": self.cache_hits
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+pdf_renderer = PdfRenderer(PDF_RENDER_EXECUTOR, PDF_RENDER_WORKERS, PDF_RENDER_CHUNK_SIZE)
+
+async def invoice_pdf_documents(business_id: str, invoices: List[dict]) -> List[dict]:
+    business = await db.businesses.find_one({"id": business_id}, {"_id": 0}) or {}
+    customers = {
+        customer["id"]: customer
+        async for customer in db.customers.find(
+            {"business_id": business_id, "id": {"$in": list({invoice["customer_id"] for invoice in invoices})}},
+            {"_id": 0, "id": 1, "name": 1, "address": 1, "gstin": 1, "phone": 1}
+        )
+    }
+    products = await product_catalog.get_products(
+        business_id, [item["product_id"] for invoice in invoices for item in invoice.get("items", [])]
+    )
+    return [
+        invoice_pdf_document(invoice, business, customers.get(invoice["customer_id"], {}), products)
+        for invoice in invoices
+    ]
+
+async def cached_invoice_pdfs(business_id: str, documents: List[dict], hashes: List[str]) -> List[bytes]:
+    """The PDF for each document, rendering only content hashes not found in rendered_pdfs"""
+    pdfs = {
+        doc["_id"]: doc["pdf"]
+        async for doc in db.rendered_pdfs.find({"_id": {"$in": list(set(hashes))}}, {"pdf": 1})
+    }
+    missing = {content_hash: document for content_hash, document in zip(hashes, documents) if content_hash not in pdfs}
+    pdf_renderer.cache_hits += len(hashes) - len(missing)
+
+    if missing:
+        rendered = dict(zip(missing, await pdf_renderer.render_many(list(missing.values()))))
+        pdfs.update(rendered)
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=PDF_CACHE_TTL_HOURS)
+        try:
+            await db.rendered_pdfs.insert_many(
+                [
+                    {"_id": content_hash, "business_id": business_id, "pdf": pdf, "expires_at": expires_at}
+                    for content_hash, pdf in rendered.items()
+                ],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # Another request cached the same content first; the bytes are identical
+            if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+    return [pdfs[content_hash] for content_hash in hashes]
+
+def pdf_filename(invoice_number: str) -> str:
+    return f"{re.sub(r'[^A-Za-z0-9._-]+', '_', invoice_number) or 'invoice'}.pdf"
+
+def build_zip(files: List[tuple]) -> bytes:
+    buffer = io.BytesIO()
+    # PDF streams are already deflated, so storing them is as small and much cheaper
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+# ============= GST RETURNS =============
+
+GST_SUMMARY_FORMATS = {"json": "application/json", "csv": "text/csv"}
+
+# Columns of the GSTR-1 HSN-wise summary (table 12), in filing order
+HSN_SUMMARY_COLUMNS = [
+    "hsn_code", "description", "uqc", "total_quantity", "total_value",
+    "tax_rate", "taxable_value", "igst", "cgst", "sgst",
+]
+
+def _validate_gst_format(export_format: str) -> None:
+    if export_format not in GST_SUMMARY_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(GST_SUMMARY_FORMATS)}")
+
+def gst_period(month: Optional[str], date_from: Optional[date], date_to: Optional[date]) -> tuple:
+    """(from, to) for a YYYY-MM return period, or the explicit range when no month is given"""
+    if not month:
+        return date_from, date_to
+    try:
+        first = datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must look like YYYY-MM")
+    next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first, next_month - timedelta(days=1)
+
+def _round2(expr) -> dict:
+    return {"$round": [expr, 2]}
+
+async def build_gst_summary(business_id: str, date_from: Optional[date], date_to: Optional[date]) -> dict:
+    """HSN-wise and rate-wise taxable value and tax for the invoices dated in the period.
+
+    Runs as one aggregation: line items are unwound and collapsed per customer, product
+    and rate before the customer and product lookups, so lookups scale with distinct
+    combinations rather than with line items. Taxable value is the line amount, the same
+    base invoice tax_amount is computed on; invoice-level discounts are not apportioned.
+    """
+    business = await db.businesses.find_one({"id": business_id}, {"_id": 0, "gstin": 1}) or {}
+    seller_state = gst_state_code(business.get("gstin"))
+
+    buyer_gstin = {"$ifNull": [{"$arrayElemAt": ["$customer.gstin", 0]}, ""]}
+    buyer_state = {"$substrCP": [buyer_gstin, 0, 2]}
+    # Same rule as the invoice PDF: inter-state only when both states are known and differ
+    inter_state = {"$and": [{"$ne": [buyer_state, ""]}, {"$ne": [buyer_state, seller_state]}]} if seller_state else {"$literal": False}
+
+    def product_field(field: str, default: str = "") -> dict:
+        return {"$ifNull": [{"$arrayElemAt": [f"$product.{field}", 0]}, default]}
+
+    query = {"business_id": business_id, **date_range_filter("invoice_date", date_from, date_to)}
+    pipeline = [
+        {"$match": query},
+        {"$project": {
+            "_id": 0, "customer_id": 1,
+            "items.product_id": 1, "items.quantity": 1, "items.tax_rate": 1, "items.amount": 1
+        }},
+        {"$unwind": "$items"},
+        {"$group": {
+            "_id": {"customer": "$customer_id", "product": "$items.product_id", "rate": "$items.tax_rate"},
+            "taxable": {"$sum": "$items.amount"},
+            "quantity": {"$sum": "$items.quantity"}
+        }},
+        {"$group": {
+            "_id": "$_id.customer",
+            "lines": {"$push": {"product": "$_id.product", "rate": "$_id.rate", "taxable": "$taxable", "quantity": "$quantity"}}
+        }},
+        {"$lookup": {
+            "from": "customers", "localField": "_id", "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "gstin": 1}}], "as": "customer"
+        }},
+        {"$set": {"inter_state": inter_state, "registered": {"$gt": [{"$strLenCP": buyer_gstin}, 0]}}},
+        {"$unwind": "$lines"},
+        {"$group": {
+            "_id": {"product": "$lines.product", "rate": "$lines.rate"},
+            "taxable": {"$sum": "$lines.taxable"},
+            "quantity": {"$sum": "$lines.quantity"},
+            "inter_state_taxable": {"$sum": {"$cond": ["$inter_state", "$lines.taxable", 0]}},
+            "b2b_taxable": {"$sum": {"$cond": ["$registered", "$lines.taxable", 0]}}
+        }},
+        {"$lookup": {
+            "from": "products", "localField": "_id.product", "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "hsn_code": 1, "name": 1, "unit": 1}}], "as": "product"
+        }},
+        {"$set": {
+            "rate": "$_id.rate",
+            "hsn_code": product_field("hsn_code"),
+            "description": product_field("name"),
+            "uqc": product_field("unit"),
+            "igst": {"$multiply": ["$inter_state_taxable", "$_id.rate", 0.01]},
+            # CGST and SGST each carry half the rate on intra-state supplies
+            "half_tax": {"$multiply": [{"$subtract": ["$taxable", "$inter_state_taxable"]}, "$_id.rate", 0.005]}
+        }},
+        {"$facet": {
+            "hsn": [
+                {"$group": {
+                    "_id": {"hsn_code": "$hsn_code", "rate": "$rate", "uqc": "$uqc"},
+                    "description": {"$first": "$description"},
+                    "total_quantity": {"$sum": "$quantity"},
+                    "taxable_value": {"$sum": "$taxable"},
+                    "igst": {"$sum": "$igst"},
+                    "half_tax": {"$sum": "$half_tax"}
+                }},
+                {"$sort": {"_id.hsn_code": 1, "_id.rate": 1, "_id.uqc": 1}},
+                {"$project": {
+                    "_id": 0,
+                    "hsn_code": "$_id.hsn_code",
+                    "description": 1,
+                    "uqc": "$_id.uqc",
+                    "total_quantity": 1,
+                    "total_value": _round2({"$add": ["$taxable_value", "$igst", "$half_tax", "$half_tax"]}),
+                    "tax_rate": "$_id.rate",
+                    "taxable_value": _round2("$taxable_value"),
+                    "igst": _round2("$igst"),
+                    "cgst": _round2("$half_tax"),
+                    "sgst": _round2("$half_tax")
+                }}
+            ],
+            "rates": [
+                {"$group": {
+                    "_id": "$rate",
+                    "taxable_value": {"$sum": "$taxable"},
+                    "b2b_taxable_value": {"$sum": "$b2b_taxable"},
+                    "igst": {"$sum": "$igst"},
+                    "half_tax": {"$sum": "$half_tax"}
+                }},
+                {"$sort": {"_id": 1}},
+                {"$project": {
+                    "_id": 0,
+                    "tax_rate": "$_id",
+                    "taxable_value": _round2("$taxable_value"),
+                    "b2b_taxable_value": _round2("$b2b_taxable_value"),
+                    "b2c_taxable_value": _round2({"$subtract": ["$taxable_value", "$b2b_taxable_value"]}),
+                    "igst": _round2("$igst"),
+                    "cgst": _round2("$half_tax"),
+                    "sgst": _round2("$half_tax")
+                }}
+            ]
+        }}
+    ]
+
+    facets, invoice_count = await asyncio.gather(
+        analytics_db.invoices.aggregate(pipeline, allowDiskUse=True).to_list(1),
+        analytics_db.invoices.count_documents(query)
+    )
+    hsn_rows = facets[0]["hsn"] if facets else []
+    rate_rows = facets[0]["rates"] if facets else []
+    totals = {
+        field: round(sum(row[field] for row in rate_rows), 2)
+        for field in ("taxable_value", "b2b_taxable_value", "b2c_taxable_value", "igst", "cgst", "sgst")
+    }
+    totals["total_tax"] = round(totals["igst"] + totals["cgst"] + totals["sgst"], 2)
+
+    return {
+        "from": date_from,
+        "to": date_to,
+        "gstin": business.get("gstin"),
+        "invoice_count": invoice_count,
+        "hsn_summary": hsn_rows,
+        "rate_summary": rate_rows,
+        "totals": totals
+    }
+
+def gst_summary_csv(summary: dict) -> str:
+    """The HSN-wise summary in GSTR-1 table 12 column order"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=HSN_SUMMARY_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(summary["hsn_summary"])
+    return buffer.getvalue()
+
+def gst_summary_filename(date_from: Optional[date], date_to: Optional[date], export_format: str) -> str:
+    period = "-".join(value.isoformat() for value in (date_from, date_to) if value) or "all"
+    return f"gst-summary-{period}.{export_format}"
+
+# ============= ROUTES =============
+
+@api_router.get("/")
+async def root():
+    return {"message": "Bill Book & Expense Management API"}
+
+# AUTH ROUTES
+@api_router.post("/auth/signup")
+async def signup(user_data: UserCreate):
+    # Check if user exists
+    existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    # Hash password
+    hashed_password = await password_hasher.hash(user_data.password)
+
+    # Create user
+    user = User(
+        email=user_data.email,
+        name=user_data.name,
+        mobile=user_data.mobile
+    )
+
+    user_doc = to_document(user)
+    user_doc['password'] = hashed_password
+
+    await db.users.insert_one(user_doc)
+
+    # Create token
+    token = create_access_token({"sub": user.id, "email": user.email})
+
+    return {"user": user, "token": token}
+
+@api_router.post("/auth/login")
+async def login(credentials: UserLogin):
+    # Find user
+    user_doc = await db.users.find_one({"email": credentials.email}, {"_id": 0})
+    if not user_doc:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Verify password
+    if not await password_hasher.verify(credentials.password, user_doc['password']):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    user = User(**{k: v for k, v in user_doc.items() if k != 'password'})
+
+    # Create token
+    token = create_access_token({"sub": user.id, "email": user.email})
+
+    return {"user": user, "token": token}
+
+@api_router.get("/auth/me", response_model=User)
+async def get_me(current_user: User = Depends(get_current_user)):
+    return current_user
+
+@api_router.get("/system/user-cache")
+async def get_user_cache_stats(current_user: User = Depends(get_current_user)):
+    return user_cache.stats()
+
+@api_router.get("/system/product-catalog-cache")
+async def get_product_catalog_cache_stats(current_user: User = Depends(get_current_user)):
+    return product_catalog.stats()
+
+@api_router.get("/system/job-queue")
+async def get_job_queue_stats(current_user: User = Depends(get_current_user)):
+    return job_queue.stats()
+
+@api_router.get("/system/pdf-renderer")
+async def get_pdf_renderer_stats(current_user: User = Depends(get_current_user)):
+    return pdf_renderer.stats()
+
+@api_router.get("/system/indexes")
+async def get_index_report(current_user: User = Depends(get_current_user)):
+    return {"drift": await get_index_drift()}
+
+# BUSINESS ROUTES
+@api_router.post("/businesses", response_model=Business)
+async def create_business(business_data: BusinessCreate, current_user: User = Depends(get_current_user)):
+    business = Business(**business_data.model_dump(), owner_id=current_user.id)
+
+    doc = to_document(business)
+
+    await db.businesses.insert_one(doc)
+    await create_business_summary(business.id)
+    await db.monthly_rollups.insert_one({"_id": f"{business.id}:ready", "business_id": business.id, "kind": "marker"})
+
+    # Update user's business_id
+    await db.users.update_one({"id": current_user.id}, {"$set": {"business_id": business.id}})
+    await bump_user_version(current_user.id)
+
+    return business
+
+@api_router.get("/businesses", response_model=List[Business])
+async def get_businesses(current_user: User = Depends(get_current_user)):
+    businesses = await db.businesses.find({"owner_id": current_user.id}, {"_id": 0}).to_list(100)
+    return businesses
+
+@api_router.get("/businesses/{business_id}", response_model=Business)
+async def get_business(business_id: str, current_user: User = Depends(get_current_user)):
+    business = await db.businesses.find_one({"id": business_id}, {"_id": 0})
+    if not business:
+        raise HTTPException(status_code=404, detail="Business not found")
+    return business
+
+@api_router.put("/businesses/{business_id}", response_model=Business)
+async def update_business(business_id: str, business_data: BusinessCreate, current_user: User = Depends(get_current_user)):
+    result = await db.businesses.update_one(
+        {"id": business_id, "owner_id": current_user.id},
+        {"$set": business_data.model_dump()}
+    )
+
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Business not found")
+
+    business = await db.businesses.find_one({"id": business_id}, {"_id": 0})
+    return business
+
+# CUSTOMER ROUTES
+@api_router.post("/customers", response_model=Customer)
+async def create_customer(customer_data: CustomerCreate, current_user: User = Depends(get_current_user)):
+    if not current_user.business_id:
+        raise HTTPException(status_code=400, detail="Please create a business first")
+
+    customer = Customer(**customer_data.model_dump(), business_id=current_user.business_id)
+
+    doc = to_document(customer)
+    doc.update(search_fields("customers", doc))
+
+    await db.customers.insert_one(doc)
+    await bump_change_versions(current_user.business_id, "customers")
+    await bump_business_summary(current_user.business_id, customers_count=1)
+    return customer
+
+@api_router.get("/customers", response_model=Page[sparse_model(Customer)])
+async def get_customers(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.business_id:
+        return {"items": [], "next_cursor": None}
+
+    projection = sparse_projection(Customer, fields, HIDE_SEARCH_FIELDS)
+    return await conditional_json(
+        request, current_user.business_id, ["customers"],
+        lambda: paginate(db.customers, {"business_id": current_user.business_id}, limit, cursor, projection=projection)
+    )
+
+@api_router.get("/customers/search")
+async def search_customers(
+    q: str,
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
         return []
-    
-    customers = await db.customers.find({"business_id": current_user.business_id}, {"_id": 0}).to_list(1000)
-    return customers
+
+    return trusted_json(await search_records("customers", current_user.business_id, q, limit))
 
 @api_router.get("/customers/{customer_id}", response_model=Customer)
-async def get_customer(customer_id: str, current_user: User = Depends(get_current_user)):
-    customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
-    return customer
+async def get_customer(customer_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    async def load():
+        customer = await db.customers.find_one({"id": customer_id, "business_id": current_user.business_id}, HIDE_SEARCH_FIELDS)
+        if not customer:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return customer
+
+    return await conditional_json(request, current_user.business_id, ["customers"], load)
 
 @api_router.put("/customers/{customer_id}", response_model=Customer)
 async def update_customer(customer_id: str, customer_data: CustomerCreate, current_user: User = Depends(get_current_user)):
     result = await db.customers.update_one(
         {"id": customer_id, "business_id": current_user.business_id},
-        {"$set": customer_data.model_dump()}
+        {"$set": {**customer_data.model_dump(), **search_fields("customers", customer_data.model_dump())}}
     )
-    
+
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
-    
+    await bump_change_versions(current_user.business_id, "customers")
+
     customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
     return customer
 
@@ -604,6 +3312,8 @@ async def delete_customer(customer_id: str, current_user: User = Depends(get_cur
     result = await db.customers.delete_one({"id": customer_id, "business_id": current_user.business_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
+    await bump_change_versions(current_user.business_id, "customers")
+    await bump_business_summary(current_user.business_id, customers_count=-1)
     return {"message": "Customer deleted successfully"}
 
 # VENDOR ROUTES
@@ -611,29 +3321,41 @@ async def delete_customer(customer_id: str, current_user: User = Depends(get_cur
 async def create_vendor(vendor_data: VendorCreate, current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         raise HTTPException(status_code=400, detail="Please create a business first")
-    
+
     vendor = Vendor(**vendor_data.model_dump(), business_id=current_user.business_id)
-    
-    doc = vendor.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
+
+    doc = to_document(vendor)
+
     await db.vendors.insert_one(doc)
+    await bump_change_versions(current_user.business_id, "vendors")
     return vendor
 
-@api_router.get("/vendors", response_model=List[Vendor])
-async def get_vendors(current_user: User = Depends(get_current_user)):
+@api_router.get("/vendors", response_model=Page[sparse_model(Vendor)])
+async def get_vendors(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
-        return []
-    
-    vendors = await db.vendors.find({"business_id": current_user.business_id}, {"_id": 0}).to_list(1000)
-    return vendors
+        return {"items": [], "next_cursor": None}
+
+    projection = sparse_projection(Vendor, fields)
+    return await conditional_json(
+        request, current_user.business_id, ["vendors"],
+        lambda: paginate(db.vendors, {"business_id": current_user.business_id}, limit, cursor, projection=projection)
+    )
 
 @api_router.get("/vendors/{vendor_id}", response_model=Vendor)
-async def get_vendor(vendor_id: str, current_user: User = Depends(get_current_user)):
-    vendor = await db.vendors.find_one({"id": vendor_id}, {"_id": 0})
-    if not vendor:
-        raise HTTPException(status_code=404, detail="Vendor not found")
-    return vendor
+async def get_vendor(vendor_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    async def load():
+        vendor = await db.vendors.find_one({"id": vendor_id, "business_id": current_user.business_id}, {"_id": 0})
+        if not vendor:
+            raise HTTPException(status_code=404, detail="Vendor not found")
+        return vendor
+
+    return await conditional_json(request, current_user.business_id, ["vendors"], load)
 
 @api_router.put("/vendors/{vendor_id}", response_model=Vendor)
 async def update_vendor(vendor_id: str, vendor_data: VendorCreate, current_user: User = Depends(get_current_user)):
@@ -641,10 +3363,11 @@ async def update_vendor(vendor_id: str, vendor_data: VendorCreate, current_user:
         {"id": vendor_id, "business_id": current_user.business_id},
         {"$set": vendor_data.model_dump()}
     )
-    
+
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Vendor not found")
-    
+    await bump_change_versions(current_user.business_id, "vendors")
+
     vendor = await db.vendors.find_one({"id": vendor_id}, {"_id": 0})
     return vendor
 
@@ -653,6 +3376,7 @@ async def delete_vendor(vendor_id: str, current_user: User = Depends(get_current
     result = await db.vendors.delete_one({"id": vendor_id, "business_id": current_user.business_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Vendor not found")
+    await bump_change_versions(current_user.business_id, "vendors")
     return {"message": "Vendor deleted successfully"}
 
 # PRODUCT ROUTES
@@ -660,40 +3384,66 @@ async def delete_vendor(vendor_id: str, current_user: User = Depends(get_current
 async def create_product(product_data: ProductCreate, current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         raise HTTPException(status_code=400, detail="Please create a business first")
-    
+
     product = Product(**product_data.model_dump(), business_id=current_user.business_id)
-    
-    doc = product.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
+
+    doc = to_document(product)
+    doc.update(search_fields("products", doc))
+
     await db.products.insert_one(doc)
+    await bump_change_versions(current_user.business_id, "products", "product_catalog")
+    await bump_business_summary(current_user.business_id, products_count=1)
     return product
 
-@api_router.get("/products", response_model=List[Product])
-async def get_products(current_user: User = Depends(get_current_user)):
+@api_router.get("/products", response_model=Page[sparse_model(Product)])
+async def get_products(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.business_id:
+        return {"items": [], "next_cursor": None}
+
+    projection = sparse_projection(Product, fields, HIDE_SEARCH_FIELDS)
+    return await conditional_json(
+        request, current_user.business_id, ["products"],
+        lambda: paginate(db.products, {"business_id": current_user.business_id}, limit, cursor, projection=projection)
+    )
+
+@api_router.get("/products/search")
+async def search_products(
+    q: str,
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
         return []
-    
-    products = await db.products.find({"business_id": current_user.business_id}, {"_id": 0}).to_list(1000)
-    return products
+
+    return trusted_json(await search_records("products", current_user.business_id, q, limit))
 
 @api_router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str, current_user: User = Depends(get_current_user)):
-    product = await db.products.find_one({"id": product_id}, {"_id": 0})
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+async def get_product(product_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    async def load():
+        product = await db.products.find_one({"id": product_id, "business_id": current_user.business_id}, HIDE_SEARCH_FIELDS)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return product
+
+    return await conditional_json(request, current_user.business_id, ["products"], load)
 
 @api_router.put("/products/{product_id}", response_model=Product)
 async def update_product(product_id: str, product_data: ProductCreate, current_user: User = Depends(get_current_user)):
     result = await db.products.update_one(
         {"id": product_id, "business_id": current_user.business_id},
-        {"$set": product_data.model_dump()}
+        {"$set": {**product_data.model_dump(), **search_fields("products", product_data.model_dump())}}
     )
-    
+
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
-    
+    await bump_change_versions(current_user.business_id, "products", "product_catalog")
+
     product = await db.products.find_one({"id": product_id}, {"_id": 0})
     return product
 
@@ -702,32 +3452,79 @@ async def delete_product(product_id: str, current_user: User = Depends(get_curre
     result = await db.products.delete_one({"id": product_id, "business_id": current_user.business_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    await bump_change_versions(current_user.business_id, "products", "product_catalog")
+    await bump_business_summary(current_user.business_id, products_count=-1)
     return {"message": "Product deleted successfully"}
 
-# INVOICE ROUTES
-@api_router.post("/invoices", response_model=Invoice)
-async def create_invoice(invoice_data: InvoiceCreate, current_user: User = Depends(get_current_user)):
+# BULK IMPORT ROUTES
+@api_router.post("/import/{entity}")
+async def import_entities(
+    entity: str,
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format"),
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
         raise HTTPException(status_code=400, detail="Please create a business first")
-    
-    # Get customer
-    customer = await db.customers.find_one({"id": invoice_data.customer_id}, {"_id": 0})
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
-    
+    if entity not in IMPORTABLE_ENTITIES:
+        raise HTTPException(status_code=404, detail=f"Cannot import {entity}")
+
+    if import_format is None:
+        content_type = request.headers.get("content-type", "")
+        import_format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+
+    create_model, record_model, summary_field = IMPORTABLE_ENTITIES[entity]
+    report = await import_records(
+        request.stream(),
+        import_format,
+        create_model,
+        record_model,
+        db[entity],
+        current_user.business_id
+    )
+
+    if report["inserted"]:
+        await bump_change_versions(current_user.business_id, entity, *(["product_catalog"] if entity == "products" else []))
+    if summary_field:
+        await bump_business_summary(current_user.business_id, **{summary_field: report["inserted"]})
+
+    return report
+
+# EXPORT ROUTES
+@api_router.get("/export/{entity}")
+async def export_entities(
+    entity: str,
+    export_format: str = Query("csv", alias="format"),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    flatten_items: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.business_id:
+        raise HTTPException(status_code=400, detail="Please create a business first")
+    _validate_export(entity, export_format)
+
+    cursor = export_cursor(current_user.business_id, entity, date_from, date_to)
+    return StreamingResponse(
+        stream_export(cursor, entity, export_format, flatten_items),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{export_format}"'}
+    )
+
+# INVOICE ROUTES
+def build_invoice(invoice_data: InvoiceCreate, customer: dict, business_id: str, invoice_number: str) -> Invoice:
     # Calculate totals
     subtotal = sum(item.amount for item in invoice_data.items)
     tax_amount = sum(item.amount * item.tax_rate / 100 for item in invoice_data.items)
     total = subtotal + tax_amount - invoice_data.discount
-    
-    # Generate invoice number
-    invoice_number = await generate_invoice_number(current_user.business_id)
-    
-    invoice = Invoice(
+
+    return Invoice(
         invoice_number=invoice_number,
         customer_id=invoice_data.customer_id,
         customer_name=customer['name'],
-        business_id=current_user.business_id,
+        business_id=business_id,
         invoice_date=invoice_data.invoice_date or datetime.now(timezone.utc),
         due_date=invoice_data.due_date,
         items=[item.model_dump() for item in invoice_data.items],
@@ -738,44 +3535,233 @@ async def create_invoice(invoice_data: InvoiceCreate, current_user: User = Depen
         balance=total,
         notes=invoice_data.notes
     )
-    
-    doc = invoice.model_dump()
-    doc['invoice_date'] = doc['invoice_date'].isoformat()
-    if doc['due_date']:
-        doc['due_date'] = doc['due_date'].isoformat()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
-    await db.invoices.insert_one(doc)
-    
-    # Update product stock
-    for item in invoice_data.items:
-        await db.products.update_one(
-            {"id": item.product_id},
-            {"$inc": {"stock_quantity": -item.quantity}}
+
+async def write_invoices(
+    business_id: str,
+    invoices: List[Invoice],
+    stock_decrements: Dict[str, float],
+    reserve_numbers: bool = False
+) -> None:
+    """Insert invoices with their stock movements, summary and rollup deltas in one transaction.
+
+    With reserve_numbers the invoice numbers are reserved in that same transaction, so a
+    failed write leaves no gap in the series (on a standalone mongod it still can).
+    """
+    # Only this business's own catalog moves; free-text or foreign product ids carry no stock
+    known_products = await product_catalog.get_products(business_id, stock_decrements)
+    stock_ops = stock_movements({
+        product_id: quantity for product_id, quantity in stock_decrements.items() if product_id in known_products
+    })
+
+    monthly: Dict[str, dict] = {}
+    for invoice in invoices:
+        deltas = monthly.setdefault(month_key(invoice.invoice_date), {
+            "when": invoice.invoice_date, "total": 0, "tax": 0, "outstanding": 0, "count": 0
+        })
+        deltas["total"] += invoice.total
+        deltas["tax"] += invoice.tax_amount
+        deltas["outstanding"] += invoice.balance
+        deltas["count"] += 1
+
+    async def write(session):
+        if reserve_numbers:
+            numbers = await document_numbers.reserve_range(business_id, "invoice", len(invoices), session=session)
+            for invoice, number in zip(invoices, numbers):
+                invoice.invoice_number = document_numbers.format("invoice", number)
+        docs = [to_document(invoice) for invoice in invoices]
+        if len(docs) == 1:
+            await db.invoices.insert_one(docs[0], session=session)
+        else:
+            await db.invoices.insert_many(docs, session=session)
+        if stock_ops:
+            await db.products.bulk_write(stock_ops, ordered=False, session=session)
+        await bump_business_summary(
+            business_id,
+            session=session,
+            total_sales=sum(invoice.total for invoice in invoices),
+            total_outstanding=sum(outstanding_contribution(invoice.balance, invoice.status) for invoice in invoices),
+            invoices_count=len(invoices)
+        )
+        for deltas in monthly.values():
+            await bump_monthly_rollup(
+                business_id, "sales", deltas["when"],
+                session=session,
+                total=deltas["total"], tax=deltas["tax"], outstanding=deltas["outstanding"], count=deltas["count"]
+            )
+        await bump_change_versions(business_id, "invoices", *(["products"] if stock_ops else []), session=session)
+
+    await run_in_transaction(write)
+
+@api_router.post("/invoices", response_model=Invoice)
+async def create_invoice(invoice_data: InvoiceCreate, current_user: User = Depends(get_current_user)):
+    if not current_user.business_id:
+        raise HTTPException(status_code=400, detail="Please create a business first")
+
+    # Get customer
+    customer = await db.customers.find_one({"id": invoice_data.customer_id}, {"_id": 0})
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    # Generate invoice number
+    invoice_number = await generate_invoice_number(current_user.business_id)
+
+    invoice = build_invoice(invoice_data, customer, current_user.business_id, invoice_number)
+
+    # Invoice, stock movements and summaries commit or roll back together
+    await write_invoices(current_user.business_id, [invoice], merge_stock_decrements(invoice_data.items))
+
+    return invoice
+
+def invoice_batch_error(invoice_data: InvoiceCreate, customers: Dict[str, dict]) -> Optional[str]:
+    """Why one invoice of a batch cannot be created, or None"""
+    if invoice_data.customer_id not in customers:
+        return "Customer not found"
+    if not invoice_data.items:
+        return "Invoice has no items"
+    if any(item.quantity <= 0 for item in invoice_data.items):
+        return "Item quantities must be positive"
+    gross = sum(item.amount * (1 + item.tax_rate / 100) for item in invoice_data.items)
+    if invoice_data.discount < 0 or invoice_data.discount > gross:
+        return "Discount must be between 0 and the invoice total"
+    return None
+
+@api_router.post("/invoices/batch", response_model=List[InvoiceBatchResult])
+async def create_invoices_batch(batch: InvoiceBatchCreate, current_user: User = Depends(get_current_user)):
+    if not current_user.business_id:
+        raise HTTPException(status_code=400, detail="Please create a business first")
+    if len(batch.invoices) > INVOICE_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"A batch can hold at most {INVOICE_BATCH_MAX_SIZE} invoices")
+
+    business_id = current_user.business_id
+
+    # Resolve every customer in one query
+    customer_ids = list({invoice_data.customer_id for invoice_data in batch.invoices})
+    customers = {
+        customer['id']: customer
+        async for customer in db.customers.find(
+            {"id": {"$in": customer_ids}, "business_id": business_id}, {"_id": 0, "id": 1, "name": 1}
         )
-    
-    return invoice
+    }
+
+    # Invalid invoices are reported per item; the valid ones are written together or not at all
+    results = []
+    invoices = []
+    stock_decrements: Dict[str, float] = {}
+    for index, invoice_data in enumerate(batch.invoices):
+        error = invoice_batch_error(invoice_data, customers)
+        if error:
+            results.append(InvoiceBatchResult(index=index, status="error", detail=error))
+            continue
+        invoice = build_invoice(invoice_data, customers[invoice_data.customer_id], business_id, "")
+        invoices.append((index, invoice))
+        for product_id, quantity in merge_stock_decrements(invoice_data.items).items():
+            stock_decrements[product_id] = stock_decrements.get(product_id, 0) + quantity
+
+    if invoices:
+        await write_invoices(business_id, [invoice for _, invoice in invoices], stock_decrements, reserve_numbers=True)
+        results.extend(
+            InvoiceBatchResult(index=index, status="created", invoice_id=invoice.id, invoice_number=invoice.invoice_number)
+            for index, invoice in invoices
+        )
+
+    return sorted(results, key=lambda result: result.index)
 
-@api_router.get("/invoices", response_model=List[Invoice])
-async def get_invoices(current_user: User = Depends(get_current_user)):
+@api_router.get("/invoices", response_model=Page[sparse_model(Invoice)])
+async def get_invoices(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
-        return []
-    
-    invoices = await db.invoices.find({"business_id": current_user.business_id}, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return invoices
+        return {"items": [], "next_cursor": None}
+
+    projection = sparse_projection(Invoice, fields)
+    return await conditional_json(
+        request, current_user.business_id, ["invoices"],
+        lambda: paginate(db.invoices, {"business_id": current_user.business_id}, limit, cursor, projection=projection)
+    )
 
 @api_router.get("/invoices/{invoice_id}", response_model=Invoice)
-async def get_invoice(invoice_id: str, current_user: User = Depends(get_current_user)):
-    invoice = await db.invoices.find_one({"id": invoice_id}, {"_id": 0})
+async def get_invoice(invoice_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    async def load():
+        invoice = await db.invoices.find_one({"id": invoice_id, "business_id": current_user.business_id}, {"_id": 0})
+        if not invoice:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        return invoice
+
+    return await conditional_json(request, current_user.business_id, ["invoices"], load)
+
+@api_router.get("/invoices/{invoice_id}/pdf")
+async def get_invoice_pdf(invoice_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    invoice = await db.invoices.find_one({"id": invoice_id, "business_id": current_user.business_id}, {"_id": 0})
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    return invoice
+
+    [document] = await invoice_pdf_documents(current_user.business_id, [invoice])
+    content_hash = invoice_pdf_hash(document)
+    headers = {"ETag": f'"{content_hash}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    [pdf] = await cached_invoice_pdfs(current_user.business_id, [document], [content_hash])
+    headers["Content-Disposition"] = f'inline; filename="{pdf_filename(invoice["invoice_number"])}"'
+    return Response(pdf, media_type="application/pdf", headers=headers)
+
+@api_router.post("/invoices/pdf")
+async def get_invoice_pdf_batch(batch: InvoicePdfBatch, current_user: User = Depends(get_current_user)):
+    """A zip with one PDF per requested invoice"""
+    invoice_ids = list(dict.fromkeys(batch.invoice_ids))
+    if not invoice_ids:
+        raise HTTPException(status_code=400, detail="No invoices requested")
+    if len(invoice_ids) > PDF_BATCH_MAX_INVOICES:
+        raise HTTPException(status_code=400, detail=f"At most {PDF_BATCH_MAX_INVOICES} invoices per batch")
+
+    invoices = await db.invoices.find(
+        {"id": {"$in": invoice_ids}, "business_id": current_user.business_id}, {"_id": 0}
+    ).to_list(None)
+    found = {invoice["id"] for invoice in invoices}
+    missing = [invoice_id for invoice_id in invoice_ids if invoice_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Invoices not found: {', '.join(missing)}")
+
+    order = {invoice_id: index for index, invoice_id in enumerate(invoice_ids)}
+    invoices.sort(key=lambda invoice: order[invoice["id"]])
+    documents = await invoice_pdf_documents(current_user.business_id, invoices)
+    pdfs = await cached_invoice_pdfs(current_user.business_id, documents, [invoice_pdf_hash(doc) for doc in documents])
+    archive = await asyncio.to_thread(
+        build_zip, [(pdf_filename(invoice["invoice_number"]), pdf) for invoice, pdf in zip(invoices, pdfs)]
+    )
+    return Response(
+        archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="invoices.zip"'}
+    )
 
 @api_router.delete("/invoices/{invoice_id}")
 async def delete_invoice(invoice_id: str, current_user: User = Depends(get_current_user)):
-    result = await db.invoices.delete_one({"id": invoice_id, "business_id": current_user.business_id})
-    if result.deleted_count == 0:
+    invoice = await db.invoices.find_one_and_delete(
+        {"id": invoice_id, "business_id": current_user.business_id},
+        {"_id": 0, "total": 1, "tax_amount": 1, "paid_amount": 1, "balance": 1, "status": 1, "invoice_date": 1}
+    )
+    if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
+    await bump_change_versions(current_user.business_id, "invoices")
+    await bump_business_summary(
+        current_user.business_id,
+        total_sales=-invoice.get('total', 0),
+        total_outstanding=-outstanding_contribution(invoice.get('balance', 0), invoice.get('status')),
+        invoices_count=-1
+    )
+    await bump_monthly_rollup(
+        current_user.business_id, "sales", invoice['invoice_date'],
+        total=-invoice.get('total', 0),
+        tax=-invoice.get('tax_amount', 0),
+        paid=-invoice.get('paid_amount', 0),
+        outstanding=-invoice.get('balance', 0),
+        count=-1
+    )
     return {"message": "Invoice deleted successfully"}
 
 # EXPENSE CATEGORY ROUTES
@@ -783,47 +3769,49 @@ async def delete_invoice(invoice_id: str, current_user: User = Depends(get_curre
 async def create_expense_category(category_data: ExpenseCategoryCreate, current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         raise HTTPException(status_code=400, detail="Please create a business first")
-    
+
     category = ExpenseCategory(**category_data.model_dump(), business_id=current_user.business_id)
-    
-    doc = category.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
+
+    doc = to_document(category)
+
     await db.expense_categories.insert_one(doc)
+    await bump_change_versions(current_user.business_id, "expense_categories")
     return category
 
 @api_router.get("/expense-categories", response_model=List[ExpenseCategory])
-async def get_expense_categories(current_user: User = Depends(get_current_user)):
+async def get_expense_categories(request: Request, current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         return []
-    
-    categories = await db.expense_categories.find({"business_id": current_user.business_id}, {"_id": 0}).to_list(100)
-    return categories
+
+    return await conditional_json(
+        request, current_user.business_id, ["expense_categories"],
+        lambda: db.expense_categories.find({"business_id": current_user.business_id}, {"_id": 0}).to_list(100)
+    )
 
 # EXPENSE ROUTES
 @api_router.post("/expenses", response_model=Expense)
 async def create_expense(expense_data: ExpenseCreate, current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         raise HTTPException(status_code=400, detail="Please create a business first")
-    
+
     # Get category and vendor names
     category_name = None
     if expense_data.category_id:
         category = await db.expense_categories.find_one({"id": expense_data.category_id}, {"_id": 0})
         if category:
             category_name = category['name']
-    
+
     vendor_name = None
     if expense_data.vendor_id:
         vendor = await db.vendors.find_one({"id": expense_data.vendor_id}, {"_id": 0})
         if vendor:
             vendor_name = vendor['name']
-    
+
     # Generate expense number
     expense_number = await generate_expense_number(current_user.business_id)
-    
+
     total = expense_data.amount + expense_data.tax_amount
-    
+
     expense = Expense(
         expense_number=expense_number,
         category_id=expense_data.category_id,
@@ -838,34 +3826,61 @@ async def create_expense(expense_data: ExpenseCreate, current_user: User = Depen
         description=expense_data.description,
         payment_method=expense_data.payment_method
     )
-    
-    doc = expense.model_dump()
-    doc['expense_date'] = doc['expense_date'].isoformat()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
+
+    doc = to_document(expense)
+
     await db.expenses.insert_one(doc)
+    await bump_change_versions(current_user.business_id, "expenses")
+    await bump_business_summary(current_user.business_id, total_expenses=total, expenses_count=1)
+    await bump_monthly_rollup(
+        current_user.business_id, "expenses", expense.expense_date,
+        category_key=expense_category_key(expense.category_id),
+        total=total, tax=expense.tax_amount, count=1
+    )
     return expense
 
-@api_router.get("/expenses", response_model=List[Expense])
-async def get_expenses(current_user: User = Depends(get_current_user)):
+@api_router.get("/expenses", response_model=Page[sparse_model(Expense)])
+async def get_expenses(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
-        return []
-    
-    expenses = await db.expenses.find({"business_id": current_user.business_id}, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return expenses
+        return {"items": [], "next_cursor": None}
+
+    projection = sparse_projection(Expense, fields)
+    return await conditional_json(
+        request, current_user.business_id, ["expenses"],
+        lambda: paginate(db.expenses, {"business_id": current_user.business_id}, limit, cursor, projection=projection)
+    )
 
 @api_router.get("/expenses/{expense_id}", response_model=Expense)
-async def get_expense(expense_id: str, current_user: User = Depends(get_current_user)):
-    expense = await db.expenses.find_one({"id": expense_id}, {"_id": 0})
-    if not expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
-    return expense
+async def get_expense(expense_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    async def load():
+        expense = await db.expenses.find_one({"id": expense_id, "business_id": current_user.business_id}, {"_id": 0})
+        if not expense:
+            raise HTTPException(status_code=404, detail="Expense not found")
+        return expense
+
+    return await conditional_json(request, current_user.business_id, ["expenses"], load)
 
 @api_router.delete("/expenses/{expense_id}")
 async def delete_expense(expense_id: str, current_user: User = Depends(get_current_user)):
-    result = await db.expenses.delete_one({"id": expense_id, "business_id": current_user.business_id})
-    if result.deleted_count == 0:
+    expense = await db.expenses.find_one_and_delete(
+        {"id": expense_id, "business_id": current_user.business_id},
+        {"_id": 0, "total": 1, "tax_amount": 1, "category_id": 1, "expense_date": 1}
+    )
+    if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
+    await bump_change_versions(current_user.business_id, "expenses")
+    await bump_business_summary(current_user.business_id, total_expenses=-expense.get('total', 0), expenses_count=-1)
+    await bump_monthly_rollup(
+        current_user.business_id, "expenses", expense['expense_date'],
+        category_key=expense_category_key(expense.get('category_id')),
+        total=-expense.get('total', 0), tax=-expense.get('tax_amount', 0), count=-1
+    )
     return {"message": "Expense deleted successfully"}
 
 # PAYMENT ROUTES
@@ -873,10 +3888,14 @@ async def delete_expense(expense_id: str, current_user: User = Depends(get_curre
 async def create_payment(payment_data: PaymentCreate, current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         raise HTTPException(status_code=400, detail="Please create a business first")
-    
+
+    invoice_filter = {"id": payment_data.invoice_id, "business_id": current_user.business_id}
+    if payment_data.invoice_id and not await db.invoices.find_one(invoice_filter, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Invoice not found")
+
     # Generate payment number
     payment_number = await generate_payment_number(current_user.business_id)
-    
+
     payment = Payment(
         payment_number=payment_number,
         invoice_id=payment_data.invoice_id,
@@ -888,226 +3907,277 @@ async def create_payment(payment_data: PaymentCreate, current_user: User = Depen
         reference=payment_data.reference,
         notes=payment_data.notes
     )
-    
-    doc = payment.model_dump()
-    doc['payment_date'] = doc['payment_date'].isoformat()
-    doc['created_at'] = doc['created_at'].isoformat()
-    
+
+    doc = to_document(payment)
+
     await db.payments.insert_one(doc)
-    
+    await bump_change_versions(current_user.business_id, "payments")
+
     # Update invoice if payment is linked
     if payment_data.invoice_id:
-        invoice = await db.invoices.find_one({"id": payment_data.invoice_id}, {"_id": 0})
+        # Applied as one pipeline update so concurrent payments cannot overwrite each other
+        invoice = await db.invoices.find_one_and_update(
+            invoice_filter,
+            [
+                {"$set": {"paid_amount": {"$add": ["$paid_amount", payment_data.amount]}}},
+                {"$set": {"balance": {"$subtract": ["$total", "$paid_amount"]}}},
+                {"$set": {"status": {"$cond": [
+                    {"$lte": ["$balance", 0]},
+                    "paid",
+                    {"$cond": [{"$gt": ["$paid_amount", 0]}, "partial", "unpaid"]}
+                ]}}}
+            ],
+            projection={
+                "_id": 0, "business_id": 1, "invoice_date": 1,
+                "total": 1, "paid_amount": 1, "balance": 1, "status": 1
+            },
+            return_document=ReturnDocument.BEFORE
+        )
         if invoice:
+            await bump_change_versions(invoice['business_id'], "invoices")
+            # Replay the same update on the pre-image to get the outstanding delta
             new_paid = invoice['paid_amount'] + payment_data.amount
             new_balance = invoice['total'] - new_paid
             new_status = "paid" if new_balance <= 0 else ("partial" if new_paid > 0 else "unpaid")
-            
-            await db.invoices.update_one(
-                {"id": payment_data.invoice_id},
-                {"$set": {"paid_amount": new_paid, "balance": new_balance, "status": new_status}}
+            await bump_business_summary(
+                invoice['business_id'],
+                total_outstanding=outstanding_contribution(new_balance, new_status)
+                - outstanding_contribution(invoice['balance'], invoice['status'])
             )
-    
+            await bump_monthly_rollup(
+                invoice['business_id'], "sales", invoice['invoice_date'],
+                paid=payment_data.amount, outstanding=new_balance - invoice['balance']
+            )
+
     return payment
 
-@api_router.get("/payments", response_model=List[Payment])
-async def get_payments(current_user: User = Depends(get_current_user)):
+@api_router.get("/payments", response_model=Page[sparse_model(Payment)])
+async def get_payments(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
-        return []
-    
-    payments = await db.payments.find({"business_id": current_user.business_id}, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return payments
+        return {"items": [], "next_cursor": None}
+
+    projection = sparse_projection(Payment, fields)
+    return await conditional_json(
+        request, current_user.business_id, ["payments"],
+        lambda: paginate(db.payments, {"business_id": current_user.business_id}, limit, cursor, projection=projection)
+    )
 
 # REPORTS & DASHBOARD
 @api_router.get("/dashboard/stats")
 async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         return {}
-    
+
     business_id = current_user.business_id
-    
-    # Total Sales
-    invoices = await db.invoices.find({"business_id": business_id}, {"_id": 0, "total": 1}).to_list(10000)
-    total_sales = sum(inv.get('total', 0) for inv in invoices)
-    
-    # Total Expenses
-    expenses = await db.expenses.find({"business_id": business_id}, {"_id": 0, "total": 1}).to_list(10000)
-    total_expenses = sum(exp.get('total', 0) for exp in expenses)
-    
-    # Outstanding
-    outstanding_invoices = await db.invoices.find(
-        {"business_id": business_id, "status": {"$ne": "paid"}},
-        {"_id": 0, "balance": 1}
-    ).to_list(10000)
-    total_outstanding = sum(inv.get('balance', 0) for inv in outstanding_invoices)
-    
-    # Counts
-    customers_count = await db.customers.count_documents({"business_id": business_id})
-    invoices_count = len(invoices)
-    products_count = await db.products.count_documents({"business_id": business_id})
-    
-    # Recent invoices
-    recent_invoices = await db.invoices.find(
-        {"business_id": business_id},
-        {"_id": 0}
-    ).sort("created_at", -1).limit(5).to_list(5)
-    
-    # Recent expenses
-    recent_expenses = await db.expenses.find(
-        {"business_id": business_id},
-        {"_id": 0}
-    ).sort("created_at", -1).limit(5).to_list(5)
-    
-    # Low stock products
-    low_stock = await db.products.find(
-        {"business_id": business_id, "$expr": {"$lte": ["$stock_quantity", "$low_stock_alert"]}},
-        {"_id": 0}
-    ).limit(5).to_list(5)
-    
-    return {
-        "total_sales": total_sales,
-        "total_expenses": total_expenses,
-        "profit": total_sales - total_expenses,
-        "total_outstanding": total_outstanding,
-        "customers_count": customers_count,
-        "invoices_count": invoices_count,
-        "products_count": products_count,
+
+    summary, recent_invoices, recent_expenses, low_stock = await asyncio.gather(
+        get_business_summary(business_id, database=analytics_db),
+        analytics_db.invoices.find({"business_id": business_id}, {"_id": 0}).sort(
+            [("created_at", -1), ("id", -1)]
+        ).limit(5).to_list(5),
+        analytics_db.expenses.find({"business_id": business_id}, {"_id": 0}).sort(
+            [("created_at", -1), ("id", -1)]
+        ).limit(5).to_list(5),
+        product_catalog.get_low_stock(business_id, 5)
+    )
+
+    return trusted_json({
+        "total_sales": summary["total_sales"],
+        "total_expenses": summary["total_expenses"],
+        "profit": summary["total_sales"] - summary["total_expenses"],
+        "total_outstanding": summary["total_outstanding"],
+        "customers_count": summary["customers_count"],
+        "invoices_count": summary["invoices_count"],
+        "products_count": summary["products_count"],
         "recent_invoices": recent_invoices,
         "recent_expenses": recent_expenses,
         "low_stock_products": low_stock
-    }
+    })
 
 @api_router.get("/reports/sales")
-async def get_sales_report(current_user: User = Depends(get_current_user)):
+async def get_sales_report(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    granularity: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
         return {}
-    
-    invoices = await db.invoices.find(
-        {"business_id": current_user.business_id},
-        {"_id": 0}
-    ).sort("invoice_date", -1).to_list(1000)
-    
-    total_sales = sum(inv.get('total', 0) for inv in invoices)
-    total_tax = sum(inv.get('tax_amount', 0) for inv in invoices)
-    total_paid = sum(inv.get('paid_amount', 0) for inv in invoices)
-    total_outstanding = sum(inv.get('balance', 0) for inv in invoices)
-    
-    return {
-        "invoices": invoices,
-        "summary": {
-            "total_sales": total_sales,
-            "total_tax": total_tax,
-            "total_paid": total_paid,
-            "total_outstanding": total_outstanding,
-            "invoice_count": len(invoices)
-        }
-    }
+    _validate_granularity(granularity)
+    return trusted_json(await build_sales_report(current_user.business_id, date_from, date_to, granularity))
 
 @api_router.get("/reports/expenses")
-async def get_expense_report(current_user: User = Depends(get_current_user)):
+async def get_expense_report(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    granularity: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
         return {}
-    
-    expenses = await db.expenses.find(
-        {"business_id": current_user.business_id},
-        {"_id": 0}
-    ).sort("expense_date", -1).to_list(1000)
-    
-    total_amount = sum(exp.get('total', 0) for exp in expenses)
-    
-    # Group by category
-    category_totals = {}
-    for exp in expenses:
-        cat = exp.get('category_name', 'Uncategorized')
-        category_totals[cat] = category_totals.get(cat, 0) + exp.get('total', 0)
-    
-    return {
-        "expenses": expenses,
-        "summary": {
-            "total_amount": total_amount,
-            "expense_count": len(expenses),
-            "category_breakdown": category_totals
-        }
-    }
+    _validate_granularity(granularity)
+    return trusted_json(await build_expense_report(current_user.business_id, date_from, date_to, granularity))
+
+@api_router.get("/reports/gst-summary")
+async def get_gst_summary(
+    month: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    export_format: str = Query("json", alias="format"),
+    current_user: User = Depends(get_current_user)
+):
+    """GSTR-1 style HSN-wise and rate-wise tax summary for a month (YYYY-MM) or a date range"""
+    if not current_user.business_id:
+        return {}
+    _validate_gst_format(export_format)
+    date_from, date_to = gst_period(month, date_from, date_to)
+
+    summary = await build_gst_summary(current_user.business_id, date_from, date_to)
+    if export_format == "csv":
+        return Response(
+            gst_summary_csv(summary),
+            media_type=GST_SUMMARY_FORMATS["csv"],
+            headers={"Content-Disposition": f'attachment; filename="{gst_summary_filename(date_from, date_to, "csv")}"'}
+        )
+    return trusted_json(summary)
+
+# BACKGROUND JOB ROUTES
+@api_router.post("/jobs", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(job_data: JobCreate, response: Response, current_user: User = Depends(get_current_user)):
+    """Queue a report or export; an identical job over unchanged data is returned instead"""
+    if not current_user.business_id:
+        raise HTTPException(status_code=400, detail="Please create a business first")
+    kind = JOB_KINDS.get(job_data.kind)
+    if kind is None:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(JOB_KINDS)}")
+    try:
+        params = kind["params"].model_validate(job_data.params)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail="; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        ))
+    kind["check"](params)
+
+    business_id = current_user.business_id
+    params_doc = params.model_dump(mode="json", by_alias=True)
+    versions = await get_change_versions(business_id, kind["collections"](params))
+    cache_key = job_cache_key(business_id, job_data.kind, params_doc, versions)
+
+    existing = await find_reusable_job(business_id, cache_key)
+    if existing is not None:
+        BACKGROUND_JOBS_SUBMITTED.labels(job_data.kind, "reused").inc()
+        if existing["status"] == "completed":
+            response.status_code = status.HTTP_200_OK
+        return job_response(existing)
+
+    job = Job(business_id=business_id, user_id=current_user.id, kind=job_data.kind, params=params_doc)
+    doc = to_document(job)
+    doc.update(cache_key=cache_key, expires_at=job.created_at + timedelta(hours=JOB_RETENTION_HOURS))
+    await db.jobs.insert_one(doc)
+    job_queue.submit(job.id)
+    BACKGROUND_JOBS_SUBMITTED.labels(job_data.kind, "queued").inc()
+    return job
+
+@api_router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await db.jobs.find_one({"id": job_id, "business_id": current_user.business_id}, JOB_STATUS_PROJECTION)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
+
+@api_router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await db.jobs.find_one(
+        {"id": job_id, "business_id": current_user.business_id},
+        {"_id": 0, "status": 1, "error": 1, "result": 1, "media_type": 1, "filename": 1}
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=job.get("error") or f"Job is {job['status']}")
+    return Response(
+        job["result"],
+        media_type=job["media_type"],
+        headers={"Content-Disposition": f'attachment; filename="{job["filename"]}"'}
+    )
 
 # ============= SOLAR BUSINESS ROUTES =============
 
 async def generate_project_number(business_id: str) -> str:
     """Generate auto-incremented project number"""
-    last_project = await db.solar_projects.find_one(
-        {"business_id": business_id},
-        {"_id": 0, "project_number": 1},
-        sort=[("created_at", -1)]
-    )
-    
-    if last_project and last_project.get("project_number"):
-        try:
-            last_num = int(last_project["project_number"].split("-")[-1])
-            return f"SOLAR-{last_num + 1:05d}"
-        except:
-            pass
-    
-    return "SOLAR-00001"
+    return await document_numbers.next(business_id, "solar_project")
 
 @api_router.post("/solar/projects", response_model=SolarProject)
 async def create_solar_project(project_data: SolarProjectCreate, current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         raise HTTPException(status_code=400, detail="Please create a business first")
-    
+
     # Get customer
     customer = await db.customers.find_one({"id": project_data.customer_id}, {"_id": 0})
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-    
+
     # Generate project number
     project_number = await generate_project_number(current_user.business_id)
-    
+
     project = SolarProject(
         project_number=project_number,
         customer_id=project_data.customer_id,
         customer_name=customer['name'],
         business_id=current_user.business_id,
-        **project_data.model_dump()
+        **project_data.model_dump(exclude={"customer_id"})
     )
-    
-    doc = project.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    if doc['start_date']:
-        doc['start_date'] = doc['start_date'].isoformat()
-    if doc.get('completion_date'):
-        doc['completion_date'] = doc['completion_date'].isoformat()
-    
+
+    doc = to_document(project)
+
     await db.solar_projects.insert_one(doc)
+    await bump_change_versions(current_user.business_id, "solar_projects")
     return project
 
-@api_router.get("/solar/projects", response_model=List[SolarProject])
-async def get_solar_projects(current_user: User = Depends(get_current_user)):
+@api_router.get("/solar/projects", response_model=Page[sparse_model(SolarProject)])
+async def get_solar_projects(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if not current_user.business_id:
-        return []
-    
-    projects = await db.solar_projects.find(
-        {"business_id": current_user.business_id},
-        {"_id": 0}
-    ).sort("created_at", -1).to_list(1000)
-    return projects
+        return {"items": [], "next_cursor": None}
+
+    projection = sparse_projection(SolarProject, fields)
+    return await conditional_json(
+        request, current_user.business_id, ["solar_projects"],
+        lambda: paginate(db.solar_projects, {"business_id": current_user.business_id}, limit, cursor, projection=projection)
+    )
 
 @api_router.get("/solar/projects/{project_id}", response_model=SolarProject)
-async def get_solar_project(project_id: str, current_user: User = Depends(get_current_user)):
-    project = await db.solar_projects.find_one({"id": project_id}, {"_id": 0})
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    return project
+async def get_solar_project(project_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    async def load():
+        project = await db.solar_projects.find_one({"id": project_id, "business_id": current_user.business_id}, {"_id": 0})
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return project
+
+    return await conditional_json(request, current_user.business_id, ["solar_projects"], load)
 
 @api_router.put("/solar/projects/{project_id}", response_model=SolarProject)
 async def update_solar_project(project_id: str, project_data: SolarProjectCreate, current_user: User = Depends(get_current_user)):
     result = await db.solar_projects.update_one(
         {"id": project_id, "business_id": current_user.business_id},
-        {"$set": project_data.model_dump(exclude_unset=True)}
+        {"$set": encode_value(project_data.model_dump(exclude_unset=True))}
     )
-    
+
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Project not found")
-    
+    await bump_change_versions(current_user.business_id, "solar_projects")
+
     project = await db.solar_projects.find_one({"id": project_id}, {"_id": 0})
     return project
 
@@ -1116,20 +4186,16 @@ async def delete_solar_project(project_id: str, current_user: User = Depends(get
     result = await db.solar_projects.delete_one({"id": project_id, "business_id": current_user.business_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Project not found")
+    await bump_change_versions(current_user.business_id, "solar_projects")
     return {"message": "Project deleted successfully"}
 
 # MILESTONE ROUTES
 @api_router.post("/solar/milestones", response_model=ProjectMilestone)
 async def create_milestone(milestone_data: ProjectMilestoneCreate, current_user: User = Depends(get_current_user)):
     milestone = ProjectMilestone(**milestone_data.model_dump())
-    
-    doc = milestone.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    if doc.get('due_date'):
-        doc['due_date'] = doc['due_date'].isoformat()
-    if doc.get('completion_date'):
-        doc['completion_date'] = doc['completion_date'].isoformat()
-    
+
+    doc = to_document(milestone)
+
     await db.project_milestones.insert_one(doc)
     return milestone
 
@@ -1139,20 +4205,20 @@ async def get_project_milestones(project_id: str, current_user: User = Depends(g
         {"project_id": project_id},
         {"_id": 0}
     ).sort("created_at", 1).to_list(100)
-    return milestones
+    return trusted_json(milestones)
 
 @api_router.put("/solar/milestones/{milestone_id}")
 async def update_milestone_status(milestone_id: str, status: str, current_user: User = Depends(get_current_user)):
-    completion_date = datetime.now(timezone.utc).isoformat() if status == "completed" else None
+    completion_date = datetime.now(timezone.utc) if status == "completed" else None
     update_data = {"status": status}
     if completion_date:
         update_data["completion_date"] = completion_date
-    
+
     result = await db.project_milestones.update_one(
         {"id": milestone_id},
         {"$set": update_data}
     )
-    
+
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Milestone not found")
     return {"message": "Milestone updated successfully"}
@@ -1161,28 +4227,29 @@ async def update_milestone_status(milestone_id: str, status: str, current_user:
 @api_router.post("/solar/materials", response_model=MaterialConsumption)
 async def create_material_consumption(material_data: MaterialConsumptionCreate, current_user: User = Depends(get_current_user)):
     # Get product details
-    product = await db.products.find_one({"id": material_data.product_id}, {"_id": 0})
+    products = await product_catalog.get_products(current_user.business_id, [material_data.product_id])
+    product = products.get(material_data.product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    
+
     consumption = MaterialConsumption(
-        **material_data.model_dump(),
+        **material_data.model_dump(exclude={"consumption_date"}),
         product_name=product['name'],
         consumption_date=material_data.consumption_date or datetime.now(timezone.utc)
     )
-    
-    doc = consumption.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    doc['consumption_date'] = doc['consumption_date'].isoformat()
-    
-    await db.material_consumption.insert_one(doc)
-    
-    # Update product stock
-    await db.products.update_one(
-        {"id": material_data.product_id},
-        {"$inc": {"stock_quantity": -material_data.quantity_used}}
-    )
-    
+
+    doc = to_document(consumption)
+
+    stock_ops = stock_movements({material_data.product_id: -material_data.quantity_used})
+
+    async def write_consumption(session):
+        await db.material_consumption.insert_one(doc, session=session)
+        if stock_ops:
+            await db.products.bulk_write(stock_ops, ordered=False, session=session)
+            await bump_change_versions(current_user.business_id, "products", session=session)
+
+    await run_in_transaction(write_consumption)
+
     return consumption
 
 @api_router.get("/solar/materials/{project_id}", response_model=List[MaterialConsumption])
@@ -1191,20 +4258,15 @@ async def get_project_materials(project_id: str, current_user: User = Depends(ge
         {"project_id": project_id},
         {"_id": 0}
     ).sort("consumption_date", -1).to_list(1000)
-    return materials
+    return trusted_json(materials)
 
 # GOVERNMENT DOCUMENTS ROUTES
 @api_router.post("/solar/documents", response_model=GovernmentDocument)
 async def create_government_document(doc_data: GovernmentDocumentCreate, current_user: User = Depends(get_current_user)):
     document = GovernmentDocument(**doc_data.model_dump())
-    
-    doc = document.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    if doc.get('issue_date'):
-        doc['issue_date'] = doc['issue_date'].isoformat()
-    if doc.get('expiry_date'):
-        doc['expiry_date'] = doc['expiry_date'].isoformat()
-    
+
+    doc = to_document(document)
+
     await db.government_documents.insert_one(doc)
     return document
 
@@ -1214,7 +4276,7 @@ async def get_project_documents(project_id: str, current_user: User = Depends(ge
         {"project_id": project_id},
         {"_id": 0}
     ).sort("created_at", -1).to_list(100)
-    return documents
+    return trusted_json(documents)
 
 @api_router.put("/solar/documents/{document_id}")
 async def update_document_status(document_id: str, status: str, current_user: User = Depends(get_current_user)):
@@ -1222,26 +4284,27 @@ async def update_document_status(document_id: str, status: str, current_user: Us
         {"id": document_id},
         {"$set": {"status": status}}
     )
-    
+
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Document not found")
     return {"message": "Document updated successfully"}
 
 # SUBSIDY TRACKING ROUTES
+async def owns_solar_project(business_id: Optional[str], project_id: str) -> bool:
+    return bool(await db.solar_projects.find_one({"id": project_id, "business_id": business_id}, {"_id": 1}))
+
 @api_router.post("/solar/subsidies", response_model=SubsidyTracking)
 async def create_subsidy_tracking(subsidy_data: SubsidyTrackingCreate, current_user: User = Depends(get_current_user)):
+    if not await owns_solar_project(current_user.business_id, subsidy_data.project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
     subsidy = SubsidyTracking(**subsidy_data.model_dump())
-    
-    doc = subsidy.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    if doc.get('application_date'):
-        doc['application_date'] = doc['application_date'].isoformat()
-    if doc.get('approval_date'):
-        doc['approval_date'] = doc['approval_date'].isoformat()
-    if doc.get('received_date'):
-        doc['received_date'] = doc['received_date'].isoformat()
-    
+
+    doc = to_document(subsidy)
+
     await db.subsidy_tracking.insert_one(doc)
+    # Subsidy records carry no business_id; they are versioned under their project's business
+    await bump_change_versions(current_user.business_id, "subsidy_tracking")
     return subsidy
 
 @api_router.get("/solar/subsidies/{project_id}", response_model=List[SubsidyTracking])
@@ -1250,7 +4313,7 @@ async def get_project_subsidies(project_id: str, current_user: User = Depends(ge
         {"project_id": project_id},
         {"_id": 0}
     ).sort("created_at", -1).to_list(100)
-    return subsidies
+    return trusted_json(subsidies)
 
 @api_router.put("/solar/subsidies/{subsidy_id}")
 async def update_subsidy_status(
@@ -1260,77 +4323,93 @@ async def update_subsidy_status(
     received_amount: Optional[float] = None,
     current_user: User = Depends(get_current_user)
 ):
+    subsidy = await db.subsidy_tracking.find_one({"id": subsidy_id}, {"_id": 0, "project_id": 1})
+    if not subsidy or not await owns_solar_project(current_user.business_id, subsidy["project_id"]):
+        raise HTTPException(status_code=404, detail="Subsidy record not found")
+
     update_data = {"status": status}
-    
+
     if status == "approved" and approved_amount is not None:
         update_data["approved_amount"] = approved_amount
-        update_data["approval_date"] = datetime.now(timezone.utc).isoformat()
-    
+        update_data["approval_date"] = datetime.now(timezone.utc)
+
     if status == "received" and received_amount is not None:
         update_data["received_amount"] = received_amount
-        update_data["received_date"] = datetime.now(timezone.utc).isoformat()
-    
+        update_data["received_date"] = datetime.now(timezone.utc)
+
     result = await db.subsidy_tracking.update_one(
         {"id": subsidy_id},
         {"$set": update_data}
     )
-    
+
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Subsidy record not found")
+    await bump_change_versions(current_user.business_id, "subsidy_tracking")
     return {"message": "Subsidy updated successfully"}
 
 # SOLAR DASHBOARD & REPORTS
+async def build_solar_dashboard(business_id: str) -> dict:
+    """Project counts and totals by installation status, with the pending subsidies of those projects"""
+    by_status, recent_projects = await asyncio.gather(
+        analytics_db.solar_projects.aggregate([
+            {"$match": {"business_id": business_id}},
+            {"$project": {
+                "_id": 0, "id": 1, "installation_status": 1,
+                "system_capacity_kw": 1, "estimated_cost": 1, "subsidy_amount": 1
+            }},
+            {"$lookup": {
+                "from": "subsidy_tracking", "localField": "id", "foreignField": "project_id", "as": "subsidies"
+            }},
+            {"$group": {
+                "_id": {"$ifNull": ["$installation_status", "planning"]},
+                "count": {"$sum": 1},
+                "capacity": {"$sum": "$system_capacity_kw"},
+                "revenue": {"$sum": "$estimated_cost"},
+                "subsidy": {"$sum": "$subsidy_amount"},
+                "pending_subsidies": {"$sum": {"$size": {
+                    "$filter": {"input": "$subsidies", "cond": {"$eq": ["$$this.status", "pending"]}}
+                }}}
+            }}
+        ]).to_list(None),
+        analytics_db.solar_projects.find({"business_id": business_id}, {"_id": 0}).sort("created_at", -1).limit(5).to_list(5)
+    )
+
+    return {
+        "total_projects": sum(group["count"] for group in by_status),
+        "projects_by_status": {group["_id"]: group["count"] for group in by_status},
+        "total_capacity_kw": sum(group["capacity"] for group in by_status),
+        "total_estimated_revenue": sum(group["revenue"] for group in by_status),
+        "total_subsidy_amount": sum(group["subsidy"] for group in by_status),
+        "pending_subsidies_count": sum(group["pending_subsidies"] for group in by_status),
+        "recent_projects": recent_projects
+    }
+
 @api_router.get("/solar/dashboard")
 async def get_solar_dashboard(current_user: User = Depends(get_current_user)):
     if not current_user.business_id:
         return {}
-    
-    business_id = current_user.business_id
-    
-    # Total projects
-    total_projects = await db.solar_projects.count_documents({"business_id": business_id})
-    
-    # Projects by status
-    all_projects = await db.solar_projects.find({"business_id": business_id}, {"_id": 0}).to_list(1000)
-    
-    status_counts = {}
-    total_capacity = 0
-    total_revenue = 0
-    total_subsidy = 0
-    
-    for proj in all_projects:
-        status = proj.get('installation_status', 'planning')
-        status_counts[status] = status_counts.get(status, 0) + 1
-        total_capacity += proj.get('system_capacity_kw', 0)
-        total_revenue += proj.get('estimated_cost', 0)
-        total_subsidy += proj.get('subsidy_amount', 0)
-    
-    # Pending subsidies
-    pending_subsidies = await db.subsidy_tracking.find(
-        {"status": "pending"},
-        {"_id": 0}
-    ).to_list(100)
-    
-    return {
-        "total_projects": total_projects,
-        "projects_by_status": status_counts,
-        "total_capacity_kw": total_capacity,
-        "total_estimated_revenue": total_revenue,
-        "total_subsidy_amount": total_subsidy,
-        "pending_subsidies_count": len(pending_subsidies),
-        "recent_projects": all_projects[:5]
-    }
+    return trusted_json(await build_solar_dashboard(current_user.business_id))
 
-# Include router
-app.include_router(api_router)
+# HEALTH ROUTES
+@api_router.get("/health/live")
+async def liveness():
+    """The event loop is answering; says nothing about Mongo"""
+    return {"status": "alive"}
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@api_router.get("/health/ready")
+async def readiness(request: Request):
+    if not request.app.state.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Starting up")
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), READINESS_TIMEOUT_SECONDS)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable")
+    return {"status": "ready", "startup": startup_timings}
+
+async def get_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -1338,6 +4417,68 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+async def warm_up_mongo() -> None:
+    """Fail fast if Mongo is unreachable and pre-open pooled connections"""
+    await client.admin.command("ping")
+    if MONGO_WARMUP_CONNECTIONS > 1:
+        # Concurrent commands each check out their own connection, filling the pool
+        await asyncio.gather(*(db.command("ping") for _ in range(MONGO_WARMUP_CONNECTIONS)))
+
+async def warm_up(application: FastAPI) -> None:
+    """Connection warm-up, index builds and job workers, off the startup path; marks the app ready when done"""
+    while True:
+        try:
+            await warm_up_mongo()
+            if ENSURE_INDEXES_ON_STARTUP:
+                await ensure_indexes()
+            break
+        except Exception:
+            logger.exception("Warm-up failed, retrying in %.1fs", WARMUP_RETRY_SECONDS)
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+    job_queue.start()
+    application.state.ready = True
+    record_startup_phase("ready_seconds")
+    logger.info(
+        "Startup: imported in %.3fs, live after %.3fs, ready after %.3fs",
+        startup_timings["import_seconds"], startup_timings["live_seconds"], startup_timings["ready_seconds"]
+    )
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    connect_mongo()
+    # Serve liveness straight away; readiness answers 503 until warm-up finishes
+    warm_up_task = asyncio.create_task(warm_up(application))
+    try:
+        record_startup_phase("live_seconds")
+        yield
+    finally:
+        application.state.ready = False
+        backfills = [warm_up_task, *_rollup_backfills.values()]
+        for task in backfills:
+            task.cancel()
+        await asyncio.gather(*backfills, return_exceptions=True)
+        await job_queue.stop()
+        close_mongo()
+        password_hasher.shutdown()
+        pdf_renderer.shutdown()
+
+def create_app() -> FastAPI:
+    """Build the ASGI app; Mongo and worker pools open in the lifespan, once per worker process"""
+    application = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+    application.state.ready = False
+    application.include_router(api_router)
+    application.add_api_route("/metrics", get_metrics, include_in_schema=False)
+
+    application.add_middleware(MetricsMiddleware)
+    application.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    return application
+
+# `uvicorn server:app`, or `uvicorn server:create_app --factory`
+app = create_app()
+record_startup_phase("import_seconds")
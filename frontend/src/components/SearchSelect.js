@@ -0,0 +1,92 @@
+import { useEffect, useState } from 'react';
+import axios from 'axios';
+import { Button } from '@/components/ui/button';
+import {
+  Command,
+  CommandEmpty,
+  CommandGroup,
+  CommandInput,
+  CommandItem,
+  CommandList,
+} from '@/components/ui/command';
+import { Popover, PopoverContent, PopoverTrigger } from '@/components/ui/popover';
+import { ChevronsUpDown } from 'lucide-react';
+
+const SEARCH_DEBOUNCE_MS = 200;
+
+// Typeahead over a /search endpoint; results are filtered server-side, so cmdk's own filter is off.
+function SearchSelect({ url, selectedLabel, placeholder, onSelect, renderOption, className, ...props }) {
+  const [open, setOpen] = useState(false);
+  const [query, setQuery] = useState('');
+  const [results, setResults] = useState([]);
+  const [loading, setLoading] = useState(false);
+
+  useEffect(() => {
+    if (!open) return undefined;
+
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      setLoading(true);
+      try {
+        const response = await axios.get(url, { params: { q: query } });
+        if (!cancelled) setResults(response.data);
+      } catch (error) {
+        if (!cancelled) setResults([]);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    }, SEARCH_DEBOUNCE_MS);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [url, query, open]);
+
+  return (
+    <Popover open={open} onOpenChange={setOpen}>
+      <PopoverTrigger asChild>
+        <Button
+          type="button"
+          variant="outline"
+          role="combobox"
+          aria-expanded={open}
+          className={`w-full justify-between font-normal ${className || ''}`}
+          {...props}
+        >
+          <span className={selectedLabel ? 'truncate' : 'truncate text-muted-foreground'}>
+            {selectedLabel || placeholder}
+          </span>
+          <ChevronsUpDown className="ml-2 h-4 w-4 shrink-0 opacity-50" />
+        </Button>
+      </PopoverTrigger>
+      <PopoverContent className="w-[--radix-popover-trigger-width] p-0" align="start">
+        <Command shouldFilter={false}>
+          <CommandInput placeholder="Type to search..." value={query} onValueChange={setQuery} />
+          <CommandList>
+            <CommandEmpty>{loading ? 'Searching...' : query ? 'No matches' : 'Start typing to search'}</CommandEmpty>
+            {results.length > 0 && (
+              <CommandGroup>
+                {results.map((option) => (
+                  <CommandItem
+                    key={option.id}
+                    value={option.id}
+                    onSelect={() => {
+                      onSelect(option);
+                      setOpen(false);
+                      setQuery('');
+                    }}
+                  >
+                    {renderOption ? renderOption(option) : option.name}
+                  </CommandItem>
+                ))}
+              </CommandGroup>
+            )}
+          </CommandList>
+        </Command>
+      </PopoverContent>
+    </Popover>
+  );
+}
+
+export default SearchSelect;
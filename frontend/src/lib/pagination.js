@@ -0,0 +1,23 @@
+import axios from 'axios';
+
+// List endpoints return { items, next_cursor }; pass next_cursor back to get the following page.
+// `fields` trims each item to those fields (plus id), e.g. ['name'] for a dropdown.
+export async function fetchPage(url, { cursor = null, limit, fields } = {}) {
+  const params = {};
+  if (cursor) params.cursor = cursor;
+  if (limit) params.limit = limit;
+  if (fields) params.fields = fields.join(',');
+  const response = await axios.get(url, { params });
+  return response.data;
+}
+
+export async function fetchAllPages(url, { limit = 500, fields } = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const page = await fetchPage(url, { cursor, limit, fields });
+    items.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return items;
+}
@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import axios from 'axios';
+import { fetchPage } from '@/lib/pagination';
 import { API } from '../App';
 import { Card, CardContent } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -28,6 +29,7 @@ import {
 
 function Customers() {
   const [customers, setCustomers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [dialogOpen, setDialogOpen] = useState(false);
   const [formData, setFormData] = useState({
@@ -43,10 +45,11 @@ function Customers() {
     fetchCustomers();
   }, []);
 
-  const fetchCustomers = async () => {
+  const fetchCustomers = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/customers`);
-      setCustomers(response.data);
+      const page = await fetchPage(`${API}/customers`, { cursor });
+      setCustomers((current) => (cursor ? [...current, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
     } catch (error) {
       toast.error('Failed to load customers');
     } finally {
@@ -271,6 +274,13 @@ function Customers() {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="p-4 text-center border-t border-zinc-100">
+                  <Button variant="outline" onClick={() => fetchCustomers(nextCursor)} data-testid="load-more-customers">
+                    Load more
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
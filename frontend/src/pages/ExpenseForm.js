@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages } from '@/lib/pagination';
 import { API } from '../App';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -39,8 +40,7 @@ function ExpenseForm() {
 
   const fetchVendors = async () => {
     try {
-      const response = await axios.get(`${API}/vendors`);
-      setVendors(response.data);
+      setVendors(await fetchAllPages(`${API}/vendors`, { fields: ['name'] }));
     } catch (error) {
       toast.error('Failed to load vendors');
     }
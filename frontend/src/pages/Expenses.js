@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import axios from 'axios';
+import { fetchPage } from '@/lib/pagination';
 import { API } from '../App';
 import { Card, CardContent } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -20,16 +21,18 @@ import {
 
 function Expenses() {
   const [expenses, setExpenses] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchExpenses();
   }, []);
 
-  const fetchExpenses = async () => {
+  const fetchExpenses = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/expenses`);
-      setExpenses(response.data);
+      const page = await fetchPage(`${API}/expenses`, { cursor });
+      setExpenses((current) => (cursor ? [...current, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
     } catch (error) {
       toast.error('Failed to load expenses');
     } finally {
@@ -166,6 +169,13 @@ function Expenses() {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="p-4 text-center border-t border-zinc-100">
+                  <Button variant="outline" onClick={() => fetchExpenses(nextCursor)} data-testid="load-more-expenses">
+                    Load more
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
@@ -1,26 +1,19 @@
-import { useEffect, useState } from 'react';
+import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { API } from '../App';
+import SearchSelect from '@/components/SearchSelect';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
 import { Textarea } from '@/components/ui/textarea';
-import {
-  Select,
-  SelectContent,
-  SelectItem,
-  SelectTrigger,
-  SelectValue,
-} from '@/components/ui/select';
 import { Plus, Trash2, ArrowLeft } from 'lucide-react';
 import { toast } from 'sonner';
 
 function InvoiceForm() {
   const navigate = useNavigate();
-  const [customers, setCustomers] = useState([]);
-  const [products, setProducts] = useState([]);
+  const [customerName, setCustomerName] = useState('');
   const [formData, setFormData] = useState({
     customer_id: '',
     invoice_date: new Date().toISOString().split('T')[0],
@@ -31,29 +24,6 @@ function InvoiceForm() {
   const [items, setItems] = useState([]);
   const [loading, setLoading] = useState(false);
 
-  useEffect(() => {
-    fetchCustomers();
-    fetchProducts();
-  }, []);
-
-  const fetchCustomers = async () => {
-    try {
-      const response = await axios.get(`${API}/customers`);
-      setCustomers(response.data);
-    } catch (error) {
-      toast.error('Failed to load customers');
-    }
-  };
-
-  const fetchProducts = async () => {
-    try {
-      const response = await axios.get(`${API}/products`);
-      setProducts(response.data);
-    } catch (error) {
-      toast.error('Failed to load products');
-    }
-  };
-
   const addItem = () => {
     setItems([
       ...items,
@@ -73,19 +43,25 @@ function InvoiceForm() {
     setItems(items.filter((_, i) => i !== index));
   };
 
+  const selectProduct = (index, product) => {
+    const newItems = [...items];
+    newItems[index] = {
+      ...newItems[index],
+      product_id: product.id,
+      product_name: product.name,
+      price: product.price,
+      tax_rate: product.tax_rate,
+    };
+    recalculateItem(newItems, index);
+  };
+
   const updateItem = (index, field, value) => {
     const newItems = [...items];
     newItems[index][field] = value;
+    recalculateItem(newItems, index);
+  };
 
-    if (field === 'product_id') {
-      const product = products.find((p) => p.id === value);
-      if (product) {
-        newItems[index].product_name = product.name;
-        newItems[index].price = product.price;
-        newItems[index].tax_rate = product.tax_rate;
-      }
-    }
-
+  const recalculateItem = (newItems, index) => {
     // Calculate amount
     const qty = parseFloat(newItems[index].quantity) || 0;
     const price = parseFloat(newItems[index].price) || 0;
@@ -161,21 +137,25 @@ function InvoiceForm() {
                 <Label htmlFor="customer" className="text-sm font-medium text-zinc-700">
                   Customer *
                 </Label>
-                <Select
-                  value={formData.customer_id}
-                  onValueChange={(value) => setFormData({ ...formData, customer_id: value })}
-                >
-                  <SelectTrigger className="mt-1.5" data-testid="customer-select">
-                    <SelectValue placeholder="Select customer" />
-                  </SelectTrigger>
-                  <SelectContent>
-                    {customers.map((customer) => (
-                      <SelectItem key={customer.id} value={customer.id}>
-                        {customer.name}
-                      </SelectItem>
-                    ))}
-                  </SelectContent>
-                </Select>
+                <SearchSelect
+                  url={`${API}/customers/search`}
+                  selectedLabel={customerName}
+                  placeholder="Search customer by name, phone or GSTIN"
+                  onSelect={(customer) => {
+                    setCustomerName(customer.name);
+                    setFormData({ ...formData, customer_id: customer.id });
+                  }}
+                  renderOption={(customer) => (
+                    <div className="flex flex-col">
+                      <span>{customer.name}</span>
+                      <span className="text-xs text-zinc-500">
+                        {[customer.phone, customer.gstin].filter(Boolean).join(' · ')}
+                      </span>
+                    </div>
+                  )}
+                  className="mt-1.5"
+                  data-testid="customer-select"
+                />
               </div>
 
               <div>
@@ -261,21 +241,21 @@ function InvoiceForm() {
                   >
                     <div className="md:col-span-2">
                       <Label className="text-sm font-medium text-zinc-700">Product</Label>
-                      <Select
-                        value={item.product_id}
-                        onValueChange={(value) => updateItem(index, 'product_id', value)}
-                      >
-                        <SelectTrigger className="mt-1.5">
-                          <SelectValue placeholder="Select product" />
-                        </SelectTrigger>
-                        <SelectContent>
-                          {products.map((product) => (
-                            <SelectItem key={product.id} value={product.id}>
-                              {product.name}
-                            </SelectItem>
-                          ))}
-                        </SelectContent>
-                      </Select>
+                      <SearchSelect
+                        url={`${API}/products/search`}
+                        selectedLabel={item.product_name}
+                        placeholder="Search product by name, SKU or HSN"
+                        onSelect={(product) => selectProduct(index, product)}
+                        renderOption={(product) => (
+                          <div className="flex w-full items-center justify-between">
+                            <span>{product.name}</span>
+                            <span className="text-xs text-zinc-500">
+                              {product.sku ? `${product.sku} · ` : ''}₹{product.price} · {product.stock_quantity} in stock
+                            </span>
+                          </div>
+                        )}
+                        className="mt-1.5"
+                      />
                     </div>
 
                     <div>
@@ -1,10 +1,11 @@
 import { useEffect, useState } from 'react';
 import axios from 'axios';
+import { fetchPage } from '@/lib/pagination';
 import { API } from '../App';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Link } from 'react-router-dom';
-import { Plus, Trash2 } from 'lucide-react';
+import { Download, Plus, Trash2 } from 'lucide-react';
 import { toast } from 'sonner';
 import {
   AlertDialog,
@@ -18,18 +19,23 @@ import {
   AlertDialogTrigger,
 } from '@/components/ui/alert-dialog';
 
+// The table never shows line items, so leave the items arrays on the server
+const INVOICE_LIST_FIELDS = ['invoice_number', 'customer_name', 'invoice_date', 'total', 'paid_amount', 'balance', 'status'];
+
 function Invoices() {
   const [invoices, setInvoices] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchInvoices();
   }, []);
 
-  const fetchInvoices = async () => {
+  const fetchInvoices = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/invoices`);
-      setInvoices(response.data);
+      const page = await fetchPage(`${API}/invoices`, { cursor, fields: INVOICE_LIST_FIELDS });
+      setInvoices((current) => (cursor ? [...current, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
     } catch (error) {
       toast.error('Failed to load invoices');
     } finally {
@@ -47,6 +53,20 @@ function Invoices() {
     }
   };
 
+  const handleDownloadPdf = async (invoice) => {
+    try {
+      const response = await axios.get(`${API}/invoices/${invoice.id}/pdf`, { responseType: 'blob' });
+      const url = URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `${invoice.invoice_number}.pdf`;
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (error) {
+      toast.error('Failed to download invoice PDF');
+    }
+  };
+
   return (
     <div className="space-y-6" data-testid="invoices-page">
       <div className="flex items-center justify-between">
@@ -139,6 +159,14 @@ function Invoices() {
                         </span>
                       </td>
                       <td className="px-6 py-4 text-center">
+                        <Button
+                          variant="ghost"
+                          size="sm"
+                          onClick={() => handleDownloadPdf(invoice)}
+                          data-testid={`download-invoice-${invoice.invoice_number}`}
+                        >
+                          <Download className="w-4 h-4" />
+                        </Button>
                         <AlertDialog>
                           <AlertDialogTrigger asChild>
                             <Button
@@ -174,6 +202,13 @@ function Invoices() {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="p-4 text-center border-t border-zinc-100">
+                  <Button variant="outline" onClick={() => fetchInvoices(nextCursor)} data-testid="load-more-invoices">
+                    Load more
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
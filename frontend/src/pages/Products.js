@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import axios from 'axios';
+import { fetchPage } from '@/lib/pagination';
 import { API } from '../App';
 import { Card, CardContent } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -29,6 +30,7 @@ import {
 
 function Products() {
   const [products, setProducts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [dialogOpen, setDialogOpen] = useState(false);
   const [formData, setFormData] = useState({
@@ -47,10 +49,11 @@ function Products() {
     fetchProducts();
   }, []);
 
-  const fetchProducts = async () => {
+  const fetchProducts = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/products`);
-      setProducts(response.data);
+      const page = await fetchPage(`${API}/products`, { cursor });
+      setProducts((current) => (cursor ? [...current, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
     } catch (error) {
       toast.error('Failed to load products');
     } finally {
@@ -364,6 +367,13 @@ function Products() {
                   })}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="p-4 text-center border-t border-zinc-100">
+                  <Button variant="outline" onClick={() => fetchProducts(nextCursor)} data-testid="load-more-products">
+                    Load more
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
@@ -3,12 +3,16 @@ import axios from 'axios';
 import { API } from '../App';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
+import { Button } from '@/components/ui/button';
+import { Input } from '@/components/ui/input';
 import { toast } from 'sonner';
 
 function Reports() {
   const [salesReport, setSalesReport] = useState(null);
   const [expenseReport, setExpenseReport] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [gstMonth, setGstMonth] = useState(() => new Date().toISOString().slice(0, 7));
+  const [gstSummary, setGstSummary] = useState(null);
 
   useEffect(() => {
     fetchReports();
@@ -29,6 +33,32 @@ function Reports() {
     }
   };
 
+  const fetchGstSummary = async () => {
+    try {
+      const response = await axios.get(`${API}/reports/gst-summary`, { params: { month: gstMonth } });
+      setGstSummary(response.data);
+    } catch (error) {
+      toast.error('Failed to load GST summary');
+    }
+  };
+
+  const exportGstSummary = async () => {
+    try {
+      const response = await axios.get(`${API}/reports/gst-summary`, {
+        params: { month: gstMonth, format: 'csv' },
+        responseType: 'blob',
+      });
+      const url = URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `hsn-summary-${gstMonth}.csv`;
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (error) {
+      toast.error('Failed to export GST summary');
+    }
+  };
+
   if (loading) {
     return (
       <div className="flex items-center justify-center h-96">
@@ -45,9 +75,10 @@ function Reports() {
       </div>
 
       <Tabs defaultValue="sales" className="w-full">
-        <TabsList className="grid w-full max-w-md grid-cols-2">
+        <TabsList className="grid w-full max-w-lg grid-cols-3">
           <TabsTrigger value="sales" data-testid="sales-tab">Sales Report</TabsTrigger>
           <TabsTrigger value="expenses" data-testid="expenses-tab">Expense Report</TabsTrigger>
+          <TabsTrigger value="gst" data-testid="gst-tab">GST Summary</TabsTrigger>
         </TabsList>
 
         <TabsContent value="sales" className="space-y-6 mt-6">
@@ -250,6 +281,87 @@ function Reports() {
             </CardContent>
           </Card>
         </TabsContent>
+
+        <TabsContent value="gst" className="space-y-6 mt-6">
+          <div className="flex items-center gap-3">
+            <Input
+              type="month"
+              value={gstMonth}
+              onChange={(e) => setGstMonth(e.target.value)}
+              className="w-48"
+              data-testid="gst-month-input"
+            />
+            <Button onClick={fetchGstSummary} data-testid="gst-load-button">Load</Button>
+            <Button variant="outline" onClick={exportGstSummary} data-testid="gst-export-button">Export CSV</Button>
+          </div>
+
+          {gstSummary && (
+            <>
+              <div className="grid grid-cols-1 md:grid-cols-4 gap-6">
+                {[
+                  ['Taxable Value', gstSummary.totals.taxable_value],
+                  ['IGST', gstSummary.totals.igst],
+                  ['CGST', gstSummary.totals.cgst],
+                  ['SGST', gstSummary.totals.sgst],
+                ].map(([label, amount]) => (
+                  <Card key={label} className="border-zinc-200 shadow-sm">
+                    <CardContent className="p-6">
+                      <p className="text-sm text-zinc-600 mb-1">{label}</p>
+                      <p className="text-2xl font-mono font-semibold text-slate-900">₹{amount.toLocaleString()}</p>
+                    </CardContent>
+                  </Card>
+                ))}
+              </div>
+
+              <Card className="border-zinc-200 shadow-sm">
+                <CardHeader className="border-b border-zinc-100">
+                  <CardTitle className="text-lg font-heading">
+                    HSN-wise Summary ({gstSummary.invoice_count} invoices)
+                  </CardTitle>
+                </CardHeader>
+                <CardContent className="p-0">
+                  {gstSummary.hsn_summary.length > 0 ? (
+                    <div className="overflow-x-auto">
+                      <table className="w-full">
+                        <thead className="bg-zinc-50 border-b border-zinc-200">
+                          <tr>
+                            {['HSN', 'Description', 'Qty', 'Rate', 'Taxable', 'IGST', 'CGST', 'SGST', 'Total'].map((header) => (
+                              <th
+                                key={header}
+                                className="px-6 py-4 text-left text-xs font-semibold text-zinc-700 uppercase tracking-wider"
+                              >
+                                {header}
+                              </th>
+                            ))}
+                          </tr>
+                        </thead>
+                        <tbody className="divide-y divide-zinc-100">
+                          {gstSummary.hsn_summary.map((row) => (
+                            <tr key={`${row.hsn_code}-${row.tax_rate}-${row.uqc}`} className="hover:bg-zinc-50">
+                              <td className="px-6 py-4 font-mono text-sm text-slate-900">{row.hsn_code || '-'}</td>
+                              <td className="px-6 py-4 text-sm text-slate-900">{row.description}</td>
+                              <td className="px-6 py-4 text-sm text-zinc-600">
+                                {row.total_quantity} {row.uqc}
+                              </td>
+                              <td className="px-6 py-4 text-sm text-zinc-600">{row.tax_rate}%</td>
+                              {['taxable_value', 'igst', 'cgst', 'sgst', 'total_value'].map((field) => (
+                                <td key={field} className="px-6 py-4 font-mono text-sm text-slate-900">
+                                  ₹{row[field].toLocaleString()}
+                                </td>
+                              ))}
+                            </tr>
+                          ))}
+                        </tbody>
+                      </table>
+                    </div>
+                  ) : (
+                    <div className="p-8 text-center text-zinc-600">No invoices in this period</div>
+                  )}
+                </CardContent>
+              </Card>
+            </>
+          )}
+        </TabsContent>
       </Tabs>
     </div>
   );
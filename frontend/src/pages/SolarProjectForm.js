@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages } from '@/lib/pagination';
 import { API } from '../App';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -44,8 +45,7 @@ function SolarProjectForm() {
 
   const fetchCustomers = async () => {
     try {
-      const response = await axios.get(`${API}/customers`);
-      setCustomers(response.data);
+      setCustomers(await fetchAllPages(`${API}/customers`, { fields: ['name'] }));
     } catch (error) {
       toast.error('Failed to load customers');
     }
@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import axios from 'axios';
+import { fetchPage } from '@/lib/pagination';
 import { API } from '../App';
 import { Card, CardContent } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -20,16 +21,18 @@ import {
 
 function SolarProjects() {
   const [projects, setProjects] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchProjects();
   }, []);
 
-  const fetchProjects = async () => {
+  const fetchProjects = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/solar/projects`);
-      setProjects(response.data);
+      const page = await fetchPage(`${API}/solar/projects`, { cursor });
+      setProjects((current) => (cursor ? [...current, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
     } catch (error) {
       toast.error('Failed to load projects');
     } finally {
@@ -188,6 +191,13 @@ function SolarProjects() {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="p-4 text-center border-t border-zinc-100">
+                  <Button variant="outline" onClick={() => fetchProjects(nextCursor)} data-testid="load-more-projects">
+                    Load more
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
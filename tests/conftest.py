@@ -0,0 +1,55 @@
+"""Import the backend as `server` and give tests a scratch database when a mongod is running.
+
+Tests needing Mongo use the `run_with_mongo` fixture and are skipped when none answers at
+MONGO_URL. They run against TEST_DB_NAME (default bill_book_test), which is dropped before
+and after each test, never against DB_NAME.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bill_book")
+os.environ.setdefault("MONGO_SERVER_SELECTION_TIMEOUT_MS", "1000")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+TEST_DB_NAME = os.environ.get("TEST_DB_NAME", "bill_book_test")
+
+# Why the first ping failed, so later tests skip without waiting out server selection again
+mongo_unreachable = None
+
+
+@pytest.fixture
+def run_with_mongo():
+    """Call with an async function; it runs with server.db pointing at the scratch database"""
+
+    def run(test):
+        async def main():
+            global mongo_unreachable
+            if mongo_unreachable:
+                pytest.skip(mongo_unreachable)
+            server.connect_mongo()
+            try:
+                try:
+                    await server.client.admin.command("ping")
+                except Exception as e:
+                    mongo_unreachable = f"no mongod reachable at {server.mongo_url}: {e}"
+                    pytest.skip(mongo_unreachable)
+                server.db = server.client[TEST_DB_NAME]
+                server.analytics_db = server.db
+                await server.client.drop_database(TEST_DB_NAME)
+                try:
+                    return await test()
+                finally:
+                    await server.client.drop_database(TEST_DB_NAME)
+            finally:
+                server.close_mongo()
+
+        return asyncio.run(main())
+
+    return run
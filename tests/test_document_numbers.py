@@ -0,0 +1,90 @@
+import asyncio
+import itertools
+
+import server
+
+
+class FakeCounters:
+    """The `counters` operations DocumentNumberAllocator uses, each atomic like Mongo's"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def update_one(self, query, update, upsert=False):
+        await asyncio.sleep(0)
+        key = query["_id"]
+        self.values[key] = max(self.values.get(key, 0), update["$max"]["value"])
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None, session=None):
+        key = query["_id"]
+        self.values[key] = self.values.get(key, 0) + update["$inc"]["value"]
+        value = self.values[key]
+        # Yield after the atomic step so concurrent callers interleave
+        await asyncio.sleep(0)
+        return {"_id": key, "value": value}
+
+
+class FakeInvoices:
+    async def find_one(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return None
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.counters = FakeCounters()
+        self.invoices = FakeInvoices()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def assert_unique_and_gapless(numbers):
+    assert len(numbers) == len(set(numbers))
+    assert sorted(numbers) == list(range(1, len(numbers) + 1))
+
+
+async def concurrent_next_numbers(allocator, count):
+    return await asyncio.gather(*(allocator.next_number("business", "invoice") for _ in range(count)))
+
+
+def test_concurrent_next_number_is_unique_and_gapless(monkeypatch):
+    monkeypatch.setattr(server, "db", FakeDatabase())
+    for block_size in (1, 7):
+        allocator = server.DocumentNumberAllocator(block_size)
+        numbers = asyncio.run(concurrent_next_numbers(allocator, 7 * 30))
+        assert_unique_and_gapless(numbers)
+        server.db.counters.values.clear()
+
+
+def test_concurrent_reserve_range_is_unique_and_gapless(monkeypatch):
+    monkeypatch.setattr(server, "db", FakeDatabase())
+    allocator = server.DocumentNumberAllocator()
+
+    async def main():
+        return await asyncio.gather(*(allocator.reserve_range("business", "invoice", 3) for _ in range(50)))
+
+    ranges = asyncio.run(main())
+    assert all(len(reserved) == 3 for reserved in ranges)
+    assert_unique_and_gapless(list(itertools.chain.from_iterable(ranges)))
+
+
+def test_workers_sharing_a_counter_never_duplicate(monkeypatch):
+    monkeypatch.setattr(server, "db", FakeDatabase())
+    workers = [server.DocumentNumberAllocator(5) for _ in range(3)]
+
+    async def main():
+        return await asyncio.gather(*(concurrent_next_numbers(worker, 40) for worker in workers))
+
+    numbers = list(itertools.chain.from_iterable(asyncio.run(main())))
+    assert len(numbers) == len(set(numbers))
+
+
+def test_concurrent_allocation_against_mongod(run_with_mongo):
+    async def main():
+        allocator = server.DocumentNumberAllocator()
+        numbers = await concurrent_next_numbers(allocator, 100)
+        ranges = await asyncio.gather(*(allocator.reserve_range("business", "invoice", 4) for _ in range(25)))
+        return numbers + list(itertools.chain.from_iterable(ranges))
+
+    assert_unique_and_gapless(run_with_mongo(main))
@@ -0,0 +1,26 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.mark.parametrize("month, expected", [
+    ("2024-02", (date(2024, 2, 1), date(2024, 2, 29))),
+    ("2023-02", (date(2023, 2, 1), date(2023, 2, 28))),
+    ("2024-12", (date(2024, 12, 1), date(2024, 12, 31))),
+])
+def test_gst_period_for_a_month(month, expected):
+    assert server.gst_period(month, date(2000, 1, 1), None) == expected
+
+
+def test_gst_period_without_a_month_uses_the_range():
+    assert server.gst_period(None, date(2024, 4, 1), date(2024, 6, 30)) == (date(2024, 4, 1), date(2024, 6, 30))
+
+
+@pytest.mark.parametrize("month", ["2024-13", "04-2024", "2024/04"])
+def test_gst_period_rejects_bad_months(month):
+    with pytest.raises(HTTPException) as raised:
+        server.gst_period(month, None, None)
+    assert raised.value.status_code == 400
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import server
+
+
+async def get(application, path):
+    """Minimal ASGI GET; returns (status, decoded JSON body)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return messages[0]["status"], json.loads(body)
+
+
+def test_live_during_warm_up_and_ready_after(monkeypatch):
+    release = asyncio.Event()
+    warm_up_calls = []
+
+    async def slow_warm_up():
+        warm_up_calls.append(True)
+        await release.wait()
+
+    class Admin:
+        async def command(self, name):
+            return {"ok": 1}
+
+    monkeypatch.setattr(server, "warm_up_mongo", slow_warm_up)
+    monkeypatch.setattr(server, "ENSURE_INDEXES_ON_STARTUP", False)
+    monkeypatch.setattr(server.job_queue, "start", lambda: None)
+
+    async def main():
+        application = server.create_app()
+        async with server.lifespan(application):
+            monkeypatch.setattr(server.client, "admin", Admin(), raising=False)
+            await asyncio.sleep(0)
+            assert warm_up_calls
+            assert await get(application, "/api/health/live") == (200, {"status": "alive"})
+            assert await get(application, "/api/health/ready") == (503, {"detail": "Starting up"})
+
+            release.set()
+            for _ in range(100):
+                if application.state.ready:
+                    break
+                await asyncio.sleep(0)
+            status, body = await get(application, "/api/health/ready")
+            assert status == 200
+            assert body["startup"]["live_seconds"] <= body["startup"]["ready_seconds"]
+        assert not application.state.ready
+
+    asyncio.run(main())
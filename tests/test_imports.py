@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timezone
+
+import server
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def import_rows(text: str, import_format: str = "csv", chunk_size: int = 5):
+    async def collect():
+        return [row async for row in server.iter_import_rows(chunked(text.encode(), chunk_size), import_format)]
+    return asyncio.run(collect())
+
+
+def test_csv_rows_with_quotes_and_line_breaks():
+    text = (
+        "\ufeffname , sku,price\r\n"
+        '12" panel,P1,100\r\n'
+        '"Inverter, 5kW\nhybrid ""HX""",P2,5\n'
+        "\n"
+        "a,b,c,d\n"
+        "Cable,P3"
+    )
+    assert import_rows(text) == [
+        (1, {"name": '12" panel', "sku": "P1", "price": "100"}),
+        (2, {"name": 'Inverter, 5kW\nhybrid "HX"', "sku": "P2", "price": "5"}),
+        (3, "Expected 3 columns, got 4"),
+        (4, {"name": "Cable", "sku": "P3"}),
+    ]
+
+
+def test_csv_record_length_is_capped(monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_MAX_RECORD_BYTES", 20)
+    rows = import_rows('name,sku\n"never closed,P1\nrow,P2\nrow,P3\nrow,P4\nnext,P5\n')
+    assert rows[0][0] == 1 and "longer than 20 bytes" in rows[0][1]
+    assert rows[1:] == [(2, {"name": "row", "sku": "P3"}), (3, {"name": "row", "sku": "P4"}), (4, {"name": "next", "sku": "P5"})]
+
+
+def test_csv_quote_left_open_at_end_is_reported():
+    assert import_rows('name,sku\nok,P1\n"open,P2') == [
+        (1, {"name": "ok", "sku": "P1"}),
+        (2, "Quoted field is never closed"),
+    ]
+
+
+def test_ndjson_rows():
+    text = '{"name": "Panel"}\n\n[1, 2]\nnot json\n{"name": "Inverter"}'
+    rows = import_rows(text, "ndjson")
+    assert rows[0] == (1, {"name": "Panel"})
+    assert rows[1] == (3, "Each line must be a JSON object")
+    assert rows[2][0] == 4 and rows[2][1].startswith("Invalid JSON")
+    assert rows[3] == (5, {"name": "Inverter"})
+
+
+def test_exports_round_trip_dates_through_the_importer():
+    payment = {
+        "id": "pay-1", "payment_number": "PAY-00001", "customer_id": "customer", "business_id": "business",
+        "amount": 1500.0, "payment_date": datetime(2024, 4, 1, 9, 30, tzinfo=timezone.utc),
+        "payment_method": "upi", "created_at": datetime(2024, 4, 1, 9, 31, tzinfo=timezone.utc),
+    }
+
+    async def cursor():
+        yield payment
+
+    async def export(export_format):
+        return "".join([chunk async for chunk in server.stream_export(cursor(), "payments", export_format, False)])
+
+    for export_format in ("csv", "ndjson"):
+        text = asyncio.run(export(export_format))
+        assert "2024-04-01T09:30:00+00:00" in text
+        [(row_number, row)] = import_rows(text, export_format)
+        imported = server.Payment(**{key: value for key, value in row.items() if value != ""})
+        assert imported.payment_date == payment["payment_date"]
+        assert imported.created_at == payment["created_at"]
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+import server
+from tests.test_document_numbers import FakeCounters
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+
+    def find(self, query, projection=None):
+        async def matching():
+            for doc in self.docs:
+                if doc["id"] in query["id"]["$in"] and doc["business_id"] == query["business_id"]:
+                    yield doc
+        return matching()
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, doc, session=None):
+        self.docs.append(doc)
+
+    async def insert_many(self, docs, session=None):
+        self.docs.extend(docs)
+
+    async def update_one(self, *args, **kwargs):
+        pass
+
+    async def bulk_write(self, *args, **kwargs):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.counters = FakeCounters()
+        self.customers = FakeCollection([
+            {"id": "ours", "business_id": "business", "name": "Sharma Traders"},
+            {"id": "theirs", "business_id": "other", "name": "Someone Else"},
+        ])
+        self.invoices = FakeCollection()
+        self.products = FakeCollection()
+        self.business_summaries = FakeCollection()
+        self.monthly_rollups = FakeCollection()
+        self.change_versions = FakeCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def invoice(customer_id, quantity=1, discount=0.0):
+    return server.InvoiceCreate(customer_id=customer_id, discount=discount, items=[server.InvoiceItem(
+        product_id="panel", product_name="Mono panel", quantity=quantity, price=100, tax_rate=18, amount=100 * quantity
+    )])
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "document_numbers", server.DocumentNumberAllocator())
+
+    async def get_products(business_id, product_ids):
+        return {}
+
+    async def run_in_transaction(callback):
+        # Roll the counter back like an aborted transaction would
+        counters = dict(database.counters.values)
+        try:
+            return await callback("session")
+        except Exception:
+            database.counters.values = counters
+            raise
+
+    monkeypatch.setattr(server.product_catalog, "get_products", get_products)
+    monkeypatch.setattr(server, "run_in_transaction", run_in_transaction)
+    return database
+
+
+USER = server.User(email="owner@example.com", name="Owner", business_id="business")
+
+
+def test_batch_reports_invalid_items_and_writes_the_rest(fake_db):
+    batch = server.InvoiceBatchCreate(invoices=[
+        invoice("ours"),
+        invoice("theirs"),
+        invoice("missing"),
+        invoice("ours", quantity=0),
+        invoice("ours", discount=1000),
+        invoice("ours", quantity=2),
+    ])
+    results = asyncio.run(server.create_invoices_batch(batch, USER))
+
+    assert [(result.index, result.status) for result in results] == [
+        (0, "created"), (1, "error"), (2, "error"), (3, "error"), (4, "error"), (5, "created")
+    ]
+    assert results[1].detail == "Customer not found"
+    assert [results[0].invoice_number, results[5].invoice_number] == ["INV-00001", "INV-00002"]
+    assert [doc["invoice_number"] for doc in fake_db.invoices.docs] == ["INV-00001", "INV-00002"]
+
+
+def test_failed_batch_write_leaves_no_gap_in_numbering(fake_db):
+    insert_many = fake_db.invoices.insert_many
+
+    async def failing_insert(docs, session=None):
+        raise RuntimeError("write conflict")
+
+    fake_db.invoices.insert_many = failing_insert
+    batch = server.InvoiceBatchCreate(invoices=[invoice("ours"), invoice("ours")])
+    with pytest.raises(RuntimeError):
+        asyncio.run(server.create_invoices_batch(batch, USER))
+
+    fake_db.invoices.insert_many = insert_many
+    results = asyncio.run(server.create_invoices_batch(batch, USER))
+    assert [result.invoice_number for result in results] == ["INV-00001", "INV-00002"]
@@ -0,0 +1,69 @@
+import re
+import zlib
+from datetime import datetime, timezone
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("amount, expected", [
+    (0, "0.00"),
+    (999.5, "999.50"),
+    (1000, "1,000.00"),
+    (123456.789, "1,23,456.79"),
+    (1234567.89, "12,34,567.89"),
+    (-1234567.891, "-12,34,567.89"),
+    (-0.001, "0.00"),
+])
+def test_format_inr(amount, expected):
+    assert server.format_inr(amount) == expected
+
+
+def invoice_document(lines):
+    items = [
+        {"product_id": "panel", "product_name": f"Mono panel {index}", "quantity": 2,
+         "price": 11500.0, "tax_rate": 12.0, "amount": 23000.0}
+        for index in range(lines)
+    ]
+    subtotal = 23000.0 * lines
+    invoice = {
+        "invoice_number": "INV-00001",
+        "customer_id": "customer",
+        "customer_name": "Sharma Traders",
+        "invoice_date": datetime(2024, 5, 1, tzinfo=timezone.utc),
+        "items": items,
+        "subtotal": subtotal,
+        "tax_amount": subtotal * 0.12,
+        "total": subtotal * 1.12,
+        "balance": subtotal * 1.12,
+    }
+    business = {"name": "Surya Solar", "address": "12 MG Road\nPune", "gstin": "27ABCDE1234F1Z5"}
+    customer = {"name": "Sharma Traders", "gstin": "29AAAAA0000A1Z5"}
+    return server.invoice_pdf_document(invoice, business, customer, {"panel": {"hsn_code": "8541"}})
+
+
+@pytest.mark.parametrize("lines", [1, 80])
+def test_render_invoice_pdf_xref_points_at_every_object(lines):
+    pdf = server.render_invoice_pdf(invoice_document(lines))
+    assert pdf.startswith(b"%PDF-")
+    assert pdf.endswith(b"%%EOF\n")
+
+    startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", pdf).group(1))
+    assert pdf[startxref:].startswith(b"xref\n")
+    size = int(re.search(rb"/Size (\d+)", pdf[startxref:]).group(1))
+    table = pdf[startxref:].split(b"\n")
+    assert table[1] == b"0 %d" % size
+    entries = table[2:2 + size]
+    assert entries[0] == b"0000000000 65535 f "
+    for number, entry in enumerate(entries[1:], start=1):
+        offset, generation, kind = entry.split()
+        assert (generation, kind) == (b"00000", b"n")
+        assert pdf[int(offset):].startswith(b"%d 0 obj\n" % number)
+
+    pages = int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", pdf).group(1))
+    assert (pages > 1) == (lines > 20)
+    assert size == 5 + 2 * pages
+    for length, stream in re.findall(rb"<< /Length (\d+) /Filter /FlateDecode >>\nstream\n(.*?)\nendstream", pdf, re.S):
+        assert len(stream) == int(length)
+        assert b"INV-00001" in zlib.decompress(stream)
@@ -0,0 +1,34 @@
+import asyncio
+
+import server
+from scripts import migrate_dates_to_bson
+from tests.test_product_catalog import FakeChangeVersions
+
+
+class FakeSolarProjects:
+    async def distinct(self, field, query):
+        owners = {"p1": "business", "p2": "other"}
+        return sorted({owners[project_id] for project_id in query["id"]["$in"]})
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.change_versions = FakeChangeVersions()
+        self.solar_projects = FakeSolarProjects()
+
+
+def test_migrated_batches_bump_change_versions(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+
+    async def main():
+        await migrate_dates_to_bson.bump_versions("products", [{"id": "x", "business_id": "business"}])
+        await migrate_dates_to_bson.bump_versions("subsidy_tracking", [{"id": "s1", "project_id": "p1"}, {"id": "s2", "project_id": "p2"}])
+        await migrate_dates_to_bson.bump_versions("users", [{"id": "u1"}])
+
+    asyncio.run(main())
+    assert database.change_versions.versions == {
+        "business": {"products": 1, "product_catalog": 1, "subsidy_tracking": 1},
+        "other": {"subsidy_tracking": 1},
+        "user:u1": {"user": 1},
+    }
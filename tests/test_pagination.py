@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.mark.parametrize("sort_value", [
+    datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc),
+    "INV-00042",
+    1250.5,
+    None,
+])
+def test_cursor_round_trip(sort_value):
+    cursor = server.encode_cursor(sort_value, "doc-id")
+    assert "=" not in cursor
+    decoded_value, doc_id = server.decode_cursor(cursor)
+    assert doc_id == "doc-id"
+    if isinstance(sort_value, datetime):
+        assert decoded_value.replace(tzinfo=timezone.utc) == sort_value
+    else:
+        assert decoded_value == sort_value
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "e30", server.encode_cursor("only", "two")[:-4]])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as raised:
+        server.decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+def test_sparse_projection():
+    assert server.sparse_projection(server.Customer, None) is None
+    assert server.sparse_projection(server.Customer, "", {"_id": 0}) == {"_id": 0}
+    assert server.sparse_projection(server.Customer, " name, phone ,") == {"_id": 0, "id": 1, "name": 1, "phone": 1}
+
+
+def test_sparse_projection_rejects_unknown_fields():
+    with pytest.raises(HTTPException) as raised:
+        server.sparse_projection(server.Customer, "name,password_hash")
+    assert raised.value.status_code == 400
+    assert "password_hash" in raised.value.detail
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"old", "abc"', True),
+    ('"old"', False),
+    ('"abcd"', False),
+])
+def test_etag_matches(if_none_match, expected):
+    assert server.etag_matches(if_none_match, '"abc"') is expected
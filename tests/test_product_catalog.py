@@ -0,0 +1,104 @@
+import asyncio
+
+import server
+
+
+class FakeChangeVersions:
+    def __init__(self):
+        self.versions = {}
+
+    async def update_one(self, query, update, upsert=False, session=None):
+        versions = self.versions.setdefault(query["_id"], {})
+        for collection, step in update["$inc"].items():
+            versions[collection] = versions.get(collection, 0) + step
+
+    async def find_one(self, query, projection):
+        return self.versions.get(query["_id"])
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+
+class FakeProducts:
+    def __init__(self, docs):
+        self.docs = docs
+        self.full_loads = 0
+        self.stock_writes = 0
+
+    def find(self, query, projection):
+        if "id" not in query:
+            self.full_loads += 1
+        ids = query.get("id", {}).get("$in")
+        return FakeCursor([
+            {key: value for key, value in doc.items() if projection.get(key, 1)}
+            for doc in self.docs if ids is None or doc["id"] in ids
+        ])
+
+    async def bulk_write(self, requests, ordered=True, session=None):
+        self.stock_writes += 1
+
+
+class FakeCollection:
+    async def insert_one(self, *args, **kwargs):
+        pass
+
+    async def update_one(self, *args, **kwargs):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.change_versions = FakeChangeVersions()
+        self.products = FakeProducts([
+            {"id": f"p{index}", "business_id": "business", "name": f"Panel {index}", "stock_quantity": 50}
+            for index in range(20)
+        ])
+        self.invoices = FakeCollection()
+        self.business_summaries = FakeCollection()
+        self.monthly_rollups = FakeCollection()
+
+
+async def no_transactions():
+    return False
+
+
+def test_stock_movements_do_not_reload_the_catalog(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "transactions_supported", no_transactions)
+    monkeypatch.setattr(server, "product_catalog", server.ProductCatalogCache(10, 100))
+
+    def invoice(number):
+        item = server.InvoiceItem(product_id="p3", product_name="Panel 3", quantity=2, price=100, tax_rate=18, amount=200)
+        data = server.InvoiceCreate(customer_id="customer", items=[item])
+        return server.build_invoice(data, {"name": "Customer"}, "business", number)
+
+    async def bill_twice():
+        for number in ("INV-00001", "INV-00002"):
+            await server.write_invoices("business", [invoice(number)], {"p3": -2})
+
+    asyncio.run(bill_twice())
+    assert database.products.stock_writes == 2
+    assert database.change_versions.versions["business"]["products"] == 2
+    assert database.products.full_loads == 1
+    assert server.product_catalog.hits == 1
+
+    products = asyncio.run(server.product_catalog.get_products("business", ["p3", "unknown"]))
+    assert list(products) == ["p3"] and "stock_quantity" not in products["p3"]
+    assert database.products.full_loads == 1
+
+    # Editing a product definition does invalidate the cached catalog
+    asyncio.run(server.bump_change_versions("business", "products", "product_catalog"))
+    asyncio.run(server.product_catalog.get_products("business", ["p3"]))
+    assert database.products.full_loads == 2
@@ -0,0 +1,89 @@
+"""Explain every query shape the API issues and fail if any of them is a COLLSCAN.
+
+Declared indexes are ensured first, so this runs against the empty scratch database;
+skipped when no mongod is reachable.
+"""
+from datetime import date
+
+import pytest
+
+import server
+
+BUSINESS = "plan-check-business"
+PROJECT = "plan-check-project"
+PAGE_SORT = [("created_at", -1), ("id", -1)]
+
+# (route, collection, filter, sort)
+ROUTE_QUERIES = [
+    ("GET /auth/me", "users", {"id": "x"}, None),
+    ("POST /auth/login", "users", {"email": "x@example.com"}, None),
+    ("GET /businesses", "businesses", {"owner_id": "x"}, None),
+    ("GET /businesses/{id}", "businesses", {"id": "x"}, None),
+    ("GET /customers", "customers", {"business_id": BUSINESS}, PAGE_SORT),
+    ("GET /customers/search prefix", "customers",
+     {"business_id": BUSINESS, "search_terms": {"$regex": "^sha"}}, None),
+    ("GET /customers/search substring", "customers",
+     {"business_id": BUSINESS, "search_grams": {"$all": ["arm", "rma"]}, "search_terms": {"$regex": "arma"}}, None),
+    ("GET /customers/{id}", "customers", {"id": "x"}, None),
+    ("GET /vendors", "vendors", {"business_id": BUSINESS}, PAGE_SORT),
+    ("GET /vendors/{id}", "vendors", {"id": "x"}, None),
+    ("GET /products", "products", {"business_id": BUSINESS}, PAGE_SORT),
+    ("GET /products/search prefix", "products",
+     {"business_id": BUSINESS, "search_terms": {"$regex": "^pan"}}, None),
+    ("GET /products/search substring", "products",
+     {"business_id": BUSINESS, "search_grams": {"$all": ["ane", "nel"]}, "search_terms": {"$regex": "anel"}}, None),
+    ("GET /products/{id}", "products", {"id": "x"}, None),
+    ("GET /invoices", "invoices", {"business_id": BUSINESS}, PAGE_SORT),
+    ("GET /invoices/{id}", "invoices", {"id": "x"}, None),
+    ("GET /expense-categories", "expense_categories", {"business_id": BUSINESS}, None),
+    ("GET /expenses", "expenses", {"business_id": BUSINESS}, PAGE_SORT),
+    ("GET /expenses/{id}", "expenses", {"id": "x"}, None),
+    ("GET /payments", "payments", {"business_id": BUSINESS}, PAGE_SORT),
+    ("GET /dashboard/stats invoices", "invoices", {"business_id": BUSINESS}, None),
+    ("GET /dashboard/stats expenses", "expenses", {"business_id": BUSINESS}, None),
+    ("GET /dashboard/stats products", "products", {"business_id": BUSINESS}, None),
+    ("GET /reports/sales", "invoices", {"business_id": BUSINESS}, [("invoice_date", -1)]),
+    ("GET /reports/expenses", "expenses", {"business_id": BUSINESS}, [("expense_date", -1)]),
+    ("GET /reports/gst-summary", "invoices",
+     {"business_id": BUSINESS, **server.date_range_filter("invoice_date", date(2024, 4, 1), date(2024, 4, 30))}, None),
+    ("GET /reports/* monthly rollups", "monthly_rollups",
+     {"business_id": BUSINESS, "kind": "sales", "month": {"$gte": "2024-04"}}, [("month", 1)]),
+    ("GET /export/invoices", "invoices", {"business_id": BUSINESS}, [("invoice_date", 1)]),
+    ("GET /export/expenses", "expenses", {"business_id": BUSINESS}, [("expense_date", 1)]),
+    ("GET /export/payments", "payments", {"business_id": BUSINESS}, [("payment_date", 1)]),
+    ("GET /solar/projects", "solar_projects", {"business_id": BUSINESS}, PAGE_SORT),
+    ("GET /solar/projects/{id}", "solar_projects", {"id": "x"}, None),
+    ("GET /solar/milestones/{project_id}", "project_milestones", {"project_id": PROJECT}, [("created_at", 1)]),
+    ("GET /solar/materials/{project_id}", "material_consumption", {"project_id": PROJECT}, [("consumption_date", -1)]),
+    ("GET /solar/documents/{project_id}", "government_documents", {"project_id": PROJECT}, [("created_at", -1)]),
+    ("GET /solar/subsidies/{project_id}", "subsidy_tracking", {"project_id": PROJECT}, [("created_at", -1)]),
+    ("GET /solar/dashboard recent projects", "solar_projects", {"business_id": BUSINESS}, [("created_at", -1)]),
+    ("GET /solar/dashboard subsidy lookup", "subsidy_tracking", {"project_id": PROJECT}, None),
+]
+
+
+def plan_stages(plan):
+    """Yield every stage name in a (possibly nested) query plan"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+@pytest.mark.parametrize(
+    "route, collection, query, sort", ROUTE_QUERIES, ids=[entry[0] for entry in ROUTE_QUERIES]
+)
+def test_route_query_uses_an_index(run_with_mongo, route, collection, query, sort):
+    async def explain():
+        await server.ensure_indexes()
+        cursor = server.db[collection].find(query, {"_id": 0})
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.explain()
+
+    stages = set(plan_stages(run_with_mongo(explain)["queryPlanner"]["winningPlan"]))
+    assert "COLLSCAN" not in stages, f"{route} scans {collection}: {sorted(stages)}"
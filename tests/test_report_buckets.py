@@ -0,0 +1,105 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    (date(2024, 1, 1), date(2024, 3, 31), (date(2024, 1, 1), date(2024, 3, 31))),
+    (date(2024, 1, 15), date(2024, 3, 10), (date(2024, 2, 1), date(2024, 2, 29))),
+    (date(2024, 12, 5), None, (date(2025, 1, 1), None)),
+    (None, date(2024, 2, 28), (None, date(2024, 1, 31))),
+])
+def test_whole_months(start, end, expected):
+    assert server.whole_months(start, end) == expected
+
+
+def test_month_buckets_read_partial_edge_months_from_raw_documents(monkeypatch):
+    calls = []
+
+    async def rollups(database, business_id, kind, start, end):
+        calls.append(("rollup", start, end))
+        return [{"period": "2024-02", "count": 2, "total": 200.0, "tax": 20.0}]
+
+    async def raw(business_id, kind, start, end, granularity):
+        calls.append(("raw", start, end))
+        return [{"period": start.strftime("%Y-%m"), "count": 1, "total": 10.0, "tax": 1.0, "categories": {}}]
+
+    async def rollups_database(business_id):
+        return "analytics"
+
+    monkeypatch.setattr(server, "_rollup_buckets", rollups)
+    monkeypatch.setattr(server, "_raw_buckets", raw)
+    monkeypatch.setattr(server, "monthly_rollups_database", rollups_database)
+
+    buckets = asyncio.run(server._month_buckets("business", "expenses", date(2024, 1, 15), date(2024, 3, 10), "month"))
+    assert calls == [
+        ("rollup", date(2024, 2, 1), date(2024, 2, 29)),
+        ("raw", date(2024, 1, 15), date(2024, 1, 31)),
+        ("raw", date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+    assert [(bucket["period"], bucket["total"]) for bucket in buckets] == [
+        ("2024-01", 10.0), ("2024-02", 200.0), ("2024-03", 10.0)
+    ]
+
+    calls.clear()
+    buckets = asyncio.run(server._month_buckets("business", "expenses", date(2024, 3, 5), date(2024, 4, 20), "financial_year"))
+    assert calls == [("raw", date(2024, 3, 5), date(2024, 4, 20))]
+    assert [bucket["period"] for bucket in buckets] == ["2023-24"]
+
+
+def test_reports_read_raw_documents_while_rollups_backfill(monkeypatch):
+    rebuilt = []
+
+    class Rollups:
+        async def find_one(self, *args, **kwargs):
+            return None
+
+    class Database:
+        monthly_rollups = Rollups()
+
+    async def rebuild(business_id):
+        await asyncio.sleep(0)
+        rebuilt.append(business_id)
+
+    async def raw(business_id, kind, start, end, granularity):
+        return [{"period": "2024-04", "count": 3, "total": 30.0}]
+
+    monkeypatch.setattr(server, "db", Database())
+    monkeypatch.setattr(server, "rebuild_monthly_rollups", rebuild)
+    monkeypatch.setattr(server, "_raw_buckets", raw)
+
+    async def main():
+        reports = await asyncio.gather(*(
+            server._month_buckets("business", "sales", date(2024, 4, 1), date(2024, 4, 30), "month") for _ in range(3)
+        ))
+        await asyncio.gather(*server._rollup_backfills.values())
+        return reports
+
+    reports = asyncio.run(main())
+    assert all([(bucket["period"], bucket["count"], bucket["total"]) for bucket in report] == [("2024-04", 3, 30.0)]
+               for report in reports)
+    assert rebuilt == ["business"]
+    assert not server._rollup_backfills
+
+
+def test_rebuild_monthly_rollups_replaces_stale_rollups(run_with_mongo):
+    from datetime import datetime, timezone
+
+    async def main():
+        await server.db.invoices.insert_many([
+            {"id": f"i{day}", "business_id": "business", "invoice_date": datetime(2024, 4, day, tzinfo=timezone.utc),
+             "total": 100.0, "tax_amount": 18.0, "paid_amount": 0.0, "balance": 100.0}
+            for day in (1, 15)
+        ])
+        await server.db.monthly_rollups.insert_one(
+            {"_id": "business:sales:2023-01", "business_id": "business", "kind": "sales", "month": "2023-01", "total": 5}
+        )
+        await server.rebuild_monthly_rollups("business")
+        return await server.db.monthly_rollups.find({"business_id": "business"}).sort("_id", 1).to_list(None)
+
+    rollups = run_with_mongo(main)
+    assert [rollup["_id"] for rollup in rollups] == ["business:ready", "business:sales:2024-04"]
+    assert rollups[1]["total"] == 200.0 and rollups[1]["count"] == 2
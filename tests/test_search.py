@@ -0,0 +1,15 @@
+import server
+
+
+def test_search_fields_terms_and_grams():
+    fields = server.search_fields("products", {"name": "Mono  PANEL 540W", "sku": "MP-540", "hsn_code": None})
+    assert fields["search_terms"] == sorted({"mono panel 540w", "mono", "panel", "540w", "mp-540", "mp", "540"})
+    assert {"mon", "ono", "pan", "ane", "nel", "540", "40w"} <= set(fields["search_grams"])
+    # Words shorter than a gram only match by prefix
+    assert not any(len(gram) != server.SEARCH_GRAM_SIZE for gram in fields["search_grams"])
+    assert "mp" not in fields["search_grams"]
+
+
+def test_search_fields_only_reads_searchable_fields():
+    fields = server.search_fields("customers", {"name": "", "email": "someone@example.com"})
+    assert fields == {"search_terms": [], "search_grams": []}
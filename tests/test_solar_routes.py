@@ -0,0 +1,76 @@
+import asyncio
+
+import server
+
+
+class FakeCollection:
+    def __init__(self):
+        self.inserted = []
+        self.bulk_writes = []
+
+    async def insert_one(self, doc, session=None):
+        self.inserted.append(doc)
+
+    async def bulk_write(self, requests, ordered=True, session=None):
+        self.bulk_writes.append(requests)
+
+    async def update_one(self, *args, **kwargs):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.material_consumption = FakeCollection()
+        self.products = FakeCollection()
+        self.change_versions = FakeCollection()
+
+
+async def no_transactions():
+    return False
+
+
+def test_create_material_consumption_with_and_without_a_date(monkeypatch):
+    monkeypatch.setattr(server, "db", FakeDatabase())
+    monkeypatch.setattr(server, "transactions_supported", no_transactions)
+
+    async def get_products(business_id, product_ids):
+        return {"product": {"id": "product", "name": "Mono panel 540W"}}
+
+    monkeypatch.setattr(server.product_catalog, "get_products", get_products)
+    user = server.User(email="owner@example.com", name="Owner", business_id="business")
+
+    for consumption_date in (None, "2024-05-01T10:00:00+00:00"):
+        data = server.MaterialConsumptionCreate(
+            project_id="project", product_id="product", quantity_used=4, consumption_date=consumption_date
+        )
+        consumption = asyncio.run(server.create_material_consumption(data, user))
+        assert consumption.product_name == "Mono panel 540W"
+        if consumption_date:
+            assert consumption.consumption_date.isoformat() == consumption_date
+
+    assert len(server.db.material_consumption.inserted) == 2
+    assert len(server.db.products.bulk_writes) == 2
+
+
+def test_solar_dashboard_counts_only_the_business_subsidies(run_with_mongo):
+    async def main():
+        await server.db.solar_projects.insert_many([
+            {"id": f"p{index}", "business_id": "business", "installation_status": status,
+             "system_capacity_kw": 5, "estimated_cost": 300000, "subsidy_amount": 78000, "created_at": index}
+            for index, status in enumerate(["planning", "planning", "completed"])
+        ] + [{"id": "foreign", "business_id": "other", "installation_status": "planning",
+              "system_capacity_kw": 3, "estimated_cost": 1, "subsidy_amount": 1, "created_at": 9}])
+        await server.db.subsidy_tracking.insert_many([
+            {"id": "s1", "project_id": "p0", "status": "pending"},
+            {"id": "s2", "project_id": "p2", "status": "pending"},
+            {"id": "s3", "project_id": "p2", "status": "approved"},
+            {"id": "s4", "project_id": "foreign", "status": "pending"},
+        ])
+        return await server.build_solar_dashboard("business")
+
+    dashboard = run_with_mongo(main)
+    assert dashboard["total_projects"] == 3
+    assert dashboard["projects_by_status"] == {"planning": 2, "completed": 1}
+    assert dashboard["total_capacity_kw"] == 15
+    assert dashboard["pending_subsidies_count"] == 2
+    assert [project["id"] for project in dashboard["recent_projects"]] == ["p2", "p1", "p0"]
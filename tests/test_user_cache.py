@@ -0,0 +1,48 @@
+import asyncio
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+import server
+from tests.test_product_catalog import FakeChangeVersions
+
+
+class FakeUsers:
+    def __init__(self):
+        self.docs = {"u1": {"id": "u1", "email": "owner@example.com", "name": "Owner", "business_id": None}}
+        self.reads = 0
+
+    async def find_one(self, query, projection):
+        self.reads += 1
+        return dict(self.docs[query["id"]])
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.users = FakeUsers()
+        self.change_versions = FakeChangeVersions()
+
+
+def test_user_changes_reach_every_worker_cache(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "decode_token", lambda token: {"sub": "u1"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token")
+    workers = [server.UserCache(300, 100), server.UserCache(300, 100)]
+
+    async def current_user(worker):
+        monkeypatch.setattr(server, "user_cache", worker)
+        return await server.get_current_user(credentials)
+
+    async def main():
+        for worker in workers:
+            assert (await current_user(worker)).business_id is None
+            assert (await current_user(worker)).business_id is None
+        assert database.users.reads == 2
+
+        # The business is created through the first worker only
+        database.users.docs["u1"]["business_id"] = "business"
+        await server.bump_user_version("u1")
+        assert [(await current_user(worker)).business_id for worker in workers] == ["business", "business"]
+        assert database.users.reads == 4
+
+    asyncio.run(main())